@@ -1,10 +1,13 @@
 """Audio tools API routes."""
 import logging
+from pathlib import Path
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
 from app.core.security import verify_api_key
 from app.core.config import settings
+from app.core.uploads import iter_file, sniff_upload_format, stream_to_tempfile
 from app.models.schemas import AudioInfoResponse, AudioConvertRequest, ErrorResponse
 from app.services.audio_tools import (
     get_audio_info,
@@ -12,12 +15,30 @@ from app.services.audio_tools import (
     adjust_audio_speed,
     adjust_audio_volume,
     concatenate_audio,
+    is_noop_speed,
+    is_noop_volume,
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/audio", tags=["audio"])
 
+_ALLOWED_FORMATS: frozenset[str] = frozenset({"wav", "mp3", "flac", "ogg"})
+_ALLOWED_FORMATS_MSG = "Unsupported format. Allowed: " + ", ".join(sorted(_ALLOWED_FORMATS))
+
+
+def _stream_temp_audio(path: Path, media_type: str, filename: str) -> StreamingResponse:
+    """Stream a temporary output file to the client and delete it afterwards."""
+    return StreamingResponse(
+        iter_file(path),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(path.stat().st_size),
+        },
+        background=BackgroundTask(path.unlink, missing_ok=True),
+    )
+
 
 @router.post(
     "/info",
@@ -44,6 +65,7 @@ async def get_audio_file_info(
     Returns:
         Audio file information
     """
+    audio_path = None
     try:
         # Validate file format
         if audio_file.content_type and not audio_file.content_type.startswith("audio/"):
@@ -52,16 +74,15 @@ async def get_audio_file_info(
                 detail=f"Invalid file type: {audio_file.content_type}. Expected audio file.",
             )
 
-        # Check file size
-        file_content = await audio_file.read()
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB",
-            )
+        # Detect container format from magic bytes; if unrecognized (None),
+        # ffmpeg probes the file and rejects it if it cannot decode it
+        source_format = await sniff_upload_format(audio_file)
+
+        # Stream upload to disk, enforcing the size limit as we go
+        audio_path = await stream_to_tempfile(audio_file, settings.MAX_UPLOAD_SIZE)
 
         # Get audio info
-        info = await get_audio_info(file_content)
+        info = await get_audio_info(audio_path, source_format)
 
         logger.info(f"Audio info extracted: {info}")
 
@@ -74,6 +95,8 @@ async def get_audio_file_info(
             file_size_bytes=info["file_size_bytes"],
         )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Invalid audio file: {e}")
         raise HTTPException(
@@ -86,6 +109,9 @@ async def get_audio_file_info(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to process audio file",
         )
+    finally:
+        if audio_path is not None:
+            audio_path.unlink(missing_ok=True)
 
 
 @router.post(
@@ -102,7 +128,7 @@ async def convert_audio(
     audio_file: UploadFile = File(..., description="Audio file to convert"),
     target_format: str = Form(..., description="Target format (wav, mp3, flac, ogg)"),
     api_key: str = Depends(verify_api_key),
-) -> Response:
+) -> StreamingResponse:
     """
     Convert audio to a different format.
 
@@ -114,36 +140,32 @@ async def convert_audio(
     Returns:
         Converted audio file
     """
+    audio_path = None
     try:
         # Validate target format
-        allowed_formats = ["wav", "mp3", "flac", "ogg"]
-        if target_format.lower() not in allowed_formats:
+        fmt = target_format.lower()
+        if fmt not in _ALLOWED_FORMATS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported format. Allowed: {', '.join(allowed_formats)}",
+                detail=_ALLOWED_FORMATS_MSG,
             )
 
-        # Check file size
-        file_content = await audio_file.read()
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB",
-            )
+        # Detect container format from magic bytes; if unrecognized (None),
+        # ffmpeg probes the file and rejects it if it cannot decode it
+        source_format = await sniff_upload_format(audio_file)
+
+        # Stream upload to disk, enforcing the size limit as we go
+        audio_path = await stream_to_tempfile(audio_file, settings.MAX_UPLOAD_SIZE)
 
         # Convert audio
-        converted_data, fmt = await convert_audio_format(file_content, target_format.lower())
+        converted_path, fmt = await convert_audio_format(audio_path, fmt, source_format)
 
-        logger.info(f"Audio converted to {fmt}, size: {len(converted_data)} bytes")
+        logger.info(f"Audio converted to {fmt}")
 
-        return Response(
-            content=converted_data,
-            media_type=f"audio/{fmt}",
-            headers={
-                "Content-Disposition": f'attachment; filename="converted.{fmt}"',
-            },
-        )
+        return _stream_temp_audio(converted_path, f"audio/{fmt}", f"converted.{fmt}")
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Conversion error: {e}")
         raise HTTPException(
@@ -156,6 +178,9 @@ async def convert_audio(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to convert audio",
         )
+    finally:
+        if audio_path is not None:
+            audio_path.unlink(missing_ok=True)
 
 
 @router.post(
@@ -172,7 +197,7 @@ async def adjust_speed(
     audio_file: UploadFile = File(..., description="Audio file"),
     speed_factor: float = Form(..., ge=0.5, le=2.0, description="Speed multiplier (0.5-2.0)"),
     api_key: str = Depends(verify_api_key),
-) -> Response:
+) -> StreamingResponse:
     """
     Adjust audio playback speed.
 
@@ -184,28 +209,30 @@ async def adjust_speed(
     Returns:
         Audio with adjusted speed
     """
+    audio_path = None
     try:
-        # Check file size
-        file_content = await audio_file.read()
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB",
-            )
+        # Detect container format from magic bytes; if unrecognized (None),
+        # ffmpeg probes the file and rejects it if it cannot decode it
+        source_format = await sniff_upload_format(audio_file)
+
+        # Stream upload to disk, enforcing the size limit as we go
+        audio_path = await stream_to_tempfile(audio_file, settings.MAX_UPLOAD_SIZE)
+
+        # Identity speed on a WAV upload: send the upload back untouched
+        if source_format == "wav" and is_noop_speed(speed_factor):
+            response = _stream_temp_audio(audio_path, "audio/wav", "speed_adjusted.wav")
+            audio_path = None  # cleanup is now owned by the response
+            return response
 
         # Adjust speed
-        adjusted_data = await adjust_audio_speed(file_content, speed_factor)
+        adjusted_path = await adjust_audio_speed(audio_path, speed_factor, source_format)
 
         logger.info(f"Audio speed adjusted by {speed_factor}x")
 
-        return Response(
-            content=adjusted_data,
-            media_type="audio/wav",
-            headers={
-                "Content-Disposition": 'attachment; filename="speed_adjusted.wav"',
-            },
-        )
+        return _stream_temp_audio(adjusted_path, "audio/wav", "speed_adjusted.wav")
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Speed adjustment error: {e}")
         raise HTTPException(
@@ -218,6 +245,9 @@ async def adjust_speed(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to adjust audio speed",
         )
+    finally:
+        if audio_path is not None:
+            audio_path.unlink(missing_ok=True)
 
 
 @router.post(
@@ -234,7 +264,7 @@ async def adjust_volume(
     audio_file: UploadFile = File(..., description="Audio file"),
     volume_db: float = Form(..., ge=-20, le=20, description="Volume adjustment in dB (-20 to +20)"),
     api_key: str = Depends(verify_api_key),
-) -> Response:
+) -> StreamingResponse:
     """
     Adjust audio volume.
 
@@ -246,28 +276,30 @@ async def adjust_volume(
     Returns:
         Audio with adjusted volume
     """
+    audio_path = None
     try:
-        # Check file size
-        file_content = await audio_file.read()
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB",
-            )
+        # Detect container format from magic bytes; if unrecognized (None),
+        # ffmpeg probes the file and rejects it if it cannot decode it
+        source_format = await sniff_upload_format(audio_file)
+
+        # Stream upload to disk, enforcing the size limit as we go
+        audio_path = await stream_to_tempfile(audio_file, settings.MAX_UPLOAD_SIZE)
+
+        # 0dB on a WAV upload: send the upload back untouched
+        if source_format == "wav" and is_noop_volume(volume_db):
+            response = _stream_temp_audio(audio_path, "audio/wav", "volume_adjusted.wav")
+            audio_path = None  # cleanup is now owned by the response
+            return response
 
         # Adjust volume
-        adjusted_data = await adjust_audio_volume(file_content, volume_db)
+        adjusted_path = await adjust_audio_volume(audio_path, volume_db, source_format)
 
         logger.info(f"Audio volume adjusted by {volume_db}dB")
 
-        return Response(
-            content=adjusted_data,
-            media_type="audio/wav",
-            headers={
-                "Content-Disposition": 'attachment; filename="volume_adjusted.wav"',
-            },
-        )
+        return _stream_temp_audio(adjusted_path, "audio/wav", "volume_adjusted.wav")
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Volume adjustment error: {e}")
         raise HTTPException(
@@ -280,3 +312,6 @@ async def adjust_volume(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to adjust audio volume",
         )
+    finally:
+        if audio_path is not None:
+            audio_path.unlink(missing_ok=True)
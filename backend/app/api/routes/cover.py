@@ -2,54 +2,131 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
 from pathlib import Path
-import shutil
+import stat
+import threading
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile, status
+from fastapi.responses import FileResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.deps import get_current_user_optional
 from app.core.config import settings
+from app.core.ids import uuid7
 from app.core.security import verify_api_key
+from app.core.uploads import sniff_upload_format, stream_upload_to_path
 from app.db.models import User
 from app.db.session import get_async_session
 from app.models.schemas import (
     CoverCancelResponse,
     CoverCreateResponse,
-    CoverJobStageEnum,
-    CoverJobStatusEnum,
     CoverJobStatusResponse,
     ErrorResponse,
 )
 from app.services.cover_job_service import create_cover_job, get_cover_job, update_cover_job
-from app.tasks.celery_app import celery_app
-from app.tasks.cover_tasks import run_cover_job
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/cover", tags=["cover"])
 
+# Resolved once at import; resolve() walks the filesystem on every call
+_ASSET_ROOT: Path = Path(settings.COVER_ASSET_ROOT).resolve()
+_ALLOWED_FMT_SET: frozenset[str] = frozenset(f.lower() for f in settings.COVER_ALLOWED_FORMATS)
+
+
+# Persistent broker connection for control messages (revoke). Opened lazily so
+# importing the router does not require a reachable broker; kombu connections
+# are not thread-safe, so publishes from worker threads are serialized.
+# Celery itself is imported on first use: it is the heaviest import behind
+# this router and only job creation and cancellation need it.
+_control_conn = None
+_control_lock = threading.Lock()
+
+
+def _revoke_task(task_id: str) -> None:
+    from app.tasks.celery_app import celery_app
+
+    global _control_conn
+    with _control_lock:
+        if _control_conn is None:
+            conn = celery_app.connection_for_write()
+            conn.ensure_connection(max_retries=3)
+            _control_conn = conn
+        celery_app.control.revoke(task_id, terminate=True, signal="SIGTERM", connection=_control_conn)
+
 
 def _job_base_dir(job_id: uuid.UUID) -> Path:
-    return Path(settings.COVER_ASSET_ROOT).resolve() / str(job_id)
+    return _ASSET_ROOT / str(job_id)
 
 
-def _validate_audio_upload(file: UploadFile) -> None:
+async def _validate_audio_upload(file: UploadFile) -> str:
+    """Validate an upload's type, extension and content; return its lowercased extension."""
     if file.content_type and not file.content_type.startswith("audio/"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid file type: {file.content_type}. Expected audio/*.",
         )
-    suffix = Path(file.filename or "").suffix.lower().lstrip(".")
-    if suffix and suffix not in {f.lower() for f in settings.COVER_ALLOWED_FORMATS}:
+    _, dot, suffix = (file.filename or "").rpartition(".")
+    suffix = suffix.lower() if dot else ""
+    if suffix and suffix not in _ALLOWED_FMT_SET:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Unsupported file format: .{suffix}",
         )
+    detected = await sniff_upload_format(file)
+    if detected is None or detected not in _ALLOWED_FMT_SET:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unrecognized or unsupported audio content",
+        )
+    return suffix
+
+
+def _result_relative_path(job) -> Optional[str]:
+    """Location of the result under the asset root, as a POSIX string."""
+    if job.output_mix_filename:
+        return f"{job.id}/{job.output_mix_filename}"
+    # Rows written before output_mix_filename existed only carry the absolute path
+    try:
+        return Path(job.output_mix_path).relative_to(_ASSET_ROOT).as_posix()
+    except ValueError:
+        return None
+
+
+def _accel_redirect_uri(relative: Optional[str]) -> Optional[str]:
+    """Map a result path relative to the asset root to its internal nginx URI, if enabled."""
+    prefix = settings.COVER_ACCEL_REDIRECT_PREFIX
+    if not prefix or relative is None:
+        return None
+    return prefix.rstrip("/") + "/" + relative
+
+
+def _result_etag(job) -> Optional[str]:
+    """Strong ETag for a finished result, derived from stored metadata only."""
+    if job.output_size_bytes is None:
+        return None
+    return f'"{job.id.hex}-{job.output_size_bytes}"'
+
+
+def _status_etag(job) -> str:
+    """Weak ETag for a job's status; updated_at moves on every write to the row."""
+    updated_us = int(job.updated_at.timestamp() * 1_000_000)
+    return f'W/"{job.id.hex}-{updated_us}-{job.status}-{job.stage}-{job.progress}"'
+
+
+def _result_stat(job) -> Optional[os.stat_result]:
+    """Rebuild the result file's stat from the values stored at job completion."""
+    if job.output_size_bytes is None or job.output_mtime is None:
+        return None
+    mtime = job.output_mtime
+    return os.stat_result(
+        (stat.S_IFREG | 0o644, 0, 0, 1, 0, 0, job.output_size_bytes, mtime, mtime, mtime)
+    )
 
 
 def _assert_job_access(job, current_user: Optional[User]) -> None:
@@ -85,28 +162,27 @@ async def create_cover(
             ),
         )
 
-    _validate_audio_upload(reference_voice)
-    _validate_audio_upload(song)
+    voice_ext, song_ext = [await _validate_audio_upload(up) for up in (reference_voice, song)]
 
-    job_id = uuid.uuid4()
+    job_id = uuid7()
     base_dir = _job_base_dir(job_id)
     input_dir = base_dir / "input"
-    input_dir.mkdir(parents=True, exist_ok=True)
+    await asyncio.to_thread(input_dir.mkdir, parents=True, exist_ok=True)
 
-    voice_ext = Path(reference_voice.filename or "reference.wav").suffix or ".wav"
-    song_ext = Path(song.filename or "song.wav").suffix or ".wav"
-    voice_path = input_dir / f"reference_voice{voice_ext}"
-    song_path = input_dir / f"song{song_ext}"
+    voice_path = input_dir / f"reference_voice.{voice_ext or 'wav'}"
+    song_path = input_dir / f"song.{song_ext or 'wav'}"
 
     try:
-        with voice_path.open("wb") as f:
-            shutil.copyfileobj(reference_voice.file, f)
-        with song_path.open("wb") as f:
-            shutil.copyfileobj(song.file, f)
+        await stream_upload_to_path(reference_voice, voice_path, settings.COVER_MAX_UPLOAD_SIZE)
+        await stream_upload_to_path(song, song_path, settings.COVER_MAX_UPLOAD_SIZE)
+    except HTTPException:
+        raise
     except Exception as exc:
         logger.exception("failed to save uploaded files")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
 
+    # Pick the Celery task id up front so the row is written once, with task_id set
+    task_id = str(uuid7())
     job = await create_cover_job(
         session,
         job_id=job_id,
@@ -115,16 +191,19 @@ async def create_cover(
         input_song_path=str(song_path),
         model_id=model_id,
         pitch_shift=pitch_shift,
+        task_id=task_id,
     )
 
-    task_result = run_cover_job.delay(str(job.id))
-    job = await update_cover_job(session, job_id=job.id, task_id=task_result.id)
+    from app.tasks.cover_tasks import run_cover_job
+
+    # Publishing is a blocking broker round-trip; keep it off the event loop
+    await asyncio.to_thread(run_cover_job.apply_async, args=[str(job.id)], task_id=task_id)
 
     return CoverCreateResponse(
         job_id=str(job.id),
         task_id=job.task_id,
-        status=CoverJobStatusEnum(job.status),
-        stage=CoverJobStageEnum(job.stage),
+        status=job.status,
+        stage=job.stage,
     )
 
 
@@ -139,33 +218,36 @@ async def create_cover(
     summary="Get cover job status",
 )
 async def get_cover_status(
-    job_id: str,
+    job_id: uuid.UUID,
+    request: Request,
+    response: Response,
     api_key: str = Depends(verify_api_key),
     current_user: Optional[User] = Depends(get_current_user_optional),
     session: AsyncSession = Depends(get_async_session),
-) -> CoverJobStatusResponse:
-    try:
-        job_uuid = uuid.UUID(job_id)
-    except ValueError:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid job_id")
-
-    job = await get_cover_job(session, job_uuid)
+):
+    job = await get_cover_job(session, job_id)
     if job is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
     _assert_job_access(job, current_user)
 
+    # Most polls see an unchanged job; answer those with an empty 304
+    etag = _status_etag(job)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
     return CoverJobStatusResponse(
         job_id=str(job.id),
-        status=CoverJobStatusEnum(job.status),
-        stage=CoverJobStageEnum(job.stage),
+        status=job.status,
+        stage=job.stage,
         progress=job.progress,
         task_id=job.task_id,
         model_id=job.model_id,
         pitch_shift=job.pitch_shift,
         error_message=job.error_message,
-        created_at=job.created_at.isoformat(),
-        updated_at=job.updated_at.isoformat(),
+        created_at=job.created_at,
+        updated_at=job.updated_at,
     )
 
 
@@ -179,17 +261,13 @@ async def get_cover_status(
     },
 )
 async def get_cover_result(
-    job_id: str,
+    job_id: uuid.UUID,
+    request: Request,
     api_key: str = Depends(verify_api_key),
     current_user: Optional[User] = Depends(get_current_user_optional),
     session: AsyncSession = Depends(get_async_session),
 ):
-    try:
-        job_uuid = uuid.UUID(job_id)
-    except ValueError:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid job_id")
-
-    job = await get_cover_job(session, job_uuid)
+    job = await get_cover_job(session, job_id)
     if job is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
@@ -200,11 +278,38 @@ async def get_cover_result(
     if not job.output_mix_path:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result file missing")
 
-    result_path = Path(job.output_mix_path)
-    if not result_path.exists():
+    # Results never change once written, so a matching ETag needs no disk access
+    etag = _result_etag(job)
+    if etag is not None and request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    filename = f"{job.id}.wav"
+    relative = _result_relative_path(job)
+    accel_uri = _accel_redirect_uri(relative)
+    if accel_uri is not None:
+        # nginx serves the file itself (sendfile, range requests) and answers
+        # 404 if it is gone, so no stat() is needed here; we only authorize
+        return Response(
+            status_code=status.HTTP_200_OK,
+            media_type="audio/wav",
+            headers={
+                "X-Accel-Redirect": accel_uri,
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                **({"ETag": etag} if etag is not None else {}),
+            },
+        )
+
+    result_path = _ASSET_ROOT / relative if relative is not None else Path(job.output_mix_path)
+    if not await asyncio.to_thread(result_path.exists):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Result file not found")
 
-    return FileResponse(path=result_path, media_type="audio/wav", filename=f"{job.id}.wav")
+    return FileResponse(
+        path=result_path,
+        media_type="audio/wav",
+        filename=filename,
+        headers={"ETag": etag} if etag is not None else None,
+        stat_result=_result_stat(job),
+    )
 
 
 @router.post(
@@ -218,29 +323,24 @@ async def get_cover_result(
     },
 )
 async def cancel_cover_job(
-    job_id: str,
+    job_id: uuid.UUID,
     api_key: str = Depends(verify_api_key),
     current_user: Optional[User] = Depends(get_current_user_optional),
     session: AsyncSession = Depends(get_async_session),
 ) -> CoverCancelResponse:
-    try:
-        job_uuid = uuid.UUID(job_id)
-    except ValueError:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid job_id")
-
-    job = await get_cover_job(session, job_uuid)
+    job = await get_cover_job(session, job_id)
     if job is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
     _assert_job_access(job, current_user)
 
     if job.task_id:
-        celery_app.control.revoke(job.task_id, terminate=True, signal="SIGTERM")
+        await asyncio.to_thread(_revoke_task, job.task_id)
 
     job = await update_cover_job(session, job_id=job.id, status="canceled", stage="finalize", progress=100)
 
     return CoverCancelResponse(
         job_id=str(job.id),
-        status=CoverJobStatusEnum(job.status),
+        status=job.status,
         message="Job cancellation requested",
     )
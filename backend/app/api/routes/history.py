@@ -1,11 +1,16 @@
 """History API routes."""
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_async_session
 from app.auth.deps import get_current_user
 from app.db.models import User
-from app.services.history_service import list_user_history
+from app.services.history_service import (
+    decode_history_cursor,
+    encode_history_cursor,
+    list_user_history,
+)
 from app.models.schemas import HistoryItemResponse, HistoryListResponse
 
 router = APIRouter(prefix="/history", tags=["history"])
@@ -19,7 +24,8 @@ router = APIRouter(prefix="/history", tags=["history"])
 )
 async def get_history(
     limit: int = Query(default=20, ge=1, le=100, description="Maximum number of items to return"),
-    offset: int = Query(default=0, ge=0, description="Number of items to skip"),
+    offset: int = Query(default=0, ge=0, description="Number of items to skip (ignored with cursor)"),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from a previous next_cursor"),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_async_session),
 ) -> HistoryListResponse:
@@ -29,31 +35,38 @@ async def get_history(
     Args:
         limit: Maximum number of records to return
         offset: Number of records to skip
+        cursor: Keyset cursor returned as next_cursor by the previous page
         current_user: Authenticated user
         session: Database session
 
     Returns:
-        List of history items with total count
+        List of history items with total count and the next page cursor
     """
+    decoded_cursor = None
+    if cursor is not None:
+        try:
+            decoded_cursor = decode_history_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+
     items, total = await list_user_history(
-        session, user_id=current_user.id, limit=limit, offset=offset
+        session,
+        user_id=current_user.id,
+        limit=limit,
+        offset=offset,
+        cursor=decoded_cursor,
     )
 
+    next_cursor = None
+    if len(items) == limit:
+        last = items[-1]
+        next_cursor = encode_history_cursor(last.created_at, last.id)
+
     return HistoryListResponse(
-        items=[
-            HistoryItemResponse(
-                id=str(h.id),
-                job_type=h.job_type,
-                status=h.status,
-                input_text=h.input_text,
-                language=h.language,
-                speed=h.speed,
-                temperature=h.temperature,
-                duration_seconds=h.duration_seconds,
-                error_message=h.error_message,
-                created_at=h.created_at.isoformat(),
-            )
-            for h in items
-        ],
+        items=[HistoryItemResponse.model_validate(row._mapping) for row in items],
         total=total,
+        next_cursor=next_cursor,
     )
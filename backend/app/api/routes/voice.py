@@ -2,16 +2,15 @@
 
 import logging
 import tempfile
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, NoReturn, Optional, Tuple
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
 from fastapi.responses import Response
-from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 
 from app.core.security import verify_api_key
 from app.core.config import settings
-from app.db.session import get_async_session
 from app.auth.deps import get_current_user_optional
 from app.db.models import User
 from app.models.schemas import (
@@ -20,13 +19,55 @@ from app.models.schemas import (
     ErrorResponse,
     LanguageEnum,
 )
+from app.services.sovits_batcher import sovits_batcher
 from app.services.sovits_client import sovits_client
-from app.services.history_service import record_history
+from app.services.history_service import record_history_in_background
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/voice", tags=["voice"])
 
+# Reference audio content types accepted by /synthesize
+ALLOWED_AUDIO_TYPES = frozenset({
+    "audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave",
+    "audio/mpeg", "audio/mp3",
+    "audio/mp4", "audio/x-m4a", "audio/aac",
+    "audio/ogg", "audio/webm",
+    "audio/flac", "audio/x-flac",
+})
+
+# Approximate duration divisor, assuming 44.1kHz 16-bit mono PCM output
+_PCM_BYTES_PER_SECOND = 44100 * 2
+
+# Upstream failure type -> (status code, history message, client detail).
+# Lookup walks the exception's MRO, so TimeoutException wins over HTTPError.
+_ERROR_MAP: Dict[type, Tuple[int, str, str]] = {
+    httpx.TimeoutException: (504, "{service} timeout", "{service} timeout. Please try again."),
+    httpx.HTTPError: (502, "{service} error: {error}", "{service} error. Please try again later."),
+    ValueError: (502, "{error}", "{error}"),
+}
+_UNEXPECTED_ERROR = (500, "Unexpected error: {error}", "An unexpected error occurred during {action}")
+
+
+def _raise_synthesis_error(
+    exc: Exception,
+    record_history: Callable[..., None],
+    service: str,
+    action: str,
+) -> NoReturn:
+    """Log a synthesis failure, record it in history and raise the mapped HTTP error."""
+    status_code, history_message, detail = next(
+        (_ERROR_MAP[cls] for cls in type(exc).__mro__ if cls in _ERROR_MAP),
+        _UNEXPECTED_ERROR,
+    )
+    fields = {"service": service, "action": action, "error": str(exc)}
+    if status_code == status.HTTP_500_INTERNAL_SERVER_ERROR:
+        logger.exception("Unexpected error during %s: %s", action, exc)
+    else:
+        logger.error("SoVITS %s failed: %s", action, exc)
+    record_history(status="error", error_message=history_message.format(**fields))
+    raise HTTPException(status_code=status_code, detail=detail.format(**fields)) from exc
+
 
 @router.post(
     "/synthesize",
@@ -47,7 +88,6 @@ async def synthesize_voice(
     temperature: float = Form(default=0.7, ge=0.1, le=1.0, description="Sampling temperature (0.1-1.0)"),
     api_key: str = Depends(verify_api_key),
     current_user: Optional[User] = Depends(get_current_user_optional),
-    session: AsyncSession = Depends(get_async_session),
 ) -> Response:
     """
     Synthesize speech from text using reference audio.
@@ -66,57 +106,61 @@ async def synthesize_voice(
     Raises:
         HTTPException: If synthesis fails
     """
+    clean_text = text.strip()
+    lang_value = language.value
+    record_history = partial(
+        record_history_in_background,
+        user_id=current_user.id if current_user else None,
+        job_type="clone",
+        input_text=clean_text,
+        language=lang_value,
+        speed=speed,
+        temperature=temperature,
+    )
     try:
         # Validate text
-        if not text.strip():
+        if not clean_text:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Text cannot be empty"
             )
 
         # Validate file format
-        if reference_audio.content_type and not reference_audio.content_type.startswith("audio/"):
+        content_type = (reference_audio.content_type or "").partition(";")[0].strip().lower()
+        if content_type and content_type not in ALLOWED_AUDIO_TYPES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid file type: {reference_audio.content_type}. Expected audio file."
             )
 
-        # Check file size
-        file_content = await reference_audio.read()
-        if len(file_content) > settings.MAX_UPLOAD_SIZE:
+        # Check file size without reading the upload into memory; the
+        # multipart parser records it while spooling the file
+        upload_size = reference_audio.size
+        if upload_size is None:
+            upload_size = reference_audio.file.seek(0, 2)
+            reference_audio.file.seek(0)
+        if upload_size > settings.MAX_UPLOAD_SIZE:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
             )
 
-        # Reset file pointer
-        await reference_audio.seek(0)
-
-        logger.info(f"Synthesizing text (length: {len(text)}) with language: {language}")
+        logger.info("Synthesizing text (length: %d) with language: %s", len(text), lang_value)
 
         # Call SoVITS service
-        audio_data = await sovits_client.synthesize(
-            text=text.strip(),
+        audio_data = await sovits_batcher.synthesize(
+            text=clean_text,
             reference_audio=reference_audio.file,
-            language=language.value,
+            language=lang_value,
             speed=speed,
             temperature=temperature,
         )
 
-        logger.info(f"Synthesis successful, audio size: {len(audio_data)} bytes")
+        duration = len(audio_data) / _PCM_BYTES_PER_SECOND
+        logger.info("Synthesis successful, audio size: %d bytes", len(audio_data))
 
         # Record successful synthesis in history
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="clone",
-            status="success",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            duration_seconds=len(audio_data) / 44100 / 2,
-        )
+        record_history(status="success", duration_seconds=duration)
 
         # Return audio as binary response
         return Response(
@@ -124,78 +168,14 @@ async def synthesize_voice(
             media_type="audio/wav",
             headers={
                 "Content-Disposition": 'attachment; filename="synthesized.wav"',
-                "X-Audio-Duration": str(len(audio_data) / 44100 / 2),  # Approximate
+                "X-Audio-Duration": str(duration),  # Approximate
             }
         )
 
-    except httpx.TimeoutException:
-        logger.error("SoVITS service timeout")
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="clone",
-            status="error",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            error_message="Voice synthesis service timeout",
-        )
-        raise HTTPException(
-            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-            detail="Voice synthesis service timeout. Please try again."
-        )
-    except httpx.HTTPError as e:
-        logger.error(f"SoVITS HTTP error: {e}")
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="clone",
-            status="error",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            error_message=f"Voice synthesis service error: {str(e)}",
-        )
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="Voice synthesis service error. Please try again later."
-        )
-    except ValueError as e:
-        logger.error(f"Invalid response from SoVITS: {e}")
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="clone",
-            status="error",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            error_message=str(e),
-        )
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=str(e)
-        )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.exception(f"Unexpected error during synthesis: {e}")
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="clone",
-            status="error",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            error_message=f"Unexpected error: {str(e)}",
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred during synthesis"
-        )
+        _raise_synthesis_error(e, record_history, service="Voice synthesis service", action="synthesis")
 
 
 @router.post(
@@ -215,7 +195,6 @@ async def text_to_speech(
     temperature: float = Form(default=0.7, ge=0.1, le=1.0, description="Sampling temperature (0.1-1.0)"),
     api_key: str = Depends(verify_api_key),
     current_user: Optional[User] = Depends(get_current_user_optional),
-    session: AsyncSession = Depends(get_async_session),
 ) -> Response:
     """
     Synthesize speech from text using default voice.
@@ -233,38 +212,40 @@ async def text_to_speech(
     Raises:
         HTTPException: If synthesis fails
     """
+    clean_text = text.strip()
+    lang_value = language.value
+    record_history = partial(
+        record_history_in_background,
+        user_id=current_user.id if current_user else None,
+        job_type="tts",
+        input_text=clean_text,
+        language=lang_value,
+        speed=speed,
+        temperature=temperature,
+    )
     try:
         # Validate text
-        if not text.strip():
+        if not clean_text:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Text cannot be empty"
             )
 
-        logger.info(f"TTS request: text length={len(text)}, language={language}")
+        logger.info("TTS request: text length=%d, language=%s", len(text), lang_value)
 
         # Call SoVITS service
-        audio_data = await sovits_client.synthesize_tts(
-            text=text.strip(),
-            language=language.value,
+        audio_data = await sovits_batcher.synthesize_tts(
+            text=clean_text,
+            language=lang_value,
             speed=speed,
             temperature=temperature,
         )
 
-        logger.info(f"TTS successful, audio size: {len(audio_data)} bytes")
+        duration = len(audio_data) / _PCM_BYTES_PER_SECOND
+        logger.info("TTS successful, audio size: %d bytes", len(audio_data))
 
         # Record successful TTS in history
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="tts",
-            status="success",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            duration_seconds=len(audio_data) / 44100 / 2,
-        )
+        record_history(status="success", duration_seconds=duration)
 
         # Return audio as binary response
         return Response(
@@ -272,78 +253,14 @@ async def text_to_speech(
             media_type="audio/wav",
             headers={
                 "Content-Disposition": 'attachment; filename="tts_output.wav"',
-                "X-Audio-Duration": str(len(audio_data) / 44100 / 2),  # Approximate
+                "X-Audio-Duration": str(duration),  # Approximate
             }
         )
 
-    except httpx.TimeoutException:
-        logger.error("SoVITS TTS service timeout")
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="tts",
-            status="error",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            error_message="TTS service timeout",
-        )
-        raise HTTPException(
-            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
-            detail="TTS service timeout. Please try again."
-        )
-    except httpx.HTTPError as e:
-        logger.error(f"SoVITS TTS HTTP error: {e}")
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="tts",
-            status="error",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            error_message=f"TTS service error: {str(e)}",
-        )
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="TTS service error. Please try again later."
-        )
-    except ValueError as e:
-        logger.error(f"Invalid response from SoVITS TTS: {e}")
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="tts",
-            status="error",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            error_message=str(e),
-        )
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=str(e)
-        )
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.exception(f"Unexpected error during TTS: {e}")
-        await record_history(
-            session=session,
-            user_id=current_user.id if current_user else None,
-            job_type="tts",
-            status="error",
-            input_text=text.strip(),
-            language=language.value,
-            speed=speed,
-            temperature=temperature,
-            error_message=f"Unexpected error: {str(e)}",
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred during TTS"
-        )
+        _raise_synthesis_error(e, record_history, service="TTS service", action="TTS")
 
 
 @router.get(
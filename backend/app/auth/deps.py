@@ -1,10 +1,11 @@
 """Authentication dependencies."""
+import uuid
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
+from app.core.ttl_cache import TTLCache
 from app.db.session import get_async_session
 from app.db.models import User
 from app.auth.token_service import verify_access_token
@@ -12,6 +13,33 @@ from app.auth.token_service import verify_access_token
 security = HTTPBearer()
 security_optional = HTTPBearer(auto_error=False)
 
+# Recently loaded users keyed by id; bounds staleness of is_active and profile fields
+_user_cache: TTLCache[User] = TTLCache(maxsize=10_000, ttl=60)
+
+
+async def _load_user(session: AsyncSession, user_id: str) -> Optional[User]:
+    """Fetch a user by id, serving repeat lookups from the in-process cache."""
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    try:
+        pk = uuid.UUID(user_id)
+    except ValueError:
+        return None
+    # Primary-key lookup goes through the session identity map before the DB
+    user = await session.get(User, pk)
+    if user is not None:
+        # Detach so the cached instance is never refreshed or flushed by another session
+        session.expunge(user)
+        _user_cache.set(user_id, user)
+    return user
+
+
+def invalidate_cached_user(user_id) -> None:
+    """Drop a user from the cache after their account state changes."""
+    _user_cache.pop(str(user_id))
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -27,8 +55,7 @@ async def get_current_user(
             detail="Invalid authentication credentials",
         )
     
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await _load_user(session, user_id)
     
     if not user:
         raise HTTPException(
@@ -60,8 +87,7 @@ async def get_current_user_optional(
     if not user_id:
         return None
 
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await _load_user(session, user_id)
 
     if not user or not user.is_active:
         return None
@@ -1,24 +1,40 @@
 """Authentication routes."""
+import asyncio
 from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 from passlib.context import CryptContext
 
+from app.db.functions import utcnow
 from app.db.session import get_async_session
 from app.db.models import User, RefreshToken
 from app.auth.schemas import UserCreate, LoginRequest, TokenResponse, RefreshTokenRequest
+from app.auth.deps import invalidate_cached_user, security_optional
 from app.auth.token_service import (
     create_access_token,
     create_refresh_token,
+    revoke_access_token,
     verify_refresh_token,
     hash_token,
+    token_hash_candidates,
 )
 from app.services.turnstile import verify_turnstile_token
 from app.services.mailer import send_verification_email
 
 router = APIRouter(prefix="/auth", tags=["auth"])
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Explicit Argon2id work factor (RFC 9106 second recommended option) rather than
+# library defaults. Hashing and verifying run in a worker thread so the event
+# loop keeps serving other requests while the CPU-bound KDF runs.
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__time_cost=3,
+    argon2__memory_cost=65536,
+    argon2__parallelism=4,
+)
 
 
 @router.post("/register", status_code=201)
@@ -28,24 +44,34 @@ async def register(
     session: AsyncSession = Depends(get_async_session),
 ):
     """Register a new user with Turnstile verification."""
-    # Verify Turnstile token
+    # Verify Turnstile token while the uniqueness check runs
     client_ip = request.client.host if request.client else None
-    is_valid = await verify_turnstile_token(user_data.turnstile_token, client_ip)
-    if not is_valid:
+    turnstile_task = asyncio.create_task(
+        verify_turnstile_token(user_data.turnstile_token, client_ip)
+    )
+    try:
+        # Username and email collisions in one round trip
+        result = await session.execute(
+            select(User.username, User.email).where(
+                (User.username == user_data.username) | (User.email == user_data.email)
+            )
+        )
+        existing = result.all()
+    except BaseException:
+        turnstile_task.cancel()
+        raise
+
+    # Only report collisions to callers that passed the challenge
+    if not await turnstile_task:
         raise HTTPException(status_code=400, detail="Invalid Turnstile token")
     
-    # Check if username exists
-    result = await session.execute(select(User).where(User.username == user_data.username))
-    if result.scalar_one_or_none():
+    if any(row.username == user_data.username for row in existing):
         raise HTTPException(status_code=400, detail="Username already exists")
-    
-    # Check if email exists
-    result = await session.execute(select(User).where(User.email == user_data.email))
-    if result.scalar_one_or_none():
+    if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
-    hashed_password = pwd_context.hash(user_data.password)
+    hashed_password = await asyncio.to_thread(pwd_context.hash, user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -75,15 +101,16 @@ async def login(
     if not is_valid:
         raise HTTPException(status_code=400, detail="Invalid Turnstile token")
     
-    # Find user by username or email
-    result = await session.execute(
-        select(User).where(
-            (User.username == login_data.username) | (User.email == login_data.username)
-        )
-    )
+    # Find user by username, then by email; each is a single unique-index probe
+    result = await session.execute(select(User).where(User.username == login_data.username))
     user = result.scalar_one_or_none()
+    if user is None and "@" in login_data.username:
+        result = await session.execute(select(User).where(User.email == login_data.username))
+        user = result.scalar_one_or_none()
     
-    if not user or not pwd_context.verify(login_data.password, user.hashed_password):
+    if not user or not await asyncio.to_thread(
+        pwd_context.verify, login_data.password, user.hashed_password
+    ):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     if not user.is_active:
@@ -124,33 +151,36 @@ async def refresh(
     
     user_id, jti = result
     
-    # Check if token exists and not revoked
-    token_hash = hash_token(refresh_data.refresh_token)
+    # Revoke the presented token, returning its row only if it was still live.
+    # revoked_at comes from the database clock; now is reused for expiry math.
+    now = datetime.utcnow()
     db_result = await session.execute(
-        select(RefreshToken).where(
-            RefreshToken.token_hash == token_hash,
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash.in_(token_hash_candidates(refresh_data.refresh_token)),
             RefreshToken.jti == jti,
             RefreshToken.revoked_at.is_(None),
         )
+        .values(revoked_at=utcnow())
+        .returning(RefreshToken.user_id, RefreshToken.expires_at)
+        .execution_options(synchronize_session=False)
     )
-    db_token = db_result.scalar_one_or_none()
+    db_token = db_result.one_or_none()
     
     if not db_token:
         raise HTTPException(status_code=401, detail="Token revoked or not found")
     
-    if db_token.expires_at < datetime.utcnow():
+    # Raising before commit rolls the revocation back
+    if db_token.expires_at < now:
         raise HTTPException(status_code=401, detail="Token expired")
     
-    # Revoke old token
-    db_token.revoked_at = datetime.utcnow()
-    
     # Create new tokens
     new_access_token = create_access_token(user_id)
     new_refresh_token, new_jti = create_refresh_token(user_id)
     
     # Store new refresh token
     new_token_hash = hash_token(new_refresh_token)
-    expires_at = datetime.utcnow() + timedelta(days=7)
+    expires_at = now + timedelta(days=7)
     new_db_token = RefreshToken(
         user_id=db_token.user_id,
         token_hash=new_token_hash,
@@ -170,21 +200,25 @@ async def refresh(
 async def logout(
     refresh_data: RefreshTokenRequest,
     session: AsyncSession = Depends(get_async_session),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_optional),
 ):
-    """Logout by revoking refresh token."""
-    token_hash = hash_token(refresh_data.refresh_token)
-    
+    """Logout by revoking the refresh token and, if sent, the bearer access token."""
+    if credentials is not None:
+        revoke_access_token(credentials.credentials)
+
     result = await session.execute(
         select(RefreshToken).where(
-            RefreshToken.token_hash == token_hash,
+            RefreshToken.token_hash.in_(token_hash_candidates(refresh_data.refresh_token)),
             RefreshToken.revoked_at.is_(None),
         )
     )
     db_token = result.scalar_one_or_none()
     
     if db_token:
-        db_token.revoked_at = datetime.utcnow()
+        # Stamped by the database clock so replicas agree on revocation times
+        db_token.revoked_at = utcnow()
         await session.commit()
+        invalidate_cached_user(db_token.user_id)
     
     return {"message": "Logged out successfully"}
 
@@ -229,5 +263,6 @@ async def confirm_verification(
     
     user.is_verified = True
     await session.commit()
+    invalidate_cached_user(user.id)
     
     return {"message": "Email verified successfully"}
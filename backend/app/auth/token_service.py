@@ -1,10 +1,29 @@
 """JWT token service for access and refresh tokens."""
 from datetime import datetime, timedelta
 from typing import Optional
+import time
 import uuid
 import hashlib
-from jose import JWTError, jwt
+import jwt
 from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+
+# HMAC keys encoded once rather than on every encode/decode
+_ACCESS_SECRET = settings.JWT_SECRET_KEY.encode()
+_REFRESH_SECRET = settings.JWT_REFRESH_SECRET_KEY.encode()
+_ALGORITHMS = ["HS256"]
+_ACCESS_DECODE_OPTIONS = {"require": ["exp", "sub", "type"]}
+_REFRESH_DECODE_OPTIONS = {"require": ["exp", "sub", "jti", "type"]}
+
+# Verified access tokens -> user_id, so repeat requests skip HMAC and JSON decoding.
+# Entries never outlive the token's own exp claim.
+_access_token_cache: TTLCache[str] = TTLCache(maxsize=10_000, ttl=60)
+
+# Access tokens ended by logout, kept until their exp claim passes. Checked
+# before the cache above, so a revoked token is refused on a cache hit too.
+_revoked_access_tokens: TTLCache[bool] = TTLCache(
+    maxsize=10_000, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
 
 
 def create_access_token(user_id: str) -> str:
@@ -13,9 +32,12 @@ def create_access_token(user_id: str) -> str:
     to_encode = {
         "sub": str(user_id),
         "exp": expire,
+        # Makes every token distinct, so revoking one at logout never matches
+        # another issued to the same user within the same second
+        "jti": uuid.uuid4().hex,
         "type": "access"
     }
-    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm="HS256")
+    return jwt.encode(to_encode, _ACCESS_SECRET, algorithm="HS256")
 
 
 def create_refresh_token(user_id: str) -> tuple[str, str]:
@@ -28,32 +50,75 @@ def create_refresh_token(user_id: str) -> tuple[str, str]:
         "jti": jti,
         "type": "refresh"
     }
-    token = jwt.encode(to_encode, settings.JWT_REFRESH_SECRET_KEY, algorithm="HS256")
+    token = jwt.encode(to_encode, _REFRESH_SECRET, algorithm="HS256")
     return token, jti
 
 
 def verify_access_token(token: str) -> Optional[str]:
     """Verify access token and return user_id."""
+    if _revoked_access_tokens.get(token):
+        return None
+    user_id = _access_token_cache.get(token)
+    if user_id is not None:
+        return user_id
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(token, _ACCESS_SECRET, algorithms=_ALGORITHMS, options=_ACCESS_DECODE_OPTIONS)
         if payload.get("type") != "access":
             return None
-        return payload.get("sub")
-    except JWTError:
+        user_id = payload.get("sub")
+        exp = payload.get("exp")
+        if user_id and exp is not None:
+            _access_token_cache.set(token, user_id, ttl=exp - time.time())
+        return user_id
+    except jwt.PyJWTError:
         return None
 
 
+def revoke_access_token(token: str) -> None:
+    """
+    Refuse ``token`` for the rest of its lifetime and drop its cached verification.
+
+    Revocation lives in this process's memory. Other API worker processes
+    keep accepting the token until its exp claim, as stateless JWTs always
+    were before this cache existed.
+    """
+    _access_token_cache.pop(token)
+    try:
+        payload = jwt.decode(token, _ACCESS_SECRET, algorithms=_ALGORITHMS, options=_ACCESS_DECODE_OPTIONS)
+    except jwt.PyJWTError:
+        # Invalid or expired tokens are refused already
+        return
+    _revoked_access_tokens.set(token, True, ttl=payload["exp"] - time.time())
+
+
 def verify_refresh_token(token: str) -> Optional[tuple[str, str]]:
     """Verify refresh token and return (user_id, jti)."""
     try:
-        payload = jwt.decode(token, settings.JWT_REFRESH_SECRET_KEY, algorithms=["HS256"])
+        payload = jwt.decode(
+            token, _REFRESH_SECRET, algorithms=_ALGORITHMS, options=_REFRESH_DECODE_OPTIONS
+        )
         if payload.get("type") != "refresh":
             return None
         return payload.get("sub"), payload.get("jti")
-    except JWTError:
+    except jwt.PyJWTError:
         return None
 
 
+# Stored hashes are version-prefixed; unprefixed values are legacy SHA-256 hex digests.
+_TOKEN_HASH_PREFIX = "b2:"
+
+
 def hash_token(token: str) -> str:
     """Hash token for storage in database."""
-    return hashlib.sha256(token.encode()).hexdigest()
+    return _TOKEN_HASH_PREFIX + hashlib.blake2b(token.encode(), digest_size=20).hexdigest()
+
+
+def token_hash_candidates(token: str) -> tuple[str, str]:
+    """
+    Return every stored form a token's hash may take.
+
+    Refresh tokens issued before the switch to BLAKE2b are stored as SHA-256
+    hex. The legacy form can be dropped once REFRESH_TOKEN_EXPIRE_DAYS have
+    passed since the switch.
+    """
+    return hash_token(token), hashlib.sha256(token.encode()).hexdigest()
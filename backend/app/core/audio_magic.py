@@ -0,0 +1,44 @@
+"""Audio container detection from leading magic bytes."""
+
+from typing import Optional
+
+# Number of leading bytes needed by detect()
+HEADER_SIZE = 16
+
+
+def detect(head: bytes) -> Optional[str]:
+    """
+    Detect the audio container format from the first bytes of a file.
+
+    Args:
+        head: Leading bytes of the file (at least HEADER_SIZE for best results)
+
+    Returns:
+        Canonical format name (wav, aiff, flac, mp3, ogg, webm, m4a, aac)
+        or None if unknown
+    """
+    if len(head) < 4:
+        return None
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        # EBML header: WebM, as recorded by browsers' MediaRecorder, or Matroska
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "m4a"
+    if head[:3] == b"ID3":
+        return "mp3"
+    if head[0] == 0xFF:
+        # ADTS AAC frames share the 12-bit sync word with MPEG audio but
+        # always carry layer bits 00; MP3 frames never do.
+        if head[1] & 0xF6 == 0xF0:
+            return "aac"
+        if head[1] & 0xE0 == 0xE0:
+            return "mp3"
+    return None
@@ -1,11 +1,42 @@
 """Application configuration management."""
 
+from functools import cached_property, lru_cache
 from typing import List
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
 
-class Settings(BaseSettings):
+class _EnvSettings(BaseSettings):
+    """Shared environment/.env loading for the settings groups."""
+
+    class Config:
+        """Pydantic config."""
+        env_file = ".env"
+        env_file_encoding = "utf-8"
+        case_sensitive = True
+        # .env holds variables for every group; each group reads only its own
+        extra = "ignore"
+
+
+class TurnstileSettings(_EnvSettings):
+    """Cloudflare Turnstile settings, loaded on first use."""
+
+    TURNSTILE_SECRET_KEY: str = Field(..., description="Cloudflare Turnstile secret key")
+
+
+class EmailSettings(_EnvSettings):
+    """Verification email settings, loaded on first use."""
+
+    SMTP_HOST: str = Field(default="smtp.gmail.com", description="SMTP server host")
+    SMTP_PORT: int = Field(default=587, description="SMTP server port")
+    SMTP_USER: str = Field(..., description="SMTP username")
+    SMTP_PASSWORD: str = Field(..., description="SMTP password")
+    VERIFICATION_TOKEN_EXPIRE_MINUTES: int = Field(default=60, description="Email verification token expiry")
+    VERIFICATION_EMAIL_FROM: str = Field(default="noreply@voiceclone.ai", description="Sender email address")
+    FRONTEND_URL: str = Field(default="http://localhost:3000", description="Frontend URL for email links")
+
+
+class Settings(_EnvSettings):
     """Application settings loaded from environment variables."""
 
     # Application
@@ -32,6 +63,10 @@ class Settings(BaseSettings):
         default=300,
         description="Request timeout in seconds"
     )
+    SOVITS_MAX_CONCURRENCY: int = Field(
+        default=4,
+        description="Maximum simultaneous requests sent to GPT-SoVITS",
+    )
 
     # Queue / Background Jobs
     REDIS_URL: str = Field(
@@ -42,10 +77,18 @@ class Settings(BaseSettings):
         default="cover",
         description="Celery queue name for cover generation jobs",
     )
+    MAINTENANCE_QUEUE_NAME: str = Field(
+        default="maintenance",
+        description="Celery queue name for I/O-bound periodic tasks (asset cleanup)",
+    )
     CELERY_TASK_ALWAYS_EAGER: bool = Field(
         default=False,
         description="Run Celery tasks locally in request process (testing only)",
     )
+    CELERY_TASK_EAGER_PROPAGATES: bool = Field(
+        default=False,
+        description="Re-raise task exceptions to the caller when running eagerly (testing only)",
+    )
 
     # Cover pipeline storage & limits
     COVER_ASSET_ROOT: str = Field(
@@ -56,10 +99,21 @@ class Settings(BaseSettings):
         default=["wav", "mp3", "flac", "ogg", "m4a", "aac"],
         description="Allowed audio extensions for cover endpoints",
     )
+    COVER_MAX_UPLOAD_SIZE: int = Field(
+        default=100 * 1024 * 1024,  # 100MB
+        description="Maximum size in bytes of each file uploaded to the cover endpoint",
+    )
     COVER_MAX_DURATION_SECONDS: int = Field(
         default=8 * 60,
         description="Maximum song duration allowed for one cover job",
     )
+    COVER_ACCEL_REDIRECT_PREFIX: str = Field(
+        default="",
+        description=(
+            "Internal nginx location aliased to COVER_ASSET_ROOT (e.g. /_protected_cover/). "
+            "When set, result downloads are handed to nginx via X-Accel-Redirect"
+        ),
+    )
     COVER_RESULT_TTL_HOURS: int = Field(
         default=24,
         description="Recommended retention for generated cover results",
@@ -93,6 +147,14 @@ class Settings(BaseSettings):
             "{output_vocal}, {model_id}, {pitch_shift}"
         ),
     )
+    COVER_IN_PROCESS: bool = Field(
+        default=False,
+        description=(
+            "Call the separate/infer scripts inside the worker instead of via the command "
+            "templates, keeping models loaded between jobs. The worker must run under the "
+            "GPT-SoVITS Python environment."
+        ),
+    )
 
     # File Upload
     MAX_UPLOAD_SIZE: int = Field(
@@ -115,6 +177,10 @@ class Settings(BaseSettings):
         default="sqlite+aiosqlite:///./voice_clone.db",
         description="Database connection URL"
     )
+    SQL_ECHO: bool = Field(default=False, description="Log every SQL statement (independent of DEBUG)")
+    DB_POOL_SIZE: int = Field(default=20, ge=1, description="Persistent connections kept in the DB pool")
+    DB_MAX_OVERFLOW: int = Field(default=20, ge=0, description="Extra connections allowed above the pool size")
+    DB_POOL_RECYCLE: int = Field(default=1800, description="Seconds before a pooled connection is replaced")
 
     # JWT Authentication
     JWT_SECRET_KEY: str = Field(..., description="Secret key for JWT access tokens")
@@ -122,24 +188,28 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, description="Access token expiry in minutes")
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7, description="Refresh token expiry in days")
 
-    # Cloudflare Turnstile
-    TURNSTILE_SECRET_KEY: str = Field(..., description="Cloudflare Turnstile secret key")
+    # Groups only some endpoints need; validated on first access, so the app
+    # starts (and unrelated endpoints work) without SMTP or Turnstile configured
+    @cached_property
+    def turnstile(self) -> TurnstileSettings:
+        """Cloudflare Turnstile settings."""
+        return TurnstileSettings()
 
-    # Email Configuration
-    SMTP_HOST: str = Field(default="smtp.gmail.com", description="SMTP server host")
-    SMTP_PORT: int = Field(default=587, description="SMTP server port")
-    SMTP_USER: str = Field(..., description="SMTP username")
-    SMTP_PASSWORD: str = Field(..., description="SMTP password")
-    VERIFICATION_TOKEN_EXPIRE_MINUTES: int = Field(default=60, description="Email verification token expiry")
-    VERIFICATION_EMAIL_FROM: str = Field(default="noreply@voiceclone.ai", description="Sender email address")
-    FRONTEND_URL: str = Field(default="http://localhost:3000", description="Frontend URL for email links")
+    @cached_property
+    def email(self) -> EmailSettings:
+        """Verification email settings."""
+        return EmailSettings()
 
-    class Config:
-        """Pydantic config."""
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = True
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings, parsing the environment and .env once.
+
+    Usable directly or as a FastAPI dependency (``Depends(get_settings)``).
+    """
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
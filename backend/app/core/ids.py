@@ -0,0 +1,22 @@
+"""Identifier generation helpers."""
+
+import os
+import time
+import uuid
+
+
+def _uuid7_fallback() -> uuid.UUID:
+    """Build an RFC 9562 UUIDv7 from the current Unix time in milliseconds."""
+    unix_ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (unix_ts_ms & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76  # version
+    value |= ((rand >> 62) & 0xFFF) << 64  # rand_a
+    value |= 0b10 << 62  # variant
+    value |= rand & 0x3FFFFFFFFFFFFFFF  # rand_b
+    return uuid.UUID(int=value)
+
+
+# Time-ordered UUIDs keep new primary keys clustered at the end of B-tree indexes.
+# Python 3.14+ ships uuid.uuid7(); older interpreters use the local fallback.
+uuid7 = getattr(uuid, "uuid7", _uuid7_fallback)
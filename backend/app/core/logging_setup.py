@@ -0,0 +1,41 @@
+"""Logging configuration."""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: str) -> None:
+    """
+    Route log records through a queue to a background writer thread.
+
+    Request handlers only enqueue records; formatting and stream I/O (and
+    the handler lock) happen on the listener thread. Like
+    ``logging.basicConfig``, this does nothing if the root logger already
+    has handlers.
+
+    Args:
+        level: Root log level name, e.g. "INFO"
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root.setLevel(getattr(logging, level))
+    root.addHandler(QueueHandler(log_queue))
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Drain anything still queued when the process exits
+    atexit.register(_listener.stop)
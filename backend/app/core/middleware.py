@@ -0,0 +1,132 @@
+"""ASGI middleware."""
+
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Allowance for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Response media types worth compressing; audio bodies are already dense
+COMPRESSIBLE_MEDIA_TYPES: Tuple[str, ...] = ("application/json", "text/")
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized uploads from their Content-Length header.
+
+    FastAPI parses the whole multipart body before dependencies or handlers
+    run, so this check has to happen at the ASGI layer to avoid receiving
+    the body at all. Requests without Content-Length (chunked uploads) pass
+    through and are limited while streaming by ``app.core.uploads``.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        """
+        Args:
+            app: Wrapped ASGI application
+            limits: Maximum body size in bytes keyed by path prefix
+        """
+        self.app = app
+        # Longest prefix first so more specific routes win
+        self.limits = sorted(limits.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limit_for(self, path: str) -> Optional[int]:
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limit = self._limit_for(scope["path"])
+            if limit is not None:
+                for name, value in scope["headers"]:
+                    if name == b"content-length":
+                        if value.isdigit() and int(value) > limit + MULTIPART_OVERHEAD_BYTES:
+                            response = JSONResponse(
+                                status_code=413,
+                                content={
+                                    "detail": f"Request too large. Maximum size: {limit / 1024 / 1024}MB"
+                                },
+                            )
+                            await response(scope, receive, send)
+                            return
+                        break
+        await self.app(scope, receive, send)
+
+
+class _TextOnlyGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if not content_type.startswith(COMPRESSIBLE_MEDIA_TYPES):
+                # Reuse the responder's pass-through path for pre-encoded bodies
+                self.content_encoding_set = True
+
+
+class TextGZipMiddleware(GZipMiddleware):
+    """
+    Gzip JSON and text responses only.
+
+    Starlette's GZipMiddleware compresses every body above ``minimum_size``,
+    which would buffer and recompress WAV downloads and strip their
+    Content-Length. This variant passes any other media type through as-is.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _TextOnlyGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class RequestLoggingMiddleware:
+    """
+    Log one line per HTTP request once its response has been sent.
+
+    A plain ASGI wrapper rather than ``@app.middleware("http")``: Starlette's
+    BaseHTTPMiddleware runs each request through an extra task and memory
+    stream and re-wraps streaming bodies. Here only ``send`` is wrapped, to
+    read the status code.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        start_ns = time.perf_counter_ns()
+        status_code = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        # %-args are only formatted if a handler emits the record
+        logger.info(
+            "%s %s - Status: %d - Duration: %.1fms",
+            scope["method"],
+            scope["path"],
+            status_code,
+            (time.perf_counter_ns() - start_ns) / 1e6,
+        )
@@ -0,0 +1,112 @@
+"""Helpers for streaming multipart uploads to disk and files back out."""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import aiofiles
+from fastapi import HTTPException, UploadFile, status
+
+from app.core import audio_magic
+
+# Read uploads in 1MB chunks so memory use stays flat regardless of file size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Maximum size: {max_bytes / 1024 / 1024}MB",
+    )
+
+
+async def sniff_upload_format(upload: UploadFile) -> Optional[str]:
+    """
+    Detect an upload's audio format from its magic bytes.
+
+    The upload is rewound afterwards so it can be streamed from the start.
+
+    Args:
+        upload: Incoming multipart upload
+
+    Returns:
+        Canonical format name, or None if the header is not recognized
+    """
+    head = await upload.read(audio_magic.HEADER_SIZE)
+    await upload.seek(0)
+    return audio_magic.detect(head)
+
+
+async def stream_upload_to_path(
+    upload: UploadFile,
+    dest: Path,
+    max_bytes: Optional[int] = None,
+) -> int:
+    """
+    Copy an upload to ``dest`` chunk by chunk.
+
+    Args:
+        upload: Incoming multipart upload
+        dest: Destination file path (parent directory must exist)
+        max_bytes: Optional size limit enforced while streaming
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        HTTPException: If the upload exceeds ``max_bytes``
+    """
+    written = 0
+    try:
+        async with aiofiles.open(dest, "wb") as f:
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if max_bytes is not None and written > max_bytes:
+                    raise _too_large(max_bytes)
+                await f.write(chunk)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+    return written
+
+
+async def stream_to_tempfile(upload: UploadFile, max_bytes: int) -> Path:
+    """
+    Stream an upload into a named temporary file.
+
+    The temporary file keeps the upload's extension so that decoders can
+    infer the container format. Callers own the file and must unlink it.
+
+    Args:
+        upload: Incoming multipart upload
+        max_bytes: Size limit enforced while streaming
+
+    Returns:
+        Path to the temporary file
+
+    Raises:
+        HTTPException: If the upload exceeds ``max_bytes``
+    """
+    suffix = Path(upload.filename or "").suffix
+    fd, name = tempfile.mkstemp(suffix=suffix, prefix="upload_")
+    os.close(fd)
+    path = Path(name)
+    await stream_upload_to_path(upload, path, max_bytes)
+    return path
+
+
+async def iter_file(path: Path, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Yield a file's contents in chunks for use with ``StreamingResponse``.
+
+    Args:
+        path: File to read
+        chunk_size: Bytes per chunk
+
+    Yields:
+        Successive chunks of the file
+    """
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(chunk_size):
+            yield chunk
@@ -4,4 +4,7 @@ from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
     """Base class for all database models."""
-    pass
+
+    # Fetch server-generated values (timestamps) in the same INSERT/UPDATE via
+    # RETURNING, so reading them afterwards never triggers a lazy refresh
+    __mapper_args__ = {"eager_defaults": True}
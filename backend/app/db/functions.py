@@ -0,0 +1,34 @@
+"""SQL functions shared by the models."""
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import DateTime
+
+
+class utcnow(FunctionElement):
+    """
+    Current UTC time as a naive timestamp, evaluated by the database.
+
+    Used for column defaults so timestamps are stamped in the INSERT/UPDATE
+    statement itself rather than by a Python call per row.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utcnow, "postgresql")
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP only has second precision. Pad %f (SS.SSS) to the
+    # six-digit form SQLAlchemy writes, so stored values sort and compare
+    # correctly against bound datetime parameters (e.g. keyset cursors).
+    return "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now') || '000')"
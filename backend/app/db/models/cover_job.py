@@ -3,22 +3,37 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import uuid
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text, Uuid
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Index, Integer, String, Text, Uuid
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.ids import uuid7
 from app.db.base import Base
+from app.db.functions import utcnow
+
+if TYPE_CHECKING:
+    from app.db.models.user import User
 
 
 class CoverJob(Base):
     """Model for asynchronous AI cover generation jobs."""
 
     __tablename__ = "cover_jobs"
+    __table_args__ = (
+        # Serves a user's jobs filtered by status in creation order; its
+        # user_id prefix also covers plain per-user lookups
+        Index("ix_cover_jobs_user_status_created", "user_id", "status", "created_at"),
+    )
 
-    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
-    user_id: Mapped[Optional[uuid.UUID]] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
+    # Native 16-byte UUID on PostgreSQL; SQLite falls back to CHAR(32)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid(as_uuid=True, native_uuid=True), primary_key=True, default=uuid7)
+    user_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    # lazy="raise": load explicitly with selectinload() instead of per-row I/O
+    user: Mapped[Optional["User"]] = relationship(back_populates="cover_jobs", lazy="raise")
 
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued", index=True)
     stage: Mapped[str] = mapped_column(String(32), nullable=False, default="queued")
@@ -34,10 +49,17 @@ class CoverJob(Base):
     output_vocal_path: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     output_inst_path: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     output_mix_path: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Mix location relative to the job directory (POSIX), e.g. "output/final.wav"
+    output_mix_filename: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    # Stat of the final mix, captured once when the job succeeds (results are immutable)
+    output_size_bytes: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    output_mtime: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=utcnow(), server_default=utcnow(), nullable=False
+    )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+        DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow(), nullable=False
     )
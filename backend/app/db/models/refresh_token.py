@@ -1,23 +1,34 @@
 """Refresh token database model."""
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import uuid
-from sqlalchemy import String, DateTime, ForeignKey, Integer
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
+from app.db.functions import utcnow
+
+if TYPE_CHECKING:
+    from app.db.models.user import User
 
 
 class RefreshToken(Base):
     """Refresh token model for JWT token rotation."""
     
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Serves "active tokens for a user" (expires_at in the future); its
+        # user_id prefix also covers the foreign key
+        Index("ix_refresh_tokens_user_expires", "user_id", "expires_at"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
+    user: Mapped["User"] = relationship(back_populates="refresh_tokens", lazy="raise")
+    # "b2:" + 40-hex BLAKE2b-160, or 64-hex SHA-256 for tokens issued before it
     token_hash: Mapped[str] = mapped_column(
-        String(255), unique=True, nullable=False, index=True
+        String(64), unique=True, nullable=False, index=True
     )
     jti: Mapped[str] = mapped_column(
         String(255), unique=True, nullable=False, index=True
@@ -25,5 +36,5 @@ class RefreshToken(Base):
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     revoked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, default=utcnow(), server_default=utcnow(), nullable=False
     )
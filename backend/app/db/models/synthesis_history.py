@@ -2,18 +2,24 @@
 from datetime import datetime
 from typing import Optional
 import uuid
-from sqlalchemy import String, Float, Text, DateTime, ForeignKey, Uuid
+from sqlalchemy import String, Float, Text, DateTime, ForeignKey, Index, Uuid
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
+from app.db.functions import utcnow
 
 
 class SynthesisHistory(Base):
     """Model for tracking synthesis job history."""
 
     __tablename__ = "synthesis_history"
+    __table_args__ = (
+        # Serves "latest history for a user" and keyset pages on (created_at, id);
+        # scanned backwards for DESC order
+        Index("ix_synthesis_history_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        Uuid, primary_key=True, default=uuid.uuid4
+        Uuid(as_uuid=True, native_uuid=True), primary_key=True, default=uuid.uuid4
     )
 
     user_id: Mapped[Optional[uuid.UUID]] = mapped_column(
@@ -53,5 +59,5 @@ class SynthesisHistory(Base):
     )
 
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, default=utcnow(), server_default=utcnow(), nullable=False
     )
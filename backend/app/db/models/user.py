@@ -1,10 +1,15 @@
 """User database model."""
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 from sqlalchemy import String, Boolean, DateTime
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID
 from app.db.base import Base
+from app.db.functions import utcnow
+
+if TYPE_CHECKING:
+    from app.db.models.cover_job import CoverJob
+    from app.db.models.refresh_token import RefreshToken
 
 
 class User(SQLAlchemyBaseUserTableUUID, Base):
@@ -17,8 +22,18 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
         String(50), unique=True, nullable=False, index=True
     )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, default=utcnow(), server_default=utcnow(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+        DateTime, default=utcnow(), server_default=utcnow(), onupdate=utcnow(), nullable=False
+    )
+
+    # Never loaded implicitly (users are cached detached, and implicit loads
+    # would be N+1 queries); use selectinload() where a route needs them.
+    # passive_deletes leaves child rows to the foreign keys' ON DELETE rules.
+    cover_jobs: Mapped[List["CoverJob"]] = relationship(
+        back_populates="user", lazy="raise", passive_deletes=True
+    )
+    refresh_tokens: Mapped[List["RefreshToken"]] = relationship(
+        back_populates="user", lazy="raise", passive_deletes=True
     )
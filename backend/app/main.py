@@ -1,28 +1,60 @@
 """FastAPI application entry point."""
 
+import asyncio
 import logging
 import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, status
+from typing import Optional
+from fastapi import FastAPI, Request, Response, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 
-from app.core.config import settings
+from app.core.config import get_settings
+from app.core.logging_setup import configure_logging
+from app.core.middleware import RequestLoggingMiddleware, TextGZipMiddleware, UploadSizeLimitMiddleware
+from app.db.session import QUERY_CACHE_SIZE, warm_pool
 from app.api.routes import voice, history, audio_tools, cover
 from app.auth.routers import auth, users
 from app.models.schemas import ErrorResponse, HealthResponse
+from app.services import mailer, turnstile
+
+settings = get_settings()
 
 # Configure logging
-logging.basicConfig(
-    level=getattr(logging, settings.LOG_LEVEL),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+configure_logging(settings.LOG_LEVEL)
 
 logger = logging.getLogger(__name__)
 
-# Track application start time
-start_time = time.time()
+# Track application start time (monotonic, so clock adjustments don't skew uptime)
+APP_START_NS = time.monotonic_ns()
+
+# Probes may hit /health every few seconds per replica; reuse the upstream
+# result briefly and let concurrent probes share one check
+_HEALTH_TTL_NS = 2_000_000_000
+_health_lock = asyncio.Lock()
+_health_checked_ns: Optional[int] = None
+_health_available = False
+
+
+async def _sovits_available() -> bool:
+    """GPT-SoVITS availability, re-checked at most once per ``_HEALTH_TTL_NS``."""
+    global _health_checked_ns, _health_available
+
+    def fresh() -> bool:
+        return _health_checked_ns is not None and time.monotonic_ns() - _health_checked_ns < _HEALTH_TTL_NS
+
+    if fresh():
+        return _health_available
+    async with _health_lock:
+        # Another probe may have refreshed the result while this one waited
+        if not fresh():
+            from app.services.sovits_client import sovits_client
+
+            _health_available = await sovits_client.health_check()
+            _health_checked_ns = time.monotonic_ns()
+        return _health_available
 
 
 @asynccontextmanager
@@ -30,8 +62,16 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"GPT-SoVITS URL: {settings.SOVITS_BASE_URL}")
+    logger.info(f"SQL compiled-query cache size: {QUERY_CACHE_SIZE}")
+    logger.info(f"Opened {await warm_pool()} pooled database connections")
     yield
     logger.info("Shutting down application")
+    # Imported here, like the health check, to keep it off the module import path
+    from app.services.sovits_client import sovits_client
+
+    await sovits_client.aclose()
+    await turnstile.aclose()
+    await mailer.aclose()
 
 
 # Create FastAPI application
@@ -43,6 +83,21 @@ app = FastAPI(
     redoc_url="/redoc",
     openapi_url="/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Compress JSON/text bodies (tokens, history pages); audio passes through untouched
+app.add_middleware(TextGZipMiddleware, minimum_size=200, compresslevel=6)
+
+# Reject oversized uploads before the body is read. Registered before CORS
+# so that CORS stays outermost and 413 responses still carry CORS headers.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        f"{settings.API_V1_PREFIX}/audio": settings.MAX_UPLOAD_SIZE,
+        # Reference voice + song
+        f"{settings.API_V1_PREFIX}/cover/jobs": 2 * settings.COVER_MAX_UPLOAD_SIZE,
+    },
 )
 
 # Configure CORS
@@ -54,41 +109,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request logging (outermost, so durations include every other middleware)
+app.add_middleware(RequestLoggingMiddleware)
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests."""
-    start = time.time()
 
-    # Log request
-    logger.info(f"Request: {request.method} {request.url.path}")
-
-    # Process request
-    response = await call_next(request)
+# Exception handlers
+def _error_response(status_code: int, body: str) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json")
 
-    # Log response
-    duration = time.time() - start
-    logger.info(
-        f"Response: {request.method} {request.url.path} "
-        f"- Status: {response.status_code} - Duration: {duration:.3f}s"
-    )
 
-    return response
+# The 500 body never varies; serialize it once
+_INTERNAL_ERROR_BODY = ErrorResponse(
+    error="internal_error",
+    message="An unexpected error occurred",
+).model_dump_json()
 
 
-# Exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors."""
-    logger.warning(f"Validation error: {exc.errors()}")
-    return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content=ErrorResponse(
+    errors = exc.errors()
+    logger.warning("Validation error: %s", errors)
+    return _error_response(
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        ErrorResponse(
             error="validation_error",
             message="Request validation failed",
-            details={"errors": exc.errors()},
-        ).model_dump(),
+            # Error inputs/context may hold bytes or exception objects
+            details={"errors": jsonable_encoder(errors)},
+        ).model_dump_json(),
     )
 
 
@@ -96,13 +145,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 async def general_exception_handler(request: Request, exc: Exception):
     """Handle unexpected errors."""
     logger.exception(f"Unexpected error: {exc}")
-    return JSONResponse(
-        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=ErrorResponse(
-            error="internal_error",
-            message="An unexpected error occurred",
-        ).model_dump(),
-    )
+    return _error_response(status.HTTP_500_INTERNAL_SERVER_ERROR, _INTERNAL_ERROR_BODY)
 
 
 # Include routers
@@ -140,10 +183,8 @@ async def health_check():
     Returns:
         Health status information
     """
-    from app.services.sovits_client import sovits_client
-
-    sovits_available = await sovits_client.health_check()
-    uptime = time.time() - start_time
+    sovits_available = await _sovits_available()
+    uptime = (time.monotonic_ns() - APP_START_NS) / 1e9
 
     # Determine overall status
     if sovits_available:
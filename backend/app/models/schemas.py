@@ -1,6 +1,8 @@
 """Pydantic schemas for request/response validation."""
 
+from datetime import datetime
 from typing import Optional, List
+import uuid
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 from enum import Enum
 
@@ -51,9 +53,10 @@ class SynthesizeRequest(BaseModel):
     @classmethod
     def validate_text(cls, v: str) -> str:
         """Validate text is not empty after stripping."""
-        if not v.strip():
+        stripped = v.strip()
+        if not stripped:
             raise ValueError("Text cannot be empty")
-        return v.strip()
+        return stripped
 
 
 class SynthesizeResponse(BaseModel):
@@ -166,9 +169,10 @@ class TTSRequest(BaseModel):
     @classmethod
     def validate_text(cls, v: str) -> str:
         """Validate text is not empty after stripping."""
-        if not v.strip():
+        stripped = v.strip()
+        if not stripped:
             raise ValueError("Text cannot be empty")
-        return v.strip()
+        return stripped
 
 
 class AudioInfoResponse(BaseModel):
@@ -205,6 +209,10 @@ class AudioInfoResponse(BaseModel):
     )
 
 
+_CONVERT_FORMATS: frozenset[str] = frozenset({"wav", "mp3", "flac", "ogg"})
+_CONVERT_FORMATS_MSG = "Format must be one of: " + ", ".join(sorted(_CONVERT_FORMATS))
+
+
 class AudioConvertRequest(BaseModel):
     """Request schema for audio format conversion."""
 
@@ -217,17 +225,18 @@ class AudioConvertRequest(BaseModel):
     @classmethod
     def validate_format(cls, v: str) -> str:
         """Validate target format is supported."""
-        allowed_formats = ['wav', 'mp3', 'flac', 'ogg']
         v_lower = v.lower()
-        if v_lower not in allowed_formats:
-            raise ValueError(f"Format must be one of: {', '.join(allowed_formats)}")
+        if v_lower not in _CONVERT_FORMATS:
+            raise ValueError(_CONVERT_FORMATS_MSG)
         return v_lower
 
 
 class HistoryItemResponse(BaseModel):
     """Response schema for a single history item."""
 
-    id: str = Field(
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID = Field(
         ...,
         description="Unique history item ID"
     )
@@ -272,9 +281,9 @@ class HistoryItemResponse(BaseModel):
         description="Error message if job failed"
     )
 
-    created_at: str = Field(
+    created_at: datetime = Field(
         ...,
-        description="Timestamp when job was created"
+        description="Timestamp when job was created (ISO 8601)"
     )
 
 
@@ -291,6 +300,11 @@ class HistoryListResponse(BaseModel):
         description="Total number of history items"
     )
 
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor for the next page, or null when there are no more items"
+    )
+
 
 class CoverJobStatusEnum(str, Enum):
     """Cover generation job statuses."""
@@ -335,8 +349,8 @@ class CoverJobStatusResponse(BaseModel):
     model_id: Optional[str] = Field(None, description="Model identifier used for inference")
     pitch_shift: int = Field(..., description="Pitch shift setting used by this job")
     error_message: Optional[str] = Field(None, description="Error message when failed")
-    created_at: str = Field(..., description="Creation time (ISO8601)")
-    updated_at: str = Field(..., description="Last update time (ISO8601)")
+    created_at: datetime = Field(..., description="Creation time (ISO8601)")
+    updated_at: datetime = Field(..., description="Last update time (ISO8601)")
 
 
 class CoverCancelResponse(BaseModel):
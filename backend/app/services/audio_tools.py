@@ -1,60 +1,269 @@
 """Audio processing tools service."""
-import io
+import asyncio
+import functools
 import logging
-from typing import Tuple
-from pydub import AudioSegment
+import os
+import tempfile
+import wave
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from pydub import AudioSegment
 
 logger = logging.getLogger(__name__)
 
+PathLike = Union[str, Path]
+
+# Parameter values treated as identity transforms
+SPEED_NOOP_TOLERANCE = 1e-6
+VOLUME_NOOP_TOLERANCE = 1e-9
+
+# Frames per block when applying gain to PCM WAV without decoding it whole
+_WAV_GAIN_BLOCK_FRAMES = 1 << 16
+
+# Sample widths with a NumPy dtype; 24-bit WAV is left to pydub
+_WAV_GAIN_WIDTHS = (1, 2, 4)
+
+# "fLaC" marker + metadata block header + STREAMINFO body
+_FLAC_STREAMINFO_END = 4 + 4 + 34
+
+
+@functools.cache
+def _audio_segment() -> "type[AudioSegment]":
+    """Import pydub on first use; importing it probes PATH for ffmpeg."""
+    from pydub import AudioSegment
+
+    return AudioSegment
+
+
+def is_noop_speed(speed_factor: float) -> bool:
+    """Return True if ``speed_factor`` leaves playback speed unchanged."""
+    return abs(speed_factor - 1.0) < SPEED_NOOP_TOLERANCE
+
 
-async def get_audio_info(audio_data: bytes) -> dict:
+def is_noop_volume(volume_db: float) -> bool:
+    """Return True if ``volume_db`` leaves the volume unchanged."""
+    return abs(volume_db) < VOLUME_NOOP_TOLERANCE
+
+
+def _export_to_tempfile(audio: "AudioSegment", fmt: str) -> Path:
+    """Export audio to a new temporary file; the caller must unlink it."""
+    fd, name = tempfile.mkstemp(suffix=f".{fmt}", prefix="audio_out_")
+    os.close(fd)
+    path = Path(name)
+    try:
+        # export() returns the handle it opened for the path; close it ourselves
+        audio.export(path, format=fmt).close()
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _scale_pcm(frames: bytes, width: int, factor: float) -> bytes:
     """
-    Extract audio information from audio data.
+    Multiply little-endian PCM samples by ``factor``, clipping to the sample range.
+
+    Rounds toward minus infinity like ``audioop.mul`` (which pydub uses), so
+    the output is byte-identical to pydub's gain.
+    """
+    import numpy as np
+
+    if width == 1:
+        # 8-bit WAV samples are unsigned; centre them on zero to scale
+        samples = np.frombuffer(frames, dtype=np.uint8).astype(np.float64) - 128.0
+        scaled = np.clip(np.floor(samples * factor), -128, 127) + 128.0
+        return scaled.astype(np.uint8).tobytes()
+    dtype = np.dtype(f"<i{width}")
+    limits = np.iinfo(dtype)
+    samples = np.frombuffer(frames, dtype=dtype).astype(np.float64)
+    scaled = np.clip(np.floor(samples * factor), limits.min, limits.max)
+    return scaled.astype(dtype).tobytes()
+
+
+def _wav_gain_to_tempfile(audio_path: PathLike, volume_db: float) -> Optional[Path]:
+    """
+    Apply gain to a PCM WAV file block by block with NumPy.
+
+    Scaling and clipping are vectorised over the raw frames, so memory stays
+    flat and no AudioSegment is built. Returns None for WAV variants this
+    path does not handle (float, extensible, 24-bit), leaving those to pydub.
+    """
+    factor = 10 ** (volume_db / 20)
+    fd, name = tempfile.mkstemp(suffix=".wav", prefix="audio_out_")
+    os.close(fd)
+    path = Path(name)
+    try:
+        with wave.open(str(audio_path), "rb") as src, wave.open(str(path), "wb") as dst:
+            width = src.getsampwidth()
+            if width not in _WAV_GAIN_WIDTHS:
+                raise wave.Error(f"unsupported sample width: {width}")
+            dst.setparams(src.getparams())
+            while frames := src.readframes(_WAV_GAIN_BLOCK_FRAMES):
+                dst.writeframesraw(_scale_pcm(frames, width, factor))
+    except wave.Error:
+        path.unlink(missing_ok=True)
+        return None
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def _probe_header(audio_path: PathLike, source_format: Optional[str]) -> Optional[Tuple[int, int, int]]:
+    """
+    Read ``(frames, sample_rate, channels)`` from a WAV or FLAC header.
+
+    Only the header is read, so the cost does not grow with duration.
+    Returns None for other formats or headers that lack the totals.
+    """
+    if source_format == "wav":
+        try:
+            with wave.open(str(audio_path), "rb") as src:
+                return src.getnframes(), src.getframerate(), src.getnchannels()
+        except wave.Error:
+            return None
+    if source_format == "flac":
+        with open(audio_path, "rb") as f:
+            head = f.read(_FLAC_STREAMINFO_END)
+        # STREAMINFO is always the first metadata block
+        if len(head) < _FLAC_STREAMINFO_END or head[:4] != b"fLaC" or head[4] & 0x7F != 0:
+            return None
+        packed = int.from_bytes(head[18:26], "big")
+        sample_rate = packed >> 44
+        channels = ((packed >> 41) & 0x7) + 1
+        frames = packed & 0xFFFFFFFFF
+        # A zero total means "unknown" (e.g. streamed encodes)
+        if not sample_rate or not frames:
+            return None
+        return frames, sample_rate, channels
+    return None
+
+
+# Blocking implementations. The async API below runs them with
+# asyncio.to_thread so decoding/encoding (and waits on ffmpeg) never block
+# the event loop.
+
+
+def _audio_info_sync(audio_path: PathLike, source_format: Optional[str]) -> dict:
+    header = _probe_header(audio_path, source_format)
+    if header is not None:
+        frames, sample_rate, channels = header
+        duration_seconds = frames / sample_rate
+    else:
+        audio = _audio_segment().from_file(audio_path, format=source_format)
+        duration_seconds = len(audio) / 1000.0
+        sample_rate, channels = audio.frame_rate, audio.channels
+
+    return {
+        "duration_seconds": duration_seconds,
+        "channels": channels,
+        "sample_rate": sample_rate,
+        "file_size_bytes": os.path.getsize(audio_path),
+        "format": source_format or "unknown",
+    }
+
+
+def _convert_sync(audio_path: PathLike, target_format: str, source_format: Optional[str]) -> Path:
+    audio = _audio_segment().from_file(audio_path, format=source_format)
+    return _export_to_tempfile(audio, target_format)
+
+
+def _speed_sync(audio_path: PathLike, speed_factor: float, source_format: Optional[str]) -> Path:
+    audio = _audio_segment().from_file(audio_path, format=source_format)
+    # Adjust speed by changing frame rate (identity speeds only re-encode)
+    adjusted = audio if is_noop_speed(speed_factor) else audio.speedup(playback_speed=speed_factor)
+    return _export_to_tempfile(adjusted, "wav")
+
+
+def _volume_sync(audio_path: PathLike, volume_db: float, source_format: Optional[str]) -> Path:
+    if source_format == "wav" and not is_noop_volume(volume_db):
+        adjusted_path = _wav_gain_to_tempfile(audio_path, volume_db)
+        if adjusted_path is not None:
+            return adjusted_path
+
+    audio = _audio_segment().from_file(audio_path, format=source_format)
+    # Adjust volume (0dB only re-encodes)
+    adjusted = audio if is_noop_volume(volume_db) else audio + volume_db
+    return _export_to_tempfile(adjusted, "wav")
+
+
+def _concatenate_to_tempfile(audio_list: list[PathLike]) -> Path:
+    """
+    Write the clips back to back into one temporary WAV file.
+
+    Each clip's frames are written straight to the output instead of being
+    appended to a growing AudioSegment, which would recopy everything joined
+    so far on every clip. Clips are converted to the highest channel count,
+    frame rate and sample width among them, as pydub's ``+`` does.
+    """
+    segments = [_audio_segment().from_file(audio_path) for audio_path in audio_list]
+    channels = max(seg.channels for seg in segments)
+    frame_rate = max(seg.frame_rate for seg in segments)
+    sample_width = max(seg.sample_width for seg in segments)
+
+    fd, name = tempfile.mkstemp(suffix=".wav", prefix="audio_out_")
+    os.close(fd)
+    path = Path(name)
+    try:
+        with wave.open(str(path), "wb") as dst:
+            dst.setnchannels(channels)
+            dst.setsampwidth(sample_width)
+            dst.setframerate(frame_rate)
+            for seg in segments:
+                seg = seg.set_channels(channels).set_frame_rate(frame_rate).set_sample_width(sample_width)
+                dst.writeframesraw(seg.raw_data)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+async def get_audio_info(audio_path: PathLike, source_format: Optional[str] = None) -> dict:
+    """
+    Extract audio information from an audio file.
+
+    WAV and FLAC are answered from the file header; other formats are
+    decoded with pydub in a worker thread.
 
     Args:
-        audio_data: Raw audio file bytes
+        audio_path: Path to the audio file on disk
+        source_format: Container format if already known (skips probing)
 
     Returns:
         Dictionary with audio information
     """
     try:
-        audio = AudioSegment.from_file(io.BytesIO(audio_data))
-
-        return {
-            "duration_seconds": len(audio) / 1000.0,
-            "channels": audio.channels,
-            "sample_rate": audio.frame_rate,
-            "file_size_bytes": len(audio_data),
-            "format": audio.format if hasattr(audio, 'format') else "unknown",
-        }
+        return await asyncio.to_thread(_audio_info_sync, audio_path, source_format)
     except Exception as e:
         logger.error(f"Error extracting audio info: {e}")
         raise ValueError(f"Failed to extract audio information: {str(e)}")
 
 
 async def convert_audio_format(
-    audio_data: bytes,
+    audio_path: PathLike,
     target_format: str,
-) -> Tuple[bytes, str]:
+    source_format: Optional[str] = None,
+) -> Tuple[Path, str]:
     """
     Convert audio to target format.
 
     Args:
-        audio_data: Raw audio file bytes
+        audio_path: Path to the audio file on disk
         target_format: Target format (wav, mp3, flac, ogg)
+        source_format: Container format if already known (skips probing)
 
     Returns:
-        Tuple of (converted audio bytes, format)
+        Tuple of (path to converted temporary file, format)
     """
     try:
-        audio = AudioSegment.from_file(io.BytesIO(audio_data))
+        converted_path = await asyncio.to_thread(_convert_sync, audio_path, target_format, source_format)
 
-        output = io.BytesIO()
-        audio.export(output, format=target_format)
-        converted_data = output.getvalue()
-
-        logger.info(f"Audio converted to {target_format}, size: {len(converted_data)} bytes")
-        return converted_data, target_format
+        logger.info(
+            f"Audio converted to {target_format}, size: {converted_path.stat().st_size} bytes"
+        )
+        return converted_path, target_format
 
     except Exception as e:
         logger.error(f"Error converting audio format: {e}")
@@ -62,34 +271,31 @@ async def convert_audio_format(
 
 
 async def adjust_audio_speed(
-    audio_data: bytes,
+    audio_path: PathLike,
     speed_factor: float,
-) -> bytes:
+    source_format: Optional[str] = None,
+) -> Path:
     """
     Adjust audio playback speed.
 
     Args:
-        audio_data: Raw audio file bytes
+        audio_path: Path to the audio file on disk
         speed_factor: Speed multiplier (0.5-2.0)
+        source_format: Container format if already known (skips probing)
 
     Returns:
-        Audio bytes with adjusted speed
+        Path to a temporary WAV file with adjusted speed
     """
     try:
         if speed_factor < 0.5 or speed_factor > 2.0:
             raise ValueError("Speed factor must be between 0.5 and 2.0")
 
-        audio = AudioSegment.from_file(io.BytesIO(audio_data))
-
-        # Adjust speed by changing frame rate
-        adjusted = audio.speedup(playback_speed=speed_factor)
+        adjusted_path = await asyncio.to_thread(_speed_sync, audio_path, speed_factor, source_format)
 
-        output = io.BytesIO()
-        adjusted.export(output, format="wav")
-        adjusted_data = output.getvalue()
-
-        logger.info(f"Audio speed adjusted by {speed_factor}x, size: {len(adjusted_data)} bytes")
-        return adjusted_data
+        logger.info(
+            f"Audio speed adjusted by {speed_factor}x, size: {adjusted_path.stat().st_size} bytes"
+        )
+        return adjusted_path
 
     except Exception as e:
         logger.error(f"Error adjusting audio speed: {e}")
@@ -97,34 +303,31 @@ async def adjust_audio_speed(
 
 
 async def adjust_audio_volume(
-    audio_data: bytes,
+    audio_path: PathLike,
     volume_db: float,
-) -> bytes:
+    source_format: Optional[str] = None,
+) -> Path:
     """
     Adjust audio volume.
 
     Args:
-        audio_data: Raw audio file bytes
+        audio_path: Path to the audio file on disk
         volume_db: Volume adjustment in dB (-20 to +20)
+        source_format: Container format if already known (skips probing)
 
     Returns:
-        Audio bytes with adjusted volume
+        Path to a temporary WAV file with adjusted volume
     """
     try:
         if volume_db < -20 or volume_db > 20:
             raise ValueError("Volume adjustment must be between -20 and +20 dB")
 
-        audio = AudioSegment.from_file(io.BytesIO(audio_data))
-
-        # Adjust volume
-        adjusted = audio + volume_db
-
-        output = io.BytesIO()
-        adjusted.export(output, format="wav")
-        adjusted_data = output.getvalue()
+        adjusted_path = await asyncio.to_thread(_volume_sync, audio_path, volume_db, source_format)
 
-        logger.info(f"Audio volume adjusted by {volume_db}dB, size: {len(adjusted_data)} bytes")
-        return adjusted_data
+        logger.info(
+            f"Audio volume adjusted by {volume_db}dB, size: {adjusted_path.stat().st_size} bytes"
+        )
+        return adjusted_path
 
     except Exception as e:
         logger.error(f"Error adjusting audio volume: {e}")
@@ -132,33 +335,25 @@ async def adjust_audio_volume(
 
 
 async def concatenate_audio(
-    audio_list: list[bytes],
-) -> bytes:
+    audio_list: list[PathLike],
+) -> Path:
     """
     Concatenate multiple audio files.
 
     Args:
-        audio_list: List of audio file bytes
+        audio_list: List of audio file paths
 
     Returns:
-        Concatenated audio bytes
+        Path to a temporary WAV file with the concatenated audio
     """
     try:
         if not audio_list:
             raise ValueError("Audio list cannot be empty")
 
-        combined = AudioSegment.empty()
-
-        for audio_data in audio_list:
-            audio = AudioSegment.from_file(io.BytesIO(audio_data))
-            combined += audio
-
-        output = io.BytesIO()
-        combined.export(output, format="wav")
-        combined_data = output.getvalue()
+        combined_path = await asyncio.to_thread(_concatenate_to_tempfile, audio_list)
 
-        logger.info(f"Audio concatenated, total size: {len(combined_data)} bytes")
-        return combined_data
+        logger.info(f"Audio concatenated, total size: {combined_path.stat().st_size} bytes")
+        return combined_path
 
     except Exception as e:
         logger.error(f"Error concatenating audio: {e}")
@@ -5,7 +5,7 @@ from __future__ import annotations
 from typing import Optional
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import CoverJob
@@ -20,6 +20,7 @@ async def create_cover_job(
     input_song_path: str,
     model_id: Optional[str] = None,
     pitch_shift: int = 0,
+    task_id: Optional[str] = None,
 ) -> CoverJob:
     """Create and persist a new cover job."""
     job = CoverJob(
@@ -28,21 +29,25 @@ async def create_cover_job(
         status="queued",
         stage="queued",
         progress=0,
+        task_id=task_id,
         model_id=model_id,
         pitch_shift=pitch_shift,
         input_voice_path=input_voice_path,
         input_song_path=input_song_path,
     )
     session.add(job)
+    # Server-generated timestamps come back with the INSERT (eager_defaults)
     await session.commit()
-    await session.refresh(job)
     return job
 
 
 async def get_cover_job(session: AsyncSession, job_id: uuid.UUID) -> Optional[CoverJob]:
-    """Get a cover job by its identifier."""
-    result = await session.execute(select(CoverJob).where(CoverJob.id == job_id))
-    return result.scalar_one_or_none()
+    """
+    Get a cover job by its identifier.
+
+    Served from the session's identity map when the job is already loaded.
+    """
+    return await session.get(CoverJob, job_id)
 
 
 async def update_cover_job(
@@ -56,30 +61,61 @@ async def update_cover_job(
     output_vocal_path: Optional[str] = None,
     output_inst_path: Optional[str] = None,
     output_mix_path: Optional[str] = None,
+    output_mix_filename: Optional[str] = None,
+    output_size_bytes: Optional[int] = None,
+    output_mtime: Optional[float] = None,
     error_message: Optional[str] = None,
 ) -> Optional[CoverJob]:
-    """Update mutable fields on a cover job."""
-    job = await get_cover_job(session, job_id)
-    if job is None:
-        return None
-
-    if status is not None:
-        job.status = status
-    if stage is not None:
-        job.stage = stage
-    if progress is not None:
-        job.progress = max(0, min(100, int(progress)))
-    if task_id is not None:
-        job.task_id = task_id
-    if output_vocal_path is not None:
-        job.output_vocal_path = output_vocal_path
-    if output_inst_path is not None:
-        job.output_inst_path = output_inst_path
-    if output_mix_path is not None:
-        job.output_mix_path = output_mix_path
-    if error_message is not None:
-        job.error_message = error_message
+    """
+    Update mutable fields on a cover job in one ``UPDATE ... RETURNING``.
+
+    Arguments left as None are not changed.
 
+    Returns:
+        The updated job, or None if no job has ``job_id``
+    """
+    fields = {
+        "status": status,
+        "stage": stage,
+        "progress": None if progress is None else max(0, min(100, int(progress))),
+        "task_id": task_id,
+        "output_vocal_path": output_vocal_path,
+        "output_inst_path": output_inst_path,
+        "output_mix_path": output_mix_path,
+        "output_mix_filename": output_mix_filename,
+        "output_size_bytes": output_size_bytes,
+        "output_mtime": output_mtime,
+        "error_message": error_message,
+    }
+    values = {name: value for name, value in fields.items() if value is not None}
+
+    stmt = (
+        update(CoverJob)
+        .where(CoverJob.id == job_id)
+        .values(**values)
+        .returning(CoverJob)
+        # Overwrite an already-loaded instance with the returned row
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    job = (await session.execute(stmt)).scalar_one_or_none()
+    await session.commit()
+    return job
+
+
+async def claim_cover_job(session: AsyncSession, job_id: uuid.UUID) -> Optional[CoverJob]:
+    """
+    Mark a job as running in one ``UPDATE ... RETURNING``, unless it was canceled.
+
+    Returns:
+        The claimed job, or None if no job has ``job_id`` or it is canceled
+    """
+    stmt = (
+        update(CoverJob)
+        .where(CoverJob.id == job_id, CoverJob.status != "canceled")
+        .values(status="running", stage="preprocess", progress=5)
+        .returning(CoverJob)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    job = (await session.execute(stmt)).scalar_one_or_none()
     await session.commit()
-    await session.refresh(job)
     return job
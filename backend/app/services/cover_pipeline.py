@@ -4,10 +4,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Optional
 
 from app.core.config import settings
-from app.services.gpt_sovits_runner import GPTSoVITSRunner
+from app.services.gpt_sovits_runner import GPTSoVITSRunner, ensure_dir, is_pipeline_wav
 
 
 @dataclass
@@ -25,7 +25,7 @@ class CoverPipeline:
     def __init__(self, runner: Optional[GPTSoVITSRunner] = None):
         self.runner = runner or GPTSoVITSRunner()
 
-    def run(
+    async def run(
         self,
         *,
         work_root: Path,
@@ -33,40 +33,44 @@ class CoverPipeline:
         song_input: Path,
         model_id: str,
         pitch_shift: int,
-        progress_callback: Optional[Callable[[str, int], None]] = None,
+        progress_callback: Optional[Callable[[str, int], Awaitable[None]]] = None,
     ) -> CoverPipelineResult:
         work_dir = work_root / "work"
         output_dir = work_root / "output"
-        work_dir.mkdir(parents=True, exist_ok=True)
-        output_dir.mkdir(parents=True, exist_ok=True)
+        ensure_dir(work_dir)
+        ensure_dir(output_dir)
 
-        preprocessed_song = work_dir / "song_preprocessed.wav"
         vocal_path = work_dir / "vocal.wav"
         inst_path = work_dir / "instrumental.wav"
         converted_vocal = work_dir / "converted_vocal.wav"
         mix_path = output_dir / "final.wav"
 
         if progress_callback:
-            progress_callback("preprocess", 10)
-        self.runner.preprocess_song(song_input, preprocessed_song)
-
-        duration = self.runner.probe_duration_seconds(preprocessed_song)
+            await progress_callback("preprocess", 10)
+        if is_pipeline_wav(song_input):
+            # Already 16-bit stereo 44.1 kHz PCM; re-encoding would copy it verbatim
+            preprocessed_song = song_input
+        else:
+            preprocessed_song = work_dir / "song_preprocessed.wav"
+            await self.runner.preprocess_song(song_input, preprocessed_song)
+
+        duration = await self.runner.probe_duration_seconds(preprocessed_song)
         if duration > settings.COVER_MAX_DURATION_SECONDS:
             raise RuntimeError(
                 f"song duration {duration:.2f}s exceeds limit {settings.COVER_MAX_DURATION_SECONDS}s"
             )
 
         if progress_callback:
-            progress_callback("separate", 35)
-        self.runner.separate_vocals(
+            await progress_callback("separate", 35)
+        await self.runner.separate_vocals(
             song_input=preprocessed_song,
             vocal_output=vocal_path,
             inst_output=inst_path,
         )
 
         if progress_callback:
-            progress_callback("infer", 70)
-        self.runner.convert_vocal(
+            await progress_callback("infer", 70)
+        await self.runner.convert_vocal(
             reference_voice=reference_voice,
             input_vocal=vocal_path,
             output_vocal=converted_vocal,
@@ -75,14 +79,14 @@ class CoverPipeline:
         )
 
         if progress_callback:
-            progress_callback("mix", 90)
-        self.runner.mix_audio(
+            await progress_callback("mix", 90)
+        await self.runner.mix_audio(
             converted_vocal=converted_vocal,
             instrumental=inst_path,
             output_mix=mix_path,
         )
 
         if progress_callback:
-            progress_callback("finalize", 100)
+            await progress_callback("finalize", 100)
 
         return CoverPipelineResult(vocal_path=vocal_path, inst_path=inst_path, mix_path=mix_path)
@@ -2,104 +2,286 @@
 
 from __future__ import annotations
 
+import asyncio
+import importlib
 import logging
-import subprocess
+import os
+import sys
+import threading
+import wave
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Bytes of stdout/stderr kept per step for error messages; long-running steps
+# can print megabytes of progress that would otherwise be buffered whole
+_OUTPUT_TAIL_BYTES = 4096
+_OUTPUT_TAIL_CHARS = 800
+_READ_CHUNK_SIZE = 1 << 16
+
 
 class RunnerError(RuntimeError):
     """Raised when an external runtime step fails."""
 
 
+# Format preprocess_song produces and mix_audio writes: 16-bit stereo 44.1 kHz
+PIPELINE_SAMPLE_RATE = 44100
+PIPELINE_CHANNELS = 2
+PIPELINE_SAMPLE_WIDTH = 2
+
+# ffmpeg filter that conforms any input branch to the pipeline format
+_PIPELINE_AFORMAT = (
+    f"aformat=sample_fmts=s16:channel_layouts=stereo:sample_rates={PIPELINE_SAMPLE_RATE}"
+)
+
+# Vocal/instrumental mix graph; the topology is fixed, so it is built once.
+# Both branches are conformed inside the graph, so neither input needs its
+# own resample/re-encode pass beforehand.
+_MIX_FILTER_GRAPH = (
+    f"[0:a]{_PIPELINE_AFORMAT},volume=1.0[v];"
+    f"[1:a]{_PIPELINE_AFORMAT},volume=0.9[i];"
+    "[v][i]amix=inputs=2:normalize=1[m]"
+)
+
+
+def is_pipeline_wav(path: Path) -> bool:
+    """True if ``path`` is already a PCM WAV in the pipeline's working format."""
+    try:
+        with wave.open(str(path), "rb") as src:
+            return (
+                src.getframerate() == PIPELINE_SAMPLE_RATE
+                and src.getnchannels() == PIPELINE_CHANNELS
+                and src.getsampwidth() == PIPELINE_SAMPLE_WIDTH
+            )
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+# Directories this process has already created, most recent last
+_MKDIR_CACHE_SIZE = 256
+_mkdir_cache: "OrderedDict[str, None]" = OrderedDict()
+_mkdir_lock = threading.Lock()
+
+
+def ensure_dir(path: Path) -> None:
+    """
+    Create ``path`` (and parents) unless this process already has.
+
+    Pipeline steps write into a handful of per-job directories, so repeat
+    ``mkdir`` calls for the same directory are skipped. The cache is
+    bounded; job directories are unique per job and are not reused after
+    cleanup removes them.
+    """
+    key = str(path)
+    with _mkdir_lock:
+        if key in _mkdir_cache:
+            _mkdir_cache.move_to_end(key)
+            return
+    path.mkdir(parents=True, exist_ok=True)
+    with _mkdir_lock:
+        _mkdir_cache[key] = None
+        if len(_mkdir_cache) > _MKDIR_CACHE_SIZE:
+            _mkdir_cache.popitem(last=False)
+
+
+_SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "scripts"
+# The scripts chdir into the GPT-SoVITS project root; calls are serialized so
+# the worker's working directory can be restored after each one
+_script_lock = threading.Lock()
+
+
+def _call_script(module_name: str, func_name: str, **kwargs: Any) -> Any:
+    """Import one of ``backend/scripts`` and call ``func_name`` in this process."""
+    with _script_lock:
+        cwd = os.getcwd()
+        try:
+            if str(_SCRIPTS_DIR) not in sys.path:
+                sys.path.insert(0, str(_SCRIPTS_DIR))
+            module = importlib.import_module(module_name)
+            return getattr(module, func_name)(**kwargs)
+        finally:
+            os.chdir(cwd)
+
+
+def _wav_duration_seconds(path: Path) -> Optional[float]:
+    """Duration from a PCM WAV header, or None if the stdlib cannot read it."""
+    try:
+        with wave.open(str(path), "rb") as src:
+            frames, rate = src.getnframes(), src.getframerate()
+    except (wave.Error, EOFError):
+        return None
+    return frames / rate if rate else None
+
+
 class GPTSoVITSRunner:
     """Encapsulates shell-level execution for audio pipeline steps."""
 
-    def _run_args(self, args: List[str], step: str) -> subprocess.CompletedProcess:
+    def __init__(self) -> None:
+        # Probed durations keyed by (path, mtime_ns, size), so a rewritten
+        # file is probed again
+        self._probe_cache: Dict[Tuple[str, int, int], float] = {}
+        self._soxr_available: Optional[bool] = None
+
+    async def _run_streamed(self, command: Union[str, List[str]], *, shell: bool, step: str) -> None:
+        """
+        Run a command without blocking the event loop, keeping only the tail of its output.
+
+        stdout and stderr are drained concurrently (both must be read, or a
+        full pipe would stall the child) into bounded buffers, so memory
+        stays flat however much the step prints. Output is read in chunks
+        rather than lines because ffmpeg's progress lines end in bare CRs.
+        If the awaiting task is cancelled, the child is killed.
+        """
+        if shell:
+            proc = await asyncio.create_subprocess_shell(
+                command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        tails = (bytearray(), bytearray())
+
+        async def drain(stream: asyncio.StreamReader, tail: bytearray) -> None:
+            while chunk := await stream.read(_READ_CHUNK_SIZE):
+                tail += chunk
+                del tail[:-_OUTPUT_TAIL_BYTES]
+
+        try:
+            await asyncio.gather(drain(proc.stdout, tails[0]), drain(proc.stderr, tails[1]))
+            returncode = await proc.wait()
+        except BaseException:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+
+        if returncode != 0:
+            stdout, stderr = (
+                tail.decode("utf-8", errors="replace")[-_OUTPUT_TAIL_CHARS:] for tail in tails
+            )
+            raise RunnerError(f"{step} failed (exit={returncode}). stdout={stdout} stderr={stderr}")
+
+    async def _run_args(self, args: List[str], step: str) -> None:
         """Run a command as a list of arguments (no shell, cross-platform safe)."""
         logger.info("Running step=%s args=%s", step, args)
-        completed = subprocess.run(args, capture_output=True, text=True)
-        if completed.returncode != 0:
-            raise RunnerError(
-                f"{step} failed (exit={completed.returncode}). stdout={completed.stdout[-800:]} "
-                f"stderr={completed.stderr[-800:]}"
-            )
-        return completed
+        await self._run_streamed(args, shell=False, step=step)
 
-    def _run_command(self, cmd: str, step: str) -> None:
+    async def _run_command(self, cmd: str, step: str) -> None:
         """Run a shell command string (used for template-based commands on Linux)."""
         logger.info("Running step=%s command=%s", step, cmd)
-        completed = subprocess.run(
-            cmd,
-            shell=True,
-            capture_output=True,
-            text=True,
-        )
-        if completed.returncode != 0:
-            raise RunnerError(
-                f"{step} failed (exit={completed.returncode}). stdout={completed.stdout[-800:]} "
-                f"stderr={completed.stderr[-800:]}"
-            )
+        await self._run_streamed(cmd, shell=True, step=step)
 
-    def _run_template(self, template: str, values: Dict[str, str], step: str) -> None:
+    async def _run_template(self, template: str, values: Dict[str, str], step: str) -> None:
         if not template.strip():
             raise RunnerError(f"{step} command template is empty")
         command = template.format(**values)
-        self._run_command(command, step=step)
+        await self._run_command(command, step=step)
+
+    async def _resampler_args(self) -> List[str]:
+        """Select the SoX resampler when this ffmpeg build includes libsoxr."""
+        if self._soxr_available is None:
+            proc = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-hide_banner", "-buildconf",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            buildconf, _ = await proc.communicate()
+            self._soxr_available = b"--enable-libsoxr" in buildconf
+        if not self._soxr_available:
+            return []
+        return ["-af", "aresample=resampler=soxr:precision=28"]
 
-    def preprocess_song(self, input_path: Path, output_path: Path) -> None:
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        self._run_args(
+    async def preprocess_song(self, input_path: Path, output_path: Path) -> None:
+        ensure_dir(output_path.parent)
+        await self._run_args(
             [
-                "ffmpeg", "-y",
+                "ffmpeg", "-hide_banner", "-nostdin", "-loglevel", "error",
+                "-threads", "0", "-y",
                 "-i", str(input_path),
-                "-vn", "-acodec", "pcm_s16le",
-                "-ac", "2", "-ar", "44100",
+                "-vn", *await self._resampler_args(),
+                "-ac", str(PIPELINE_CHANNELS), "-ar", str(PIPELINE_SAMPLE_RATE),
+                "-c:a", "pcm_s16le", "-f", "wav",
                 str(output_path),
             ],
             step="preprocess",
         )
 
-    def probe_duration_seconds(self, input_path: Path) -> float:
-        completed = subprocess.run(
-            [
-                "ffprobe",
-                "-v", "error",
-                "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1",
-                str(input_path),
-            ],
-            capture_output=True,
-            text=True,
+    async def probe_duration_seconds(self, input_path: Path) -> float:
+        """
+        Return the duration of an audio file in seconds.
+
+        PCM WAV (what ``preprocess_song`` writes) is read from its header;
+        anything else is probed with ffprobe. Results are cached per file
+        version, so repeated probes do not spawn another process.
+        """
+        st = input_path.stat()
+        key = (str(input_path), st.st_mtime_ns, st.st_size)
+        duration = self._probe_cache.get(key)
+        if duration is None:
+            duration = _wav_duration_seconds(input_path)
+            if duration is None:
+                duration = await self._ffprobe_duration_seconds(input_path)
+            self._probe_cache[key] = duration
+        return duration
+
+    async def _ffprobe_duration_seconds(self, input_path: Path) -> float:
+        proc = await asyncio.create_subprocess_exec(
+            "ffprobe",
+            "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1",
+            str(input_path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-        if completed.returncode != 0:
-            raise RunnerError(f"ffprobe failed: {completed.stderr[-500:]}")
+        # ffprobe prints a single value (or a short error); buffering it is fine
+        raw_stdout, raw_stderr = await proc.communicate()
+        stdout = raw_stdout.decode("utf-8", errors="replace")
+        if proc.returncode != 0:
+            raise RunnerError(f"ffprobe failed: {raw_stderr.decode('utf-8', errors='replace')[-500:]}")
         try:
-            return float(completed.stdout.strip())
+            return float(stdout.strip())
         except ValueError as exc:
-            raise RunnerError(f"unable to parse duration from ffprobe output: {completed.stdout!r}") from exc
-
-    def separate_vocals(self, *, song_input: Path, vocal_output: Path, inst_output: Path) -> None:
-        template = settings.COVER_SEPARATE_CMD_TEMPLATE
-        values = {
-            "python_exec": settings.GPT_SOVITS_PYTHON,
-            "project_root": settings.GPT_SOVITS_PROJECT_ROOT,
-            "song_input": str(song_input),
-            "vocal_output": str(vocal_output),
-            "inst_output": str(inst_output),
-            "uvr_model": settings.COVER_UVR_MODEL,
-        }
-        self._run_template(template, values, step="separate")
+            raise RunnerError(f"unable to parse duration from ffprobe output: {stdout!r}") from exc
+
+    async def separate_vocals(self, *, song_input: Path, vocal_output: Path, inst_output: Path) -> None:
+        if settings.COVER_IN_PROCESS:
+            logger.info("Running step=separate in process")
+            try:
+                await asyncio.to_thread(
+                    _call_script,
+                    "gptsovits_separate",
+                    "separate",
+                    project_root=Path(settings.GPT_SOVITS_PROJECT_ROOT),
+                    input_audio=song_input,
+                    vocal_out=vocal_output,
+                    inst_out=inst_output,
+                    model_name=settings.COVER_UVR_MODEL,
+                )
+            except Exception as exc:
+                raise RunnerError(f"separate failed: {exc}") from exc
+        else:
+            template = settings.COVER_SEPARATE_CMD_TEMPLATE
+            values = {
+                "python_exec": settings.GPT_SOVITS_PYTHON,
+                "project_root": settings.GPT_SOVITS_PROJECT_ROOT,
+                "song_input": str(song_input),
+                "vocal_output": str(vocal_output),
+                "inst_output": str(inst_output),
+                "uvr_model": settings.COVER_UVR_MODEL,
+            }
+            await self._run_template(template, values, step="separate")
         if not vocal_output.exists():
             raise RunnerError(f"separate step did not produce vocal output: {vocal_output}")
         if not inst_output.exists():
             raise RunnerError(f"separate step did not produce instrumental output: {inst_output}")
 
-    def convert_vocal(
+    async def convert_vocal(
         self,
         *,
         reference_voice: Path,
@@ -108,29 +290,47 @@ class GPTSoVITSRunner:
         model_id: str,
         pitch_shift: int,
     ) -> None:
-        template = settings.COVER_INFER_CMD_TEMPLATE
-        values = {
-            "python_exec": settings.GPT_SOVITS_PYTHON,
-            "project_root": settings.GPT_SOVITS_PROJECT_ROOT,
-            "reference_voice": str(reference_voice),
-            "input_vocal": str(input_vocal),
-            "output_vocal": str(output_vocal),
-            "model_id": model_id,
-            "pitch_shift": str(pitch_shift),
-        }
-        self._run_template(template, values, step="infer")
+        if settings.COVER_IN_PROCESS:
+            logger.info("Running step=infer in process")
+            try:
+                exit_code = await asyncio.to_thread(
+                    _call_script,
+                    "gptsovits_infer",
+                    "infer",
+                    project_root=Path(settings.GPT_SOVITS_PROJECT_ROOT),
+                    reference=reference_voice,
+                    input_audio=input_vocal,
+                    output=output_vocal,
+                    model_id=model_id,
+                    pitch=pitch_shift,
+                )
+            except Exception as exc:
+                raise RunnerError(f"infer failed: {exc}") from exc
+            if exit_code != 0:
+                raise RunnerError(f"infer failed (exit={exit_code}); see worker log")
+        else:
+            template = settings.COVER_INFER_CMD_TEMPLATE
+            values = {
+                "python_exec": settings.GPT_SOVITS_PYTHON,
+                "project_root": settings.GPT_SOVITS_PROJECT_ROOT,
+                "reference_voice": str(reference_voice),
+                "input_vocal": str(input_vocal),
+                "output_vocal": str(output_vocal),
+                "model_id": model_id,
+                "pitch_shift": str(pitch_shift),
+            }
+            await self._run_template(template, values, step="infer")
         if not output_vocal.exists():
             raise RunnerError(f"infer step did not produce output: {output_vocal}")
 
-    def mix_audio(self, *, converted_vocal: Path, instrumental: Path, output_mix: Path) -> None:
-        output_mix.parent.mkdir(parents=True, exist_ok=True)
-        self._run_args(
+    async def mix_audio(self, *, converted_vocal: Path, instrumental: Path, output_mix: Path) -> None:
+        ensure_dir(output_mix.parent)
+        await self._run_args(
             [
-                "ffmpeg", "-y",
+                "ffmpeg", "-hide_banner", "-nostdin", "-loglevel", "error", "-y",
                 "-i", str(converted_vocal),
                 "-i", str(instrumental),
-                "-filter_complex",
-                "[0:a]volume=1.0[v];[1:a]volume=0.9[i];[v][i]amix=inputs=2:normalize=1[m]",
+                "-filter_complex", _MIX_FILTER_GRAPH,
                 "-map", "[m]",
                 "-c:a", "pcm_s16le",
                 str(output_mix),
@@ -1,10 +1,35 @@
 """History service for recording and retrieving synthesis history."""
-from typing import Optional, Tuple, List
+import asyncio
+import base64
+import binascii
+import logging
+from datetime import datetime
+from typing import Optional, Set, Tuple, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, func
+from sqlalchemy import Row, select, desc, func, tuple_
 from app.db.models import SynthesisHistory
+from app.db.session import async_session_maker
 import uuid
 
+logger = logging.getLogger(__name__)
+
+# Strong references to in-flight background inserts; the event loop only keeps weak ones
+_pending_history_tasks: Set[asyncio.Task] = set()
+
+# Columns projected by list_user_history (matches HistoryItemResponse)
+_HISTORY_COLUMNS = (
+    SynthesisHistory.id,
+    SynthesisHistory.job_type,
+    SynthesisHistory.status,
+    SynthesisHistory.input_text,
+    SynthesisHistory.language,
+    SynthesisHistory.speed,
+    SynthesisHistory.temperature,
+    SynthesisHistory.duration_seconds,
+    SynthesisHistory.error_message,
+    SynthesisHistory.created_at,
+)
+
 
 async def record_history(
     session: AsyncSession,
@@ -53,34 +78,108 @@ async def record_history(
     return history
 
 
+async def _record_history_safe(**fields) -> None:
+    try:
+        async with async_session_maker() as session:
+            await record_history(session, **fields)
+    except Exception:
+        logger.exception("Failed to record synthesis history")
+
+
+def record_history_in_background(**fields) -> None:
+    """
+    Record a synthesis job in history without waiting for the insert.
+
+    The row is written in its own session on the running event loop, so the
+    caller can return its response immediately. Failures are logged, never
+    raised.
+
+    Args:
+        **fields: Keyword arguments accepted by ``record_history`` (except ``session``)
+    """
+    task = asyncio.create_task(_record_history_safe(**fields))
+    _pending_history_tasks.add(task)
+    task.add_done_callback(_pending_history_tasks.discard)
+
+
+def encode_history_cursor(created_at: datetime, history_id: uuid.UUID) -> str:
+    """Encode a keyset pagination cursor for the row at ``(created_at, id)``."""
+    raw = f"{created_at.isoformat()}|{history_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by ``encode_history_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    created_at, sep, history_id = raw.partition("|")
+    if not sep:
+        raise ValueError("Invalid cursor")
+    return datetime.fromisoformat(created_at), uuid.UUID(history_id)
+
+
 async def list_user_history(
     session: AsyncSession,
     user_id: Optional[uuid.UUID] = None,
     limit: int = 20,
     offset: int = 0,
-) -> Tuple[List[SynthesisHistory], int]:
+    cursor: Optional[Tuple[datetime, uuid.UUID]] = None,
+) -> Tuple[List[Row], int]:
     """
     List synthesis history for a user.
 
+    Only the columns needed for the response are selected, so rows come back
+    as lightweight tuples instead of identity-mapped ORM entities.
+
+    When ``cursor`` is given, rows strictly older than it are returned
+    (keyset pagination) and ``offset`` is ignored, so deep pages cost the
+    same as the first one.
+
     Args:
         session: Database session
         user_id: User ID to filter by (None for all users)
         limit: Maximum number of records to return
         offset: Number of records to skip
+        cursor: Decoded ``(created_at, id)`` of the last row already seen
 
     Returns:
-        Tuple of (list of history items, total count)
+        Tuple of (list of history rows, total count)
     """
-    # Build query for items
-    query = select(SynthesisHistory).order_by(desc(SynthesisHistory.created_at))
+    # Build query for items. Without a cursor the total rides along on every
+    # row via COUNT(*) OVER (), evaluated before LIMIT/OFFSET.
+    columns = _HISTORY_COLUMNS
+    if cursor is None:
+        columns = (*columns, func.count().over().label("total_count"))
+    query = select(*columns).order_by(
+        desc(SynthesisHistory.created_at), desc(SynthesisHistory.id)
+    )
     if user_id:
         query = query.where(SynthesisHistory.user_id == user_id)
-    query = query.limit(limit).offset(offset)
+    if cursor is not None:
+        query = query.where(
+            tuple_(SynthesisHistory.created_at, SynthesisHistory.id) < tuple_(*cursor)
+        )
+        query = query.limit(limit)
+    else:
+        query = query.limit(limit).offset(offset)
 
     result = await session.execute(query)
-    items = result.scalars().all()
+    items = result.all()
+
+    if cursor is None and items:
+        return list(items), items[0].total_count
+    if cursor is None and offset == 0:
+        return [], 0
 
-    # Count total
+    # Keyset pages (the window would only count rows past the cursor) and
+    # pages past the end need a separate count
     count_query = select(func.count(SynthesisHistory.id))
     if user_id:
         count_query = count_query.where(SynthesisHistory.user_id == user_id)
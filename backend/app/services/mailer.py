@@ -1,61 +1,130 @@
 """Email service for sending verification emails."""
-from datetime import datetime, timedelta
-from jose import jwt
-from aiosmtplib import SMTP
+import asyncio
+import functools
+import time
+from string import Template
+from typing import Optional
+import jwt
+from aiosmtplib import SMTP, SMTPException, SMTPServerDisconnected
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings
 
+_VERIFICATION_HTML = Template("""
+    <html>
+      <body>
+        <h2>Welcome to VoiceClone.ai, $username!</h2>
+        <p>Please verify your email address by clicking the link below:</p>
+        <p><a href="$verification_url">Verify Email</a></p>
+        <p>This link will expire in $expire_minutes minutes.</p>
+      </body>
+    </html>
+    """)
 
-def create_verification_token(email: str) -> str:
-    """Create email verification token."""
-    expire = datetime.utcnow() + timedelta(minutes=settings.VERIFICATION_TOKEN_EXPIRE_MINUTES)
+# Logged-in connections reused across sends, opened on first use so the app
+# starts without SMTP configured. A None slot has no open connection yet.
+_SMTP_POOL_SIZE = 4
+_smtp_pool: "asyncio.Queue[Optional[SMTP]]" = asyncio.Queue()
+for _ in range(_SMTP_POOL_SIZE):
+    _smtp_pool.put_nowait(None)
+
+
+@functools.lru_cache(maxsize=1024)
+def _sign_verification_token(email: str, exp_minute: int) -> str:
     to_encode = {
         "sub": email,
-        "exp": expire,
+        "exp": exp_minute * 60,
         "type": "verification"
     }
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm="HS256")
 
 
+def create_verification_token(email: str) -> str:
+    """
+    Create email verification token.
+
+    Expiry is rounded up to the next whole minute, so repeated sends to the
+    same address within a minute reuse one signed token.
+    """
+    expire = time.time() + settings.email.VERIFICATION_TOKEN_EXPIRE_MINUTES * 60
+    return _sign_verification_token(email, -(-int(expire) // 60))
+
+
 def verify_verification_token(token: str) -> str | None:
     """Verify email verification token and return email."""
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=["HS256"])
-        if payload.get("type") != "verification":
-            return None
-        return payload.get("sub")
-    except Exception:
+        payload = jwt.decode(
+            token,
+            settings.JWT_SECRET_KEY,
+            algorithms=["HS256"],
+            options={"require": ["exp", "sub", "type"]},
+        )
+    except jwt.PyJWTError:
         return None
+    if payload["type"] != "verification":
+        return None
+    return payload["sub"]
+
+
+async def _connect() -> SMTP:
+    smtp = SMTP(hostname=settings.email.SMTP_HOST, port=settings.email.SMTP_PORT)
+    await smtp.connect()
+    await smtp.login(settings.email.SMTP_USER, settings.email.SMTP_PASSWORD)
+    return smtp
+
+
+async def _send(message: MIMEMultipart) -> None:
+    """Send over a pooled connection, reconnecting once if it has dropped."""
+    smtp = await _smtp_pool.get()
+    try:
+        if smtp is None or not smtp.is_connected:
+            smtp = await _connect()
+        try:
+            await smtp.send_message(message)
+        except SMTPServerDisconnected:
+            smtp = await _connect()
+            await smtp.send_message(message)
+    except Exception:
+        if smtp is not None:
+            smtp.close()
+        smtp = None
+        raise
+    finally:
+        _smtp_pool.put_nowait(smtp)
+
+
+async def aclose() -> None:
+    """Close pooled SMTP connections (called on application shutdown)."""
+    for _ in range(_smtp_pool.qsize()):
+        smtp = _smtp_pool.get_nowait()
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except SMTPException:
+                smtp.close()
+        _smtp_pool.put_nowait(None)
 
 
 async def send_verification_email(email: str, username: str) -> bool:
     """Send email verification link."""
     token = create_verification_token(email)
-    verification_url = f"{settings.FRONTEND_URL}/verify?token={token}"
+    verification_url = f"{settings.email.FRONTEND_URL}/verify?token={token}"
     
     message = MIMEMultipart("alternative")
     message["Subject"] = "Verify your VoiceClone.ai account"
-    message["From"] = settings.VERIFICATION_EMAIL_FROM
+    message["From"] = settings.email.VERIFICATION_EMAIL_FROM
     message["To"] = email
     
-    html = f"""
-    <html>
-      <body>
-        <h2>Welcome to VoiceClone.ai, {username}!</h2>
-        <p>Please verify your email address by clicking the link below:</p>
-        <p><a href="{verification_url}">Verify Email</a></p>
-        <p>This link will expire in {settings.VERIFICATION_TOKEN_EXPIRE_MINUTES} minutes.</p>
-      </body>
-    </html>
-    """
+    html = _VERIFICATION_HTML.substitute(
+        username=username,
+        verification_url=verification_url,
+        expire_minutes=settings.email.VERIFICATION_TOKEN_EXPIRE_MINUTES,
+    )
     
     message.attach(MIMEText(html, "html"))
     
     try:
-        async with SMTP(hostname=settings.SMTP_HOST, port=settings.SMTP_PORT) as smtp:
-            await smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            await smtp.send_message(message)
+        await _send(message)
         return True
     except Exception:
         return False
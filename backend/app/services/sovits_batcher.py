@@ -0,0 +1,167 @@
+"""Admission layer in front of the GPT-SoVITS client."""
+
+import asyncio
+import hashlib
+import logging
+import tempfile
+from typing import Awaitable, BinaryIO, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+from app.core.uploads import UPLOAD_CHUNK_SIZE
+from app.services.sovits_client import SoVITSClient, sovits_client
+
+logger = logging.getLogger(__name__)
+
+# Results kept briefly so immediate client retries are answered from memory.
+# Entries are whole audio files, hence the small bound.
+_RESULT_CACHE_SIZE = 32
+_RESULT_CACHE_TTL = 60.0
+
+
+def _spool_with_digest(fileobj: BinaryIO) -> Tuple[BinaryIO, bytes]:
+    """
+    Copy a file object from the start into a temporary file, hashing it on the way.
+
+    Returns:
+        (copy rewound to the start, digest); closing the copy deletes it
+    """
+    fileobj.seek(0)
+    digest = hashlib.blake2b(digest_size=16)
+    spool = tempfile.TemporaryFile()
+    try:
+        while chunk := fileobj.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool, digest.digest()
+
+
+class SoVITSBatcher:
+    """
+    Coalesce and bound concurrent requests to GPT-SoVITS.
+
+    The upstream service exposes single-item endpoints only, so requests
+    cannot be merged into one GPU batch. Instead, identical in-flight
+    requests share a single upstream call, results are kept for a short
+    while for retries, and the number of requests sent to the service at
+    once is capped so bursts queue here rather than contending for the GPU.
+    """
+
+    def __init__(self, client: SoVITSClient, max_concurrency: int):
+        """
+        Args:
+            client: Client used for the upstream requests
+            max_concurrency: Maximum number of simultaneous upstream requests
+        """
+        self._client = client
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._results: TTLCache[bytes] = TTLCache(maxsize=_RESULT_CACHE_SIZE, ttl=_RESULT_CACHE_TTL)
+
+    async def synthesize(
+        self,
+        text: str,
+        reference_audio: BinaryIO,
+        language: str = "auto",
+        speed: float = 1.0,
+        temperature: float = 0.7,
+    ) -> bytes:
+        """
+        Synthesize speech using reference audio (see ``SoVITSClient.synthesize``).
+
+        Calls are coalesced on the text, parameters and a digest of the
+        reference audio, so retries of the same upload share one request.
+        The digest is computed while copying the reference to a temporary
+        file, and the shared request sends that copy rather than the first
+        caller's upload, which Starlette closes if that client disconnects
+        while others still wait on the result.
+        """
+        reference_copy, audio_digest = await asyncio.to_thread(_spool_with_digest, reference_audio)
+        key = ("clone", text, language, speed, temperature, audio_digest)
+
+        async def run() -> bytes:
+            async with self._slots:
+                return await self._client.synthesize(
+                    text=text,
+                    reference_audio=reference_copy,
+                    language=language,
+                    speed=speed,
+                    temperature=temperature,
+                )
+
+        return await self._single_flight(key, run, cleanup=reference_copy.close)
+
+    async def synthesize_tts(
+        self,
+        text: str,
+        language: str = "auto",
+        speed: float = 1.0,
+        temperature: float = 0.7,
+    ) -> bytes:
+        """
+        Synthesize speech with the default voice (see ``SoVITSClient.synthesize_tts``).
+
+        Concurrent calls with identical arguments await the same upstream
+        request and receive the same audio.
+        """
+        key = ("tts", text, language, speed, temperature)
+
+        async def run() -> bytes:
+            async with self._slots:
+                return await self._client.synthesize_tts(
+                    text=text,
+                    language=language,
+                    speed=speed,
+                    temperature=temperature,
+                )
+
+        return await self._single_flight(key, run)
+
+    async def _single_flight(
+        self,
+        key: Hashable,
+        run: Callable[[], Awaitable[bytes]],
+        cleanup: Optional[Callable[[], None]] = None,
+    ) -> bytes:
+        """
+        Await the request for ``key``, starting it with ``run`` if none is in flight.
+
+        ``cleanup`` releases what ``run`` would use. It is called once the
+        started request completes, or at once if ``run`` is not needed.
+        """
+        cached = self._results.get(key)
+        if cached is not None:
+            logger.debug("Serving synthesis result from the retry cache")
+            if cleanup is not None:
+                cleanup()
+            return cached
+
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(run())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._finish(key, f))
+            if cleanup is not None:
+                future.add_done_callback(lambda f: cleanup())
+        else:
+            logger.debug("Coalescing synthesis request with an in-flight duplicate")
+            if cleanup is not None:
+                cleanup()
+        # Shield so one caller disconnecting does not cancel the shared request
+        return await asyncio.shield(future)
+
+    def _finish(self, key: Hashable, future: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if future.cancelled():
+            return
+        # Retrieving the exception also marks it handled if every waiter went away
+        if future.exception() is None:
+            self._results.set(key, future.result())
+
+
+# Global batcher instance
+sovits_batcher = SoVITSBatcher(sovits_client, settings.SOVITS_MAX_CONCURRENCY)
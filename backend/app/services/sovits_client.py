@@ -1,13 +1,39 @@
 """GPT-SoVITS client service for voice synthesis."""
 
+import asyncio
 import logging
 import httpx
-from typing import Optional, BinaryIO
+from typing import Any, BinaryIO, List, Optional, Protocol
 from pathlib import Path
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive pool shared by all requests to the SoVITS service
+_POOL_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128, keepalive_expiry=60)
+_CONNECT_TIMEOUT = 5.0
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class AsyncWritable(Protocol):
+    """Destination for streamed audio, e.g. an ``aiofiles`` file handle."""
+
+    async def write(self, data: bytes) -> Any:
+        ...
+
+
+class _ChunkSink:
+    """Collects streamed chunks for the bytes-returning wrappers."""
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    async def write(self, data: bytes) -> None:
+        self._chunks.append(data)
+
+    def getvalue(self) -> bytes:
+        return b"".join(self._chunks)
+
 
 class SoVITSClient:
     """Client for interacting with GPT-SoVITS service."""
@@ -16,6 +42,22 @@ class SoVITSClient:
         """Initialize SoVITS client."""
         self.base_url = settings.SOVITS_BASE_URL
         self.timeout = settings.SOVITS_TIMEOUT
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=_CONNECT_TIMEOUT),
+                limits=_POOL_LIMITS,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close pooled connections to the SoVITS service."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def health_check(self) -> bool:
         """
@@ -25,42 +67,77 @@ class SoVITSClient:
             True if service is healthy, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/health")
-                return response.status_code == 200
+            response = await self._get_client().get(f"{self.base_url}/health", timeout=5.0)
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"SoVITS health check failed: {e}")
             return False
 
-    async def synthesize(
+    async def _stream_audio(
+        self,
+        endpoint: str,
+        sink: AsyncWritable,
+        *,
+        data: dict,
+        files: Optional[dict] = None,
+    ) -> int:
+        """POST to ``endpoint`` and stream the audio body into ``sink``."""
+        async with self._get_client().stream(
+            "POST", f"{self.base_url}{endpoint}", data=data, files=files
+        ) as response:
+            response.raise_for_status()
+
+            # Check content type before reading any of the body
+            content_type = response.headers.get("content-type", "")
+            if not content_type.startswith("audio/"):
+                logger.error(f"Unexpected content type: {content_type}")
+                raise ValueError(f"Expected audio response, got {content_type}")
+
+            written = 0
+            async for chunk in response.aiter_bytes(_STREAM_CHUNK_SIZE):
+                await sink.write(chunk)
+                written += len(chunk)
+            return written
+
+    async def stream_synthesize(
         self,
         text: str,
         reference_audio: BinaryIO,
+        sink: AsyncWritable,
         language: str = "auto",
         speed: float = 1.0,
         temperature: float = 0.7,
-    ) -> bytes:
+    ) -> int:
         """
-        Synthesize speech from text using reference audio.
+        Synthesize speech from text using reference audio, streaming the result.
+
+        Audio chunks are written to ``sink`` as they arrive, so writing to a
+        file (e.g. an ``aiofiles`` handle) never holds the whole clip in memory.
 
         Args:
             text: Text to synthesize
-            reference_audio: Reference audio file object
+            reference_audio: Reference audio file object, read from its
+                current position in a worker thread (uploads are size-capped)
+            sink: Object with an async ``write(bytes)`` method
             language: Target language code
             speed: Speech speed multiplier
             temperature: Sampling temperature
 
         Returns:
-            Audio data as bytes
+            Number of audio bytes written to ``sink``
 
         Raises:
             httpx.HTTPError: If request fails
             ValueError: If response is invalid
         """
         try:
+            # httpx would call the file's blocking read() on the event loop
+            # while encoding the multipart body; read it in a thread instead
+            reference_bytes = await asyncio.to_thread(reference_audio.read)
+
             # Prepare multipart form data
             files = {
-                "reference_audio": ("reference.wav", reference_audio, "audio/wav")
+                "reference_audio": ("reference.wav", reference_bytes, "audio/wav")
             }
 
             data = {
@@ -70,22 +147,8 @@ class SoVITSClient:
                 "temperature": temperature,
             }
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                logger.info(f"Sending synthesis request to {self.base_url}")
-                response = await client.post(
-                    f"{self.base_url}/synthesize",
-                    files=files,
-                    data=data,
-                )
-                response.raise_for_status()
-
-                # Check content type
-                content_type = response.headers.get("content-type", "")
-                if not content_type.startswith("audio/"):
-                    logger.error(f"Unexpected content type: {content_type}")
-                    raise ValueError(f"Expected audio response, got {content_type}")
-
-                return response.content
+            logger.info(f"Sending synthesis request to {self.base_url}")
+            return await self._stream_audio("/synthesize", sink, data=data, files=files)
 
         except httpx.TimeoutException as e:
             logger.error(f"SoVITS request timeout: {e}")
@@ -97,24 +160,51 @@ class SoVITSClient:
             logger.error(f"SoVITS synthesis error: {e}")
             raise
 
-    async def synthesize_tts(
+    async def synthesize(
         self,
         text: str,
+        reference_audio: BinaryIO,
         language: str = "auto",
         speed: float = 1.0,
         temperature: float = 0.7,
     ) -> bytes:
         """
-        Synthesize speech from text without reference audio (uses default voice).
+        Synthesize speech from text using reference audio.
+
+        Thin wrapper over ``stream_synthesize`` for callers that need the
+        whole clip in memory.
+
+        Returns:
+            Audio data as bytes
+
+        Raises:
+            httpx.HTTPError: If request fails
+            ValueError: If response is invalid
+        """
+        sink = _ChunkSink()
+        await self.stream_synthesize(text, reference_audio, sink, language, speed, temperature)
+        return sink.getvalue()
+
+    async def stream_synthesize_tts(
+        self,
+        text: str,
+        sink: AsyncWritable,
+        language: str = "auto",
+        speed: float = 1.0,
+        temperature: float = 0.7,
+    ) -> int:
+        """
+        Synthesize speech with the default voice, streaming the result into ``sink``.
 
         Args:
             text: Text to synthesize
+            sink: Object with an async ``write(bytes)`` method
             language: Target language code
             speed: Speech speed multiplier
             temperature: Sampling temperature
 
         Returns:
-            Audio data as bytes
+            Number of audio bytes written to ``sink``
 
         Raises:
             httpx.HTTPError: If request fails
@@ -128,18 +218,8 @@ class SoVITSClient:
                 "temperature": temperature,
             }
 
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                logger.info(f"Sending TTS request to {self.base_url}")
-                response = await client.post(f"{self.base_url}/tts", data=data)
-                response.raise_for_status()
-
-                # Check content type
-                content_type = response.headers.get("content-type", "")
-                if not content_type.startswith("audio/"):
-                    logger.error(f"Unexpected content type: {content_type}")
-                    raise ValueError(f"Expected audio response, got {content_type}")
-
-                return response.content
+            logger.info(f"Sending TTS request to {self.base_url}")
+            return await self._stream_audio("/tts", sink, data=data)
 
         except httpx.TimeoutException as e:
             logger.error(f"SoVITS TTS request timeout: {e}")
@@ -151,6 +231,29 @@ class SoVITSClient:
             logger.error(f"SoVITS TTS error: {e}")
             raise
 
+    async def synthesize_tts(
+        self,
+        text: str,
+        language: str = "auto",
+        speed: float = 1.0,
+        temperature: float = 0.7,
+    ) -> bytes:
+        """
+        Synthesize speech from text without reference audio (uses default voice).
+
+        Thin wrapper over ``stream_synthesize_tts``.
+
+        Returns:
+            Audio data as bytes
+
+        Raises:
+            httpx.HTTPError: If request fails
+            ValueError: If response is invalid
+        """
+        sink = _ChunkSink()
+        await self.stream_synthesize_tts(text, sink, language, speed, temperature)
+        return sink.getvalue()
+
 
 # Global client instance
 sovits_client = SoVITSClient()
@@ -1,7 +1,39 @@
 """Cloudflare Turnstile verification service."""
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
 import httpx
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+# Verifications in flight, keyed by (token, remote_ip). Turnstile tokens are
+# single-use, so a duplicate submit racing the first would be rejected by
+# siteverify; concurrent callers share the pending result instead. Entries
+# go as soon as the check finishes, so a token is never accepted twice.
+_pending: Dict[Tuple[str, Optional[str]], "asyncio.Future[bool]"] = {}
+
+# Shared client so siteverify calls reuse a kept-alive TLS connection
+_TURNSTILE_TIMEOUT = 10.0
+_TURNSTILE_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the pooled HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=_TURNSTILE_TIMEOUT, limits=_TURNSTILE_LIMITS)
+    return _client
+
+
+async def aclose() -> None:
+    """Close pooled connections to Cloudflare."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def verify_turnstile_token(token: str, remote_ip: str = None) -> bool:
     """
@@ -14,10 +46,29 @@ async def verify_turnstile_token(token: str, remote_ip: str = None) -> bool:
     Returns:
         True if token is valid, False otherwise
     """
+    key = (token, remote_ip)
+    future = _pending.get(key)
+    if future is None or future.done():
+        future = asyncio.ensure_future(_siteverify(token, remote_ip))
+        _pending[key] = future
+        future.add_done_callback(lambda done: _forget(key, done))
+    else:
+        logger.debug("Sharing an in-flight Turnstile verification")
+    # Shield so one caller disconnecting does not cancel the shared check
+    return await asyncio.shield(future)
+
+
+def _forget(key: Tuple[str, Optional[str]], future: "asyncio.Future[bool]") -> None:
+    # A newer check may already hold the key if this one finished first
+    if _pending.get(key) is future:
+        del _pending[key]
+
+
+async def _siteverify(token: str, remote_ip: Optional[str]) -> bool:
     url = "https://challenges.cloudflare.com/turnstile/v0/siteverify"
     
     payload = {
-        "secret": settings.TURNSTILE_SECRET_KEY,
+        "secret": settings.turnstile.TURNSTILE_SECRET_KEY,
         "response": token,
     }
     
@@ -25,9 +76,8 @@ async def verify_turnstile_token(token: str, remote_ip: str = None) -> bool:
         payload["remoteip"] = remote_ip
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, timeout=10.0)
-            result = response.json()
-            return result.get("success", False)
+        response = await _get_client().post(url, json=payload)
+        result = response.json()
+        return bool(result.get("success", False))
     except Exception:
         return False
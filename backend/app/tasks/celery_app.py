@@ -2,6 +2,7 @@
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 
 from app.core.config import settings
 
@@ -10,6 +11,7 @@ celery_app = Celery(
     "voice_ll",
     broker=settings.REDIS_URL,
     backend=settings.REDIS_URL,
+    include=["app.tasks.cover_tasks", "app.tasks.cleanup_tasks"],
 )
 
 celery_app.conf.update(
@@ -20,6 +22,12 @@ celery_app.conf.update(
     task_time_limit=60 * 60,
     task_soft_time_limit=55 * 60,
     task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
+    task_eager_propagates=settings.CELERY_TASK_EAGER_PROPAGATES,
+    # Cleanup is filesystem/DB I/O; keep it off the queue whose workers are
+    # busy with long pipeline runs (cover jobs use task_default_queue)
+    task_routes={
+        "cover.cleanup_expired_assets": {"queue": settings.MAINTENANCE_QUEUE_NAME},
+    },
 )
 
 # Celery Beat schedule for periodic tasks
@@ -30,3 +38,10 @@ celery_app.conf.beat_schedule = {
     },
 }
 
+
+@worker_process_init.connect
+def _reset_inherited_db_pool(**kwargs) -> None:
+    """Drop DB connections inherited from the parent on fork; each child opens its own."""
+    from app.db.session import engine
+
+    engine.sync_engine.dispose(close=False)
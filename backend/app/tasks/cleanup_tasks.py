@@ -2,43 +2,72 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
+import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 import uuid
 
-from sqlalchemy import select
+from sqlalchemy import and_, select
 
 from app.core.config import settings
 from app.db.models.cover_job import CoverJob
 from app.db.session import async_session_maker
 from app.tasks.celery_app import celery_app
+from app.tasks.runtime import run_coro
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent rmtree calls; deletion is unlink-syscall bound,
+# so overlapping directories keeps the disk queue busy
+_MAX_DELETE_WORKERS = 32
 
-async def _get_expired_jobs(ttl_hours: int) -> List[CoverJob]:
-    """Get jobs that are completed/failed/canceled and older than TTL."""
-    cutoff_time = datetime.utcnow() - timedelta(hours=ttl_hours)
 
-    async with async_session_maker() as session:
-        stmt = select(CoverJob).where(
-            CoverJob.status.in_(["succeeded", "failed", "canceled"]),
-            CoverJob.created_at < cutoff_time
-        )
-        result = await session.execute(stmt)
-        return list(result.scalars().all())
+async def _load_job_sets(cutoff_time: datetime) -> Tuple[set[uuid.UUID], set[uuid.UUID]]:
+    """
+    Load expired and known job IDs with one query.
 
+    Expired jobs are completed/failed/canceled and created before
+    ``cutoff_time``; every row is flagged in the same scan.
+
+    Returns:
+        Tuple of (expired job IDs, all job IDs)
+    """
+    is_expired = and_(
+        CoverJob.status.in_(["succeeded", "failed", "canceled"]),
+        CoverJob.created_at < cutoff_time,
+    ).label("is_expired")
 
-async def _get_all_job_ids() -> set[uuid.UUID]:
-    """Get all job IDs from the database."""
     async with async_session_maker() as session:
-        stmt = select(CoverJob.id)
-        result = await session.execute(stmt)
-        return set(result.scalars().all())
+        result = await session.execute(select(CoverJob.id, is_expired))
+        rows = result.all()
+
+    all_ids = {row.id for row in rows}
+    expired_ids = {row.id for row in rows if row.is_expired}
+    return expired_ids, all_ids
+
+
+def _dir_size(root: Path) -> int:
+    """
+    Total size of regular files under ``root``, without following symlinks.
+
+    Uses ``os.scandir``, whose entries carry the file type from the directory
+    read, so only regular files cost a ``stat`` call and no Path objects are
+    built per file.
+    """
+    total = 0
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
 
 
 def cleanup_expired_assets(ttl_hours: int | None = None, dry_run: bool = False) -> dict:
@@ -65,20 +94,19 @@ def cleanup_expired_assets(ttl_hours: int | None = None, dry_run: bool = False)
     orphaned_count = 0
     freed_bytes = 0
 
-    # Get expired jobs from database
-    expired_jobs = asyncio.run(_get_expired_jobs(ttl_hours))
-    expired_job_ids = {job.id for job in expired_jobs}
-
-    # Get all job IDs for orphan detection
-    all_job_ids = asyncio.run(_get_all_job_ids())
-
     cutoff_time = datetime.utcnow() - timedelta(hours=ttl_hours)
 
+    # Expired jobs, plus all job IDs for orphan detection
+    expired_job_ids, all_job_ids = run_coro(_load_job_sets(cutoff_time))
+
     # Scan cover_assets directory
     if not cover_root.is_dir():
         logger.warning("Cover assets path is not a directory: %s", cover_root)
         return {"deleted_count": 0, "freed_bytes": 0, "orphaned_count": 0}
 
+    # (directory, size) pairs to remove once the scan is done
+    deletions: List[Tuple[Path, int]] = []
+
     for job_dir in cover_root.iterdir():
         if not job_dir.is_dir():
             continue
@@ -91,7 +119,7 @@ def cleanup_expired_assets(ttl_hours: int | None = None, dry_run: bool = False)
 
         # Check if this is an expired job
         if job_id in expired_job_ids:
-            dir_size = sum(f.stat().st_size for f in job_dir.rglob('*') if f.is_file())
+            dir_size = _dir_size(job_dir)
 
             if dry_run:
                 logger.info("[DRY RUN] Would delete expired job directory: %s (%.2f MB)",
@@ -99,8 +127,7 @@ def cleanup_expired_assets(ttl_hours: int | None = None, dry_run: bool = False)
             else:
                 logger.info("Deleting expired job directory: %s (%.2f MB)",
                            job_dir, dir_size / (1024 * 1024))
-                shutil.rmtree(job_dir)
-                freed_bytes += dir_size
+                deletions.append((job_dir, dir_size))
 
             deleted_count += 1
 
@@ -109,7 +136,7 @@ def cleanup_expired_assets(ttl_hours: int | None = None, dry_run: bool = False)
             # Check directory age
             dir_mtime = datetime.fromtimestamp(job_dir.stat().st_mtime)
             if dir_mtime < cutoff_time:
-                dir_size = sum(f.stat().st_size for f in job_dir.rglob('*') if f.is_file())
+                dir_size = _dir_size(job_dir)
 
                 if dry_run:
                     logger.info("[DRY RUN] Would delete orphaned directory: %s (%.2f MB)",
@@ -117,11 +144,17 @@ def cleanup_expired_assets(ttl_hours: int | None = None, dry_run: bool = False)
                 else:
                     logger.info("Deleting orphaned directory: %s (%.2f MB)",
                                job_dir, dir_size / (1024 * 1024))
-                    shutil.rmtree(job_dir)
-                    freed_bytes += dir_size
+                    deletions.append((job_dir, dir_size))
 
                 orphaned_count += 1
 
+    if deletions:
+        with ThreadPoolExecutor(max_workers=min(_MAX_DELETE_WORKERS, len(deletions))) as pool:
+            # Consuming the results re-raises the first rmtree failure, as before
+            for _ in pool.map(shutil.rmtree, [path for path, _ in deletions]):
+                pass
+        freed_bytes = sum(size for _, size in deletions)
+
     logger.info("Cleanup complete: deleted=%d, orphaned=%d, freed=%.2f MB",
                deleted_count, orphaned_count, freed_bytes / (1024 * 1024))
 
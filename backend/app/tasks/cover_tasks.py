@@ -2,19 +2,58 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
+import time
 from pathlib import Path
+from typing import Awaitable, Callable, Optional
 import uuid
 
 from app.db.session import async_session_maker
-from app.services.cover_job_service import get_cover_job, update_cover_job
+from app.services.cover_job_service import claim_cover_job, get_cover_job, update_cover_job
 from app.services.cover_pipeline import CoverPipeline
 from app.services.history_service import record_history
 from app.tasks.celery_app import celery_app
+from app.tasks.runtime import run_coro
 
 logger = logging.getLogger(__name__)
 
+# Within one stage, progress is written once it has advanced this many
+# points, or once this many seconds have passed since the last write
+_PROGRESS_FLUSH_STEP = 5
+_PROGRESS_FLUSH_INTERVAL = 1.0
+
+
+class ProgressAggregator:
+    """
+    Progress callback that only writes meaningful changes.
+
+    A report is passed to ``flush`` when the stage changes, when progress
+    has advanced by at least ``_PROGRESS_FLUSH_STEP`` points or
+    ``_PROGRESS_FLUSH_INTERVAL`` seconds have passed since the last write,
+    or when it reaches 100; other reports are dropped.
+    """
+
+    def __init__(self, flush: Callable[[str, int], Awaitable[None]]):
+        """
+        Args:
+            flush: Coroutine that persists a (stage, progress) report
+        """
+        self._flush = flush
+        self._last_stage: Optional[str] = None
+        self._last_progress = -1
+        self._last_write = 0.0
+
+    async def __call__(self, stage: str, progress: int) -> None:
+        now = time.monotonic()
+        if (
+            stage != self._last_stage
+            or progress - self._last_progress >= _PROGRESS_FLUSH_STEP
+            or now - self._last_write >= _PROGRESS_FLUSH_INTERVAL
+            or progress == 100
+        ):
+            self._last_stage, self._last_progress, self._last_write = stage, progress, now
+            await self._flush(stage, progress)
+
 
 async def _update_job(job_id: uuid.UUID, **kwargs) -> None:
     async with async_session_maker() as session:
@@ -26,6 +65,11 @@ async def _get_job(job_id: uuid.UUID):
         return await get_cover_job(session, job_id)
 
 
+async def _claim_job(job_id: uuid.UUID):
+    async with async_session_maker() as session:
+        return await claim_cover_job(session, job_id)
+
+
 async def _record_cover_history(
     *,
     user_id,
@@ -47,26 +91,24 @@ async def _record_cover_history(
         )
 
 
-@celery_app.task(bind=True, name="cover.run_cover_job")
-def run_cover_job(self, job_id: str) -> dict:
-    """Run the full cover generation pipeline for a job id."""
+async def _run_cover_job(job_id: str) -> dict:
     job_uuid = uuid.UUID(job_id)
-    job = asyncio.run(_get_job(job_uuid))
+    # Fetch and mark running in one statement; only a miss needs a second look
+    job = await _claim_job(job_uuid)
     if job is None:
-        raise RuntimeError(f"cover job not found: {job_id}")
-
-    if job.status == "canceled":
+        if await _get_job(job_uuid) is None:
+            raise RuntimeError(f"cover job not found: {job_id}")
         return {"job_id": job_id, "status": "canceled"}
 
-    def report(stage: str, progress: int) -> None:
-        asyncio.run(_update_job(job_uuid, status="running", stage=stage, progress=progress))
+    async def write_progress(stage: str, progress: int) -> None:
+        await _update_job(job_uuid, status="running", stage=stage, progress=progress)
 
-    try:
-        report("preprocess", 5)
+    report = ProgressAggregator(write_progress)
 
+    try:
         pipeline = CoverPipeline()
         job_root = Path(job.input_song_path).resolve().parents[1]
-        result = pipeline.run(
+        result = await pipeline.run(
             work_root=job_root,
             reference_voice=Path(job.input_voice_path),
             song_input=Path(job.input_song_path),
@@ -75,23 +117,32 @@ def run_cover_job(self, job_id: str) -> dict:
             progress_callback=report,
         )
 
-        asyncio.run(
-            _update_job(
-                job_uuid,
-                status="succeeded",
-                stage="finalize",
-                progress=100,
-                output_vocal_path=str(result.vocal_path),
-                output_inst_path=str(result.inst_path),
-                output_mix_path=str(result.mix_path),
-                error_message=None,
-            )
+        mix_stat = result.mix_path.stat()
+        await _update_job(
+            job_uuid,
+            status="succeeded",
+            stage="finalize",
+            progress=100,
+            output_vocal_path=str(result.vocal_path),
+            output_inst_path=str(result.inst_path),
+            output_mix_path=str(result.mix_path),
+            output_mix_filename=result.mix_path.relative_to(job_root).as_posix(),
+            output_size_bytes=mix_stat.st_size,
+            output_mtime=mix_stat.st_mtime,
+            error_message=None,
         )
-        asyncio.run(_record_cover_history(user_id=job.user_id, status="success"))
+        await _record_cover_history(user_id=job.user_id, status="success")
         return {"job_id": job_id, "status": "succeeded", "output": str(result.mix_path)}
     except Exception as exc:
         logger.exception("cover pipeline failed for job_id=%s", job_id)
         msg = str(exc)
-        asyncio.run(_update_job(job_uuid, status="failed", stage="finalize", progress=100, error_message=msg))
-        asyncio.run(_record_cover_history(user_id=job.user_id, status="error", error_message=msg))
+        await _update_job(job_uuid, status="failed", stage="finalize", progress=100, error_message=msg)
+        await _record_cover_history(user_id=job.user_id, status="error", error_message=msg)
         raise
+
+
+@celery_app.task(bind=True, name="cover.run_cover_job")
+def run_cover_job(self, job_id: str) -> dict:
+    """Run the full cover generation pipeline for a job id."""
+    # Pipeline subprocesses and progress writes share the worker's event loop
+    return run_coro(_run_cover_job(job_id))
@@ -0,0 +1,50 @@
+"""Event loop shared by the async parts of Celery tasks."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _loop_pid
+    with _lock:
+        # A loop thread does not survive fork, so each worker process starts its own
+        if _loop is None or _loop_pid != os.getpid():
+            _loop = asyncio.new_event_loop()
+            _loop_pid = os.getpid()
+            threading.Thread(target=_loop.run_forever, name="task-event-loop", daemon=True).start()
+        return _loop
+
+
+def run_coro(coro: Coroutine[object, object, T]) -> T:
+    """
+    Run a coroutine to completion on the process-wide task event loop.
+
+    Unlike ``asyncio.run``, the loop is created once per process and kept,
+    so pooled database connections (which belong to the loop that opened
+    them) are reused across tasks instead of being re-established. The loop
+    runs in a background thread, which lets tasks executing on different
+    worker threads share it. If the caller is interrupted (e.g. a Celery
+    soft time limit), the coroutine is cancelled.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
@@ -1,19 +1,119 @@
-"""Initialize database with tables."""
+"""Initialize database with tables, and upgrade tables created by older versions."""
 import asyncio
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import inspect, select, update
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.core.config import settings
 from app.db.base import Base
 from app.db.models import User, RefreshToken, SynthesisHistory, CoverJob
 
+# Nullable columns added to existing tables after their first release.
+# create_all never alters a table that already exists, so these are added
+# with ALTER TABLE when missing; new columns must be nullable (or have a
+# server default) for that to work on tables with rows.
+ADDED_COLUMNS: Dict[str, List[str]] = {
+    CoverJob.__tablename__: ["output_mix_filename", "output_size_bytes", "output_mtime"],
+}
+
+# Indexes added to existing tables after their first release; like columns,
+# create_all only builds them along with a new table.
+ADDED_INDEXES: Dict[str, List[str]] = {
+    CoverJob.__tablename__: ["ix_cover_jobs_user_status_created"],
+    RefreshToken.__tablename__: ["ix_refresh_tokens_user_expires"],
+    SynthesisHistory.__tablename__: ["ix_synthesis_history_user_id_created_at"],
+}
+
+
+def _add_missing_columns(conn: Connection) -> List[str]:
+    """
+    Add any ``ADDED_COLUMNS`` entry the database does not have yet.
+
+    Returns:
+        "table.column" names that were added
+    """
+    inspector = inspect(conn)
+    added = []
+    for table_name, column_names in ADDED_COLUMNS.items():
+        table = Base.metadata.tables[table_name]
+        existing = {column["name"] for column in inspector.get_columns(table_name)}
+        for name in column_names:
+            if name in existing:
+                continue
+            column_type = table.c[name].type.compile(dialect=conn.dialect)
+            conn.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}")
+            added.append(f"{table_name}.{name}")
+    return added
+
+
+def _add_missing_indexes(conn: Connection) -> List[str]:
+    """
+    Create any ``ADDED_INDEXES`` entry the database does not have yet.
+
+    Returns:
+        Names of the indexes that were created
+    """
+    inspector = inspect(conn)
+    created = []
+    for table_name, index_names in ADDED_INDEXES.items():
+        indexes = {index.name: index for index in Base.metadata.tables[table_name].indexes}
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        for name in index_names:
+            if name in existing:
+                continue
+            indexes[name].create(conn, checkfirst=True)
+            created.append(name)
+    return created
+
+
+def _backfill_mix_filenames(conn: Connection) -> int:
+    """
+    Fill ``output_mix_filename`` for results stored before the column existed.
+
+    The job directory is derived from the input song path, as the cover task
+    does when it records a new result. Rows whose mix lies outside their job
+    directory are left as they are; downloads keep using their absolute path.
+
+    Returns:
+        Number of rows updated
+    """
+    jobs = CoverJob.__table__
+    rows = conn.execute(
+        select(jobs.c.id, jobs.c.input_song_path, jobs.c.output_mix_path).where(
+            jobs.c.output_mix_filename.is_(None), jobs.c.output_mix_path.is_not(None)
+        )
+    ).all()
+    updated = 0
+    for row in rows:
+        job_root = Path(row.input_song_path).resolve().parents[1]
+        try:
+            filename = Path(row.output_mix_path).resolve().relative_to(job_root).as_posix()
+        except ValueError:
+            continue
+        conn.execute(update(jobs).where(jobs.c.id == row.id).values(output_mix_filename=filename))
+        updated += 1
+    return updated
+
 
 async def init_db():
-    """Create all database tables."""
+    """Create missing tables and add columns and indexes introduced since they were created."""
     engine = create_async_engine(settings.DATABASE_URL, echo=True)
-    
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    
+        added = await conn.run_sync(_add_missing_columns)
+        indexed = await conn.run_sync(_add_missing_indexes)
+        backfilled = await conn.run_sync(_backfill_mix_filenames)
+
     await engine.dispose()
+    for column in added:
+        print(f"[OK] Added column {column}")
+    for index in indexed:
+        print(f"[OK] Created index {index}")
+    if backfilled:
+        print(f"[OK] Recorded relative mix paths for {backfilled} existing cover jobs")
     print("[OK] Database initialized successfully")
 
 
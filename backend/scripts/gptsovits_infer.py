@@ -3,18 +3,25 @@
 
 This script keeps the existing CLI contract used by backend/Celery while
 switching conversion to GPT-SoVITS official TTS runtime APIs.
+
+ASR only seeds the prompt/target text, so it decodes greedily by default.
+Environment overrides: COVER_ASR_MODEL (faster-whisper model, default
+"small") and COVER_ASR_BEAM (beam size, default 1).
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import logging
 import math
 import os
+import shutil
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Optional, Tuple
 
@@ -25,10 +32,17 @@ import soundfile as sf
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s", stream=sys.stderr)
 logger = logging.getLogger(__name__)
 _FW_MODEL: Any = None
+_ASR_MODEL = os.environ.get("COVER_ASR_MODEL", "small")
+_ASR_BEAM = int(os.environ.get("COVER_ASR_BEAM", "1"))
+# GPT-SoVITS runtime kept for the life of the process (see infer())
+_TTS: Any = None
+_TTS_KEY: Optional[Tuple[Path, str]] = None
+_CUR_MODEL_ID: Optional[str] = None
+_DEFAULT_WEIGHTS: Tuple[str, str] = ("", "")
 
 
 def _run_ffmpeg(args: list[str]) -> None:
-    subprocess.run(args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    subprocess.run(args, check=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 
 def _build_atempo_chain(rate_factor: float) -> str:
@@ -74,34 +88,110 @@ def _fallback_text(lang: str) -> str:
     return "Hello."
 
 
-def _transcribe_with_faster_whisper(audio_path: Path) -> Optional[Tuple[str, str]]:
+def _asr_device() -> str:
+    return "cuda" if os.environ.get("CUDA_VISIBLE_DEVICES", "") != "" or os.path.exists("/dev/nvidia0") else "cpu"
+
+
+def _faster_whisper_model(device: str) -> Any:
     global _FW_MODEL
-    try:
+    if _FW_MODEL is None:
         from faster_whisper import WhisperModel
+
+        compute_type = "float16" if device == "cuda" else "int8"
+        _FW_MODEL = WhisperModel(_ASR_MODEL, device=device, compute_type=compute_type)
+    return _FW_MODEL
+
+
+def _transcribe_with_faster_whisper(audio_path: Path) -> Optional[Tuple[str, str]]:
+    try:
+        import faster_whisper  # noqa: F401
     except Exception:
         return None
 
-    device = "cuda" if os.environ.get("CUDA_VISIBLE_DEVICES", "") != "" or os.path.exists("/dev/nvidia0") else "cpu"
-    compute_type = "float16" if device == "cuda" else "int8"
+    device = _asr_device()
     logger.info("ASR(faster-whisper): %s device=%s", audio_path.name, device)
 
-    if _FW_MODEL is None:
-        _FW_MODEL = WhisperModel("small", device=device, compute_type=compute_type)
-
-    segments, info = _FW_MODEL.transcribe(
+    model = _faster_whisper_model(device)
+    # Cheap pass first: greedy, no VAD model, no conditioning on prior text
+    segments, info = model.transcribe(
         audio=str(audio_path),
-        beam_size=5,
-        vad_filter=True,
-        vad_parameters={"min_silence_duration_ms": 700},
+        beam_size=_ASR_BEAM,
+        best_of=1,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        vad_filter=False,
         language=None,
     )
     text = "".join(seg.text for seg in segments).strip()
+    if not text:
+        logger.info("ASR(faster-whisper): empty greedy result, retrying with beam search + VAD")
+        segments, info = model.transcribe(
+            audio=str(audio_path),
+            beam_size=5,
+            vad_filter=True,
+            vad_parameters={"min_silence_duration_ms": 700},
+            language=None,
+        )
+        text = "".join(seg.text for seg in segments).strip()
     if not text:
         return None
     lang = _normalize_language(getattr(info, "language", None))
     return text, lang
 
 
+_ASR_SAMPLE_RATE = 16000
+_PAIR_GAP_SECONDS = 1.0
+
+
+def _transcribe_pair_with_faster_whisper(
+    reference_path: Path, target_path: Path
+) -> Optional[Tuple[Tuple[str, str], Tuple[str, str]]]:
+    """Transcribe ``[reference, silence, target]`` in one decode and split the text at the gap."""
+    try:
+        from faster_whisper import decode_audio
+    except Exception:
+        return None
+
+    device = _asr_device()
+    logger.info("ASR(faster-whisper, paired): %s + %s device=%s", reference_path.name, target_path.name, device)
+    model = _faster_whisper_model(device)
+
+    reference = decode_audio(str(reference_path), sampling_rate=_ASR_SAMPLE_RATE)
+    target = decode_audio(str(target_path), sampling_rate=_ASR_SAMPLE_RATE)
+    gap = np.zeros(int(_PAIR_GAP_SECONDS * _ASR_SAMPLE_RATE), dtype=reference.dtype)
+    boundary = (len(reference) + len(gap) / 2) / _ASR_SAMPLE_RATE
+
+    try:
+        from faster_whisper import BatchedInferencePipeline
+
+        transcriber: Any = BatchedInferencePipeline(model=model)
+        extra: dict[str, Any] = {"batch_size": 16}
+    except Exception:
+        transcriber, extra = model, {}
+
+    segments, info = transcriber.transcribe(
+        np.concatenate([reference, gap, target]),
+        beam_size=_ASR_BEAM,
+        temperature=0.0,
+        # VAD stays on here: it is what splits the decode at the silent gap
+        vad_filter=True,
+        vad_parameters={"min_silence_duration_ms": 700},
+        language=None,
+        **extra,
+    )
+    ref_parts: list[str] = []
+    tgt_parts: list[str] = []
+    for seg in segments:
+        (ref_parts if (seg.start + seg.end) / 2 < boundary else tgt_parts).append(seg.text)
+
+    ref_text = "".join(ref_parts).strip()
+    tgt_text = "".join(tgt_parts).strip()
+    if not ref_text or not tgt_text:
+        return None
+    lang = _normalize_language(getattr(info, "language", None))
+    return (ref_text, lang), (tgt_text, lang)
+
+
 def _transcribe_with_openai_whisper(audio_path: Path) -> Optional[Tuple[str, str]]:
     try:
         import whisper
@@ -134,6 +224,25 @@ def _transcribe_audio(audio_path: Path) -> Tuple[str, str]:
     return "Hello.", "en"
 
 
+def _transcribe_pair(reference_path: Path, target_path: Path) -> Tuple[Tuple[str, str], Tuple[str, str]]:
+    """
+    Transcribe the reference and target audio, in a single decode when possible.
+
+    The single pass detects one language for both clips; if it fails or
+    either clip comes back empty, each clip is transcribed on its own.
+    """
+    try:
+        got = _transcribe_pair_with_faster_whisper(reference_path, target_path)
+    except Exception as exc:
+        logger.warning("Paired ASR failed: %s", exc)
+        got = None
+    if got:
+        for (text, lang), path in zip(got, (reference_path, target_path)):
+            logger.info("ASR ok (paired) %s: lang=%s text=%s", path.name, lang, text[:80].replace("\n", " "))
+        return got
+    return _transcribe_audio(reference_path), _transcribe_audio(target_path)
+
+
 def _read_weight_json(project_root: Path) -> dict[str, Any]:
     path = project_root / "weight.json"
     if not path.exists():
@@ -151,6 +260,54 @@ def _resolve_path(project_root: Path, raw: str) -> Path:
     return (project_root / p).resolve()
 
 
+_WEIGHT_DIR_PREFIXES = ("GPT_weights", "SoVITS_weights")
+
+
+def _walk_weight_dirs(project_root: Path):
+    """Yield every directory under the GPT_weights*/SoVITS_weights* roots, with its prefix."""
+    with os.scandir(project_root) as entries:
+        stack = [
+            (prefix, entry.path)
+            for entry in entries
+            for prefix in _WEIGHT_DIR_PREFIXES
+            if entry.name.startswith(prefix) and entry.is_dir()
+        ]
+    while stack:
+        prefix, path = stack.pop()
+        yield prefix, path
+        with os.scandir(path) as entries:
+            stack.extend((prefix, entry.path) for entry in entries if entry.is_dir())
+
+
+def _weights_signature(project_root: Path) -> Tuple[Tuple[str, int], ...]:
+    """Modification times of the weight directories; changes when a checkpoint is added or removed."""
+    return tuple(sorted((path, os.stat(path).st_mtime_ns) for _, path in _walk_weight_dirs(project_root)))
+
+
+@functools.lru_cache(maxsize=1)
+def _index_weights(
+    project_root: Path, signature: Tuple[Tuple[str, int], ...]
+) -> Tuple[Tuple[Tuple[str, Path], ...], Tuple[Tuple[str, Path], ...]]:
+    """
+    List GPT (.ckpt) and SoVITS (.pth) checkpoints as (lowercase name, path), newest first.
+
+    Cached on ``signature``, so the files are only listed and stat'ed again
+    after a weight directory changes.
+    """
+    found: dict[str, list[Tuple[float, str, Path]]] = {prefix: [] for prefix in _WEIGHT_DIR_PREFIXES}
+    suffixes = {"GPT_weights": ".ckpt", "SoVITS_weights": ".pth"}
+    for prefix, path in _walk_weight_dirs(project_root):
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.endswith(suffixes[prefix]) and entry.is_file():
+                    found[prefix].append((entry.stat().st_mtime, entry.name.lower(), Path(entry.path).resolve()))
+
+    def newest_first(items: list[Tuple[float, str, Path]]) -> Tuple[Tuple[str, Path], ...]:
+        return tuple((name, path) for _, name, path in sorted(items, key=lambda item: item[0], reverse=True))
+
+    return newest_first(found["GPT_weights"]), newest_first(found["SoVITS_weights"])
+
+
 def _resolve_model_weights(project_root: Path, model_id: str) -> Tuple[Path, Path]:
     wanted = model_id.strip()
     if not wanted:
@@ -172,18 +329,11 @@ def _resolve_model_weights(project_root: Path, model_id: str) -> Tuple[Path, Pat
         if gpt_files and sovits_files:
             return gpt_files[0], sovits_files[0]
 
-    gpt_candidates = sorted(
-        [p for p in project_root.glob("GPT_weights*/**/*.ckpt") if wanted.lower() in p.name.lower()],
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-    sovits_candidates = sorted(
-        [p for p in project_root.glob("SoVITS_weights*/**/*.pth") if wanted.lower() in p.name.lower()],
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-    if gpt_candidates and sovits_candidates:
-        return gpt_candidates[0].resolve(), sovits_candidates[0].resolve()
+    gpt_index, sovits_index = _index_weights(project_root, _weights_signature(project_root))
+    gpt_match = next((p for name, p in gpt_index if wanted.lower() in name), None)
+    sovits_match = next((p for name, p in sovits_index if wanted.lower() in name), None)
+    if gpt_match and sovits_match:
+        return gpt_match, sovits_match
 
     raise RuntimeError(
         f"cannot resolve model_id={model_id!r}; expected key in weight.json, "
@@ -191,8 +341,8 @@ def _resolve_model_weights(project_root: Path, model_id: str) -> Tuple[Path, Pat
     )
 
 
-def _load_gptsovits_model(project_root: Path, model_id: str) -> Any:
-    logger.info("Loading GPT-SoVITS runtime, model_id=%s", model_id)
+def _build_tts(project_root: Path, precision: str) -> Any:
+    logger.info("Loading GPT-SoVITS runtime, precision=%s", precision)
     sys.path.insert(0, str(project_root))
     sys.path.insert(0, str(project_root / "GPT_SoVITS"))
 
@@ -207,15 +357,47 @@ def _load_gptsovits_model(project_root: Path, model_id: str) -> Any:
     ]
     config_path = next((p for p in config_candidates if p.exists()), None)
     tts_cfg = TTS_Config(str(config_path)) if config_path else TTS_Config()
-    tts = TTS(tts_cfg)
+    if precision != "config":
+        # The runtime casts its inputs to match (TTS.precision follows is_half);
+        # half precision is only honoured on CUDA, as TTS_Config itself enforces
+        tts_cfg.is_half = precision == "fp16" and "cuda" in str(tts_cfg.device)
+    return TTS(tts_cfg)
+
+
+def _load_gptsovits_model(project_root: Path, model_id: str, precision: str = "config") -> Any:
+    """Return the runtime with ``model_id``'s weights, reusing what this process has loaded."""
+    global _TTS, _TTS_KEY, _CUR_MODEL_ID, _DEFAULT_WEIGHTS
+    model_id = model_id or "default"
+    if _TTS is None or _TTS_KEY != (project_root, precision):
+        _TTS = _build_tts(project_root, precision)
+        _TTS_KEY = (project_root, precision)
+        _CUR_MODEL_ID = "default"
+        configs = getattr(_TTS, "configs", None)
+        _DEFAULT_WEIGHTS = (
+            str(getattr(configs, "t2s_weights_path", "") or ""),
+            str(getattr(configs, "vits_weights_path", "") or ""),
+        )
 
-    if model_id and model_id != "default":
-        gpt_weights, sovits_weights = _resolve_model_weights(project_root, model_id)
-        logger.info("Switch model weights: gpt=%s", gpt_weights)
-        logger.info("Switch model weights: sovits=%s", sovits_weights)
-        tts.init_t2s_weights(str(gpt_weights))
-        tts.init_vits_weights(str(sovits_weights))
-    return tts
+    if model_id == _CUR_MODEL_ID:
+        logger.info("Reusing loaded GPT-SoVITS weights, model_id=%s", model_id)
+        return _TTS
+
+    if model_id == "default":
+        gpt_weights, sovits_weights = _DEFAULT_WEIGHTS
+        if not (gpt_weights and sovits_weights):
+            # Default checkpoint paths unknown; rebuild from the config
+            _TTS = None
+            return _load_gptsovits_model(project_root, model_id, precision)
+    else:
+        gpt_path, sovits_path = _resolve_model_weights(project_root, model_id)
+        gpt_weights, sovits_weights = str(gpt_path), str(sovits_path)
+    logger.info("Switch model weights: gpt=%s", gpt_weights)
+    logger.info("Switch model weights: sovits=%s", sovits_weights)
+    # Only the checkpoints change; the runtime (BERT/HuBERT, device setup) is kept
+    _TTS.init_t2s_weights(gpt_weights)
+    _TTS.init_vits_weights(sovits_weights)
+    _CUR_MODEL_ID = model_id
+    return _TTS
 
 
 def _synthesize_with_gptsovits(
@@ -261,15 +443,49 @@ def _synthesize_with_gptsovits(
     }
 
     last_sr: Optional[int] = None
-    last_audio: Optional[np.ndarray] = None
+    chunks: list[np.ndarray] = []
     for sr, audio in tts.run(infer_inputs):
         last_sr = int(sr)
-        last_audio = np.asarray(audio)
+        chunks.append(np.asarray(audio))
 
-    if last_sr is None or last_audio is None:
+    if last_sr is None or not chunks:
         raise RuntimeError("GPT-SoVITS inference produced no audio output")
 
-    sf.write(str(output_path), last_audio, last_sr, subtype="PCM_16")
+    audio = chunks[0] if len(chunks) == 1 else np.concatenate(chunks, axis=0)
+    if np.issubdtype(audio.dtype, np.floating):
+        # Float output: quantise in one float32 pass. The runtime normally
+        # yields int16 already, which is written as-is.
+        scaled = np.multiply(audio, 32767.0, dtype=np.float32)
+        audio = np.clip(scaled, -32768.0, 32767.0, out=scaled).astype(np.int16)
+    sf.write(str(output_path), audio, last_sr, subtype="PCM_16")
+
+
+def _pitch_shift_in_memory(input_path: Path, output_path: Path, pitch_semitones: int) -> bool:
+    try:
+        import librosa
+    except Exception:
+        return False
+
+    audio, sr = sf.read(str(input_path), dtype="float32")
+    # librosa expects channels first; soundfile returns frames first
+    shifted = librosa.effects.pitch_shift(audio.T, sr=sr, n_steps=float(pitch_semitones))
+    sf.write(str(output_path), shifted.T, sr, subtype="PCM_16")
+    return True
+
+
+def _pitch_shift_with_cli(input_path: Path, output_path: Path, pitch_semitones: int) -> bool:
+    commands = []
+    if shutil.which("rubberband"):
+        commands.append(["rubberband", "-q", "-p", str(pitch_semitones), str(input_path), str(output_path)])
+    if shutil.which("sox"):
+        commands.append(["sox", str(input_path), "-b", "16", str(output_path), "pitch", str(pitch_semitones * 100)])
+    for cmd in commands:
+        try:
+            subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return True
+        except subprocess.CalledProcessError as exc:
+            logger.warning("Pitch shift via %s failed: %s", cmd[0], exc)
+    return False
 
 
 def _apply_pitch_shift(input_path: Path, output_path: Path, pitch_semitones: int) -> None:
@@ -277,6 +493,19 @@ def _apply_pitch_shift(input_path: Path, output_path: Path, pitch_semitones: int
         return
 
     logger.info("Applying pitch shift: %+d semitones", pitch_semitones)
+    # Resample + time-stretch in memory when librosa is available (it ships
+    # with GPT-SoVITS), avoiding an ffmpeg process and a temporary WAV
+    try:
+        if _pitch_shift_in_memory(input_path, output_path, pitch_semitones):
+            return
+    except Exception as exc:
+        logger.warning("In-memory pitch shift failed, falling back to external tools: %s", exc)
+
+    # Single-pass shifters for any interval; ffmpeg's atempo is limited to
+    # 0.5-2.0 per stage, so large shifts need a chain of WSOLA passes
+    if _pitch_shift_with_cli(input_path, output_path, pitch_semitones):
+        return
+
     rate_factor = math.pow(2.0, float(pitch_semitones) / 12.0)
     atempo = _build_atempo_chain(rate_factor)
     sr = sf.info(str(input_path)).samplerate
@@ -288,6 +517,12 @@ def _apply_pitch_shift(input_path: Path, output_path: Path, pitch_semitones: int
         _run_ffmpeg(
             [
                 "ffmpeg",
+                "-hide_banner",
+                "-nostats",
+                "-loglevel",
+                "error",
+                "-threads",
+                "0",
                 "-y",
                 "-i",
                 str(input_path),
@@ -304,20 +539,30 @@ def _apply_pitch_shift(input_path: Path, output_path: Path, pitch_semitones: int
             tmp_path.unlink()
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description="GPT-SoVITS voice conversion inference")
-    parser.add_argument("--project-root", required=True, help="Path to GPT-SoVITS project root")
-    parser.add_argument("--reference", required=True, help="Reference audio file (target voice)")
-    parser.add_argument("--input", required=True, help="Input vocal file to convert")
-    parser.add_argument("--output", required=True, help="Output audio file path")
-    parser.add_argument("--model-id", default="default", help="Model ID to use (default: pretrained)")
-    parser.add_argument("--pitch", type=int, default=0, help="Pitch shift in semitones")
-    args = parser.parse_args()
-
-    project_root = Path(args.project_root).resolve()
-    reference_audio = Path(args.reference).resolve()
-    input_audio = Path(args.input).resolve()
-    output_audio = Path(args.output).resolve()
+def infer(
+    *,
+    project_root: Path,
+    reference: Path,
+    input_audio: Path,
+    output: Path,
+    model_id: str = "default",
+    pitch: int = 0,
+    precision: str = "config",
+) -> int:
+    """
+    Convert ``input_audio`` to the reference voice and write it to ``output``.
+
+    The loaded runtime is kept at module scope, so a long-running process
+    that imports this module and calls ``infer`` repeatedly only loads the
+    GPT-SoVITS runtime once, and only swaps checkpoints when ``model_id``
+    changes. ``precision`` is "fp16" or "fp32" to override the config's
+    ``is_half``, or "config" to keep it. Returns 0 on success and 1 on
+    failure, like the CLI.
+    """
+    project_root = project_root.resolve()
+    reference_audio = reference.resolve()
+    input_audio = input_audio.resolve()
+    output_audio = output.resolve()
 
     if not project_root.exists():
         raise RuntimeError(f"Project root not found: {project_root}")
@@ -331,8 +576,11 @@ def main() -> int:
     logger.info("Using GPT-SoVITS project root: %s", project_root)
 
     try:
-        ref_text, ref_lang = _transcribe_audio(reference_audio)
-        tgt_text, tgt_lang = _transcribe_audio(input_audio)
+        # ASR and the GPT-SoVITS load are independent; overlap them
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            tts_future = pool.submit(_load_gptsovits_model, project_root, model_id, precision)
+            (ref_text, ref_lang), (tgt_text, tgt_lang) = _transcribe_pair(reference_audio, input_audio)
+            tts = tts_future.result()
         if not ref_text.strip():
             ref_text = _fallback_text(ref_lang)
         if not tgt_text.strip():
@@ -341,8 +589,6 @@ def main() -> int:
         logger.info("Reference language=%s", ref_lang)
         logger.info("Target language=%s", tgt_lang)
 
-        tts = _load_gptsovits_model(project_root, args.model_id)
-
         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
             tmp_output = Path(tmp.name)
         try:
@@ -355,8 +601,8 @@ def main() -> int:
                 target_lang=tgt_lang,
                 output_path=tmp_output,
             )
-            if args.pitch != 0:
-                _apply_pitch_shift(tmp_output, output_audio, args.pitch)
+            if pitch != 0:
+                _apply_pitch_shift(tmp_output, output_audio, pitch)
             else:
                 tmp_output.replace(output_audio)
         finally:
@@ -372,5 +618,32 @@ def main() -> int:
         return 1
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description="GPT-SoVITS voice conversion inference")
+    parser.add_argument("--project-root", required=True, help="Path to GPT-SoVITS project root")
+    parser.add_argument("--reference", required=True, help="Reference audio file (target voice)")
+    parser.add_argument("--input", required=True, help="Input vocal file to convert")
+    parser.add_argument("--output", required=True, help="Output audio file path")
+    parser.add_argument("--model-id", default="default", help="Model ID to use (default: pretrained)")
+    parser.add_argument("--pitch", type=int, default=0, help="Pitch shift in semitones")
+    parser.add_argument(
+        "--precision",
+        choices=("config", "fp32", "fp16"),
+        default="config",
+        help="Model precision; fp16 halves weight memory on CUDA (default: is_half from tts_infer.yaml)",
+    )
+    args = parser.parse_args()
+
+    return infer(
+        project_root=Path(args.project_root),
+        reference=Path(args.reference),
+        input_audio=Path(args.input),
+        output=Path(args.output),
+        model_id=args.model_id,
+        pitch=args.pitch,
+        precision=args.precision,
+    )
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
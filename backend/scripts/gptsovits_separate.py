@@ -8,7 +8,15 @@ import os
 from pathlib import Path
 import shutil
 import subprocess
+import sys
 import tempfile
+from typing import Any, Dict, Tuple
+import wave
+
+# Loaded separators, keyed by (project_root, model, device, is_half, agg);
+# oldest evicted first. See separate().
+_UVR_CACHE_SIZE = 2
+_UVR_CACHE: Dict[Tuple[Path, str, str, bool, int], Any] = {}
 
 
 def _pick_latest_audio(path: Path) -> Path:
@@ -23,10 +31,30 @@ def _pick_latest_audio(path: Path) -> Path:
     return files[0]
 
 
+def _is_uvr_ready(src: Path) -> bool:
+    """True if ``src`` is already the 16-bit stereo 44.1 kHz PCM WAV UVR is fed."""
+    try:
+        with wave.open(str(src), "rb") as wav:
+            return wav.getframerate() == 44100 and wav.getnchannels() == 2 and wav.getsampwidth() == 2
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
 def _prepare_input(src: Path, tmp_dir: Path) -> Path:
+    # The cover pipeline passes its preprocessed song, which is already in
+    # this format; re-encoding it would only copy the samples
+    if _is_uvr_ready(src):
+        return src
+
     dst = tmp_dir / f"{src.stem}.reformatted.wav"
     cmd = [
         "ffmpeg",
+        "-hide_banner",
+        "-nostats",
+        "-loglevel",
+        "error",
+        "-threads",
+        "0",
         "-y",
         "-i",
         str(src),
@@ -39,36 +67,11 @@ def _prepare_input(src: Path, tmp_dir: Path) -> Path:
         "44100",
         str(dst),
     ]
-    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    subprocess.run(cmd, check=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     return dst
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description="UVR separation wrapper for cover pipeline")
-    parser.add_argument("--project-root", required=True)
-    parser.add_argument("--input", required=True)
-    parser.add_argument("--vocal", required=True)
-    parser.add_argument("--inst", required=True)
-    parser.add_argument("--model", default="HP2_all_vocals")
-    parser.add_argument("--device", default="cuda")
-    parser.add_argument("--is-half", default="true")
-    parser.add_argument("--agg", type=int, default=10)
-    args = parser.parse_args()
-
-    project_root = Path(args.project_root).resolve()
-    input_audio = Path(args.input).resolve()
-    vocal_out = Path(args.vocal).resolve()
-    inst_out = Path(args.inst).resolve()
-    is_half = str(args.is_half).lower() in {"1", "true", "yes", "y"}
-
-    if not project_root.exists():
-        raise RuntimeError(f"project root not found: {project_root}")
-    if not input_audio.exists():
-        raise RuntimeError(f"input audio not found: {input_audio}")
-
-    os.chdir(project_root)
-    import sys
-
+def _build_separator(project_root: Path, model_name: str, device: str, is_half: bool, agg: int) -> Any:
     sys.path.insert(0, str(project_root))
     sys.path.insert(0, str(project_root / "tools" / "uvr5"))
 
@@ -77,10 +80,74 @@ def main() -> int:
     from tools.uvr5.bsroformer import Roformer_Loader
 
     weight_root = project_root / "tools" / "uvr5" / "uvr5_weights"
-    model_name = args.model
+    if model_name == "onnx_dereverb_By_FoxJoy":
+        return MDXNetDereverb(15)
+    if "roformer" in model_name.lower():
+        return Roformer_Loader(
+            model_path=str(weight_root / f"{model_name}.ckpt"),
+            config_path=str(weight_root / f"{model_name}.yaml"),
+            device=device,
+            is_half=is_half,
+        )
+    klass = AudioPre if "DeEcho" not in model_name else AudioPreDeEcho
+    return klass(
+        agg=int(agg),
+        model_path=str(weight_root / f"{model_name}.pth"),
+        device=device,
+        is_half=is_half,
+    )
+
+
+def _get_separator(project_root: Path, model_name: str, device: str, is_half: bool, agg: int) -> Any:
+    """Return a loaded separator, building it only on the first use of this configuration."""
+    key = (project_root, model_name, device, is_half, agg)
+    separator = _UVR_CACHE.get(key)
+    if separator is None:
+        while len(_UVR_CACHE) >= _UVR_CACHE_SIZE:
+            # Drop the oldest model so its weights can be freed
+            _UVR_CACHE.pop(next(iter(_UVR_CACHE)))
+        separator = _build_separator(project_root, model_name, device, is_half, agg)
+        _UVR_CACHE[key] = separator
+    return separator
+
+
+def separate(
+    *,
+    project_root: Path,
+    input_audio: Path,
+    vocal_out: Path,
+    inst_out: Path,
+    model_name: str = "HP2_all_vocals",
+    device: str = "cuda",
+    is_half: bool = True,
+    agg: int = 10,
+) -> None:
+    """
+    Split ``input_audio`` into vocal and instrumental stems.
+
+    Loaded separators are kept at module scope, keyed by model and device
+    settings, so a long-running process that imports this module reuses
+    the UVR weights across songs instead of reloading them per call.
+    """
+    project_root = project_root.resolve()
+    input_audio = input_audio.resolve()
+    vocal_out = vocal_out.resolve()
+    inst_out = inst_out.resolve()
+
+    if not project_root.exists():
+        raise RuntimeError(f"project root not found: {project_root}")
+    if not input_audio.exists():
+        raise RuntimeError(f"input audio not found: {input_audio}")
+
+    os.chdir(project_root)
+    pre_fun = _get_separator(project_root, model_name, device, is_half, agg)
     is_hp3 = "HP3" in model_name
 
-    with tempfile.TemporaryDirectory(prefix="uvr_sep_") as td:
+    vocal_out.parent.mkdir(parents=True, exist_ok=True)
+    inst_out.parent.mkdir(parents=True, exist_ok=True)
+
+    # Scratch space beside the outputs, so the stems can be renamed into place
+    with tempfile.TemporaryDirectory(prefix=".uvr_sep_", dir=vocal_out.parent) as td:
         tmp_dir = Path(td)
         vocal_dir = tmp_dir / "vocal"
         inst_dir = tmp_dir / "inst"
@@ -88,46 +155,38 @@ def main() -> int:
         inst_dir.mkdir(parents=True, exist_ok=True)
 
         prepared = _prepare_input(input_audio, tmp_dir)
-
-        if model_name == "onnx_dereverb_By_FoxJoy":
-            pre_fun = MDXNetDereverb(15)
-        elif "roformer" in model_name.lower():
-            pre_fun = Roformer_Loader(
-                model_path=str(weight_root / f"{model_name}.ckpt"),
-                config_path=str(weight_root / f"{model_name}.yaml"),
-                device=args.device,
-                is_half=is_half,
-            )
-        else:
-            klass = AudioPre if "DeEcho" not in model_name else AudioPreDeEcho
-            pre_fun = klass(
-                agg=int(args.agg),
-                model_path=str(weight_root / f"{model_name}.pth"),
-                device=args.device,
-                is_half=is_half,
-            )
-
-        try:
-            pre_fun._path_audio_(str(prepared), str(inst_dir), str(vocal_dir), "wav", is_hp3)
-        finally:
-            try:
-                if model_name == "onnx_dereverb_By_FoxJoy":
-                    del pre_fun.pred.model
-                    del pre_fun.pred.model_
-                else:
-                    del pre_fun.model
-                del pre_fun
-            except Exception:
-                pass
+        pre_fun._path_audio_(str(prepared), str(inst_dir), str(vocal_dir), "wav", is_hp3)
 
         produced_vocal = _pick_latest_audio(vocal_dir)
         produced_inst = _pick_latest_audio(inst_dir)
 
-        vocal_out.parent.mkdir(parents=True, exist_ok=True)
-        inst_out.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copyfile(produced_vocal, vocal_out)
-        shutil.copyfile(produced_inst, inst_out)
+        # Same filesystem: a rename, not a copy (move falls back to copying otherwise)
+        shutil.move(str(produced_vocal), str(vocal_out))
+        shutil.move(str(produced_inst), str(inst_out))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="UVR separation wrapper for cover pipeline")
+    parser.add_argument("--project-root", required=True)
+    parser.add_argument("--input", required=True)
+    parser.add_argument("--vocal", required=True)
+    parser.add_argument("--inst", required=True)
+    parser.add_argument("--model", default="HP2_all_vocals")
+    parser.add_argument("--device", default="cuda")
+    parser.add_argument("--is-half", default="true")
+    parser.add_argument("--agg", type=int, default=10)
+    args = parser.parse_args()
 
+    separate(
+        project_root=Path(args.project_root),
+        input_audio=Path(args.input),
+        vocal_out=Path(args.vocal),
+        inst_out=Path(args.inst),
+        model_name=args.model,
+        device=args.device,
+        is_half=str(args.is_half).lower() in {"1", "true", "yes", "y"},
+        agg=args.agg,
+    )
     return 0
 
 
@@ -0,0 +1,74 @@
+"""Shared pytest configuration for the backend tests.
+
+The environment is fixed here, before any ``app`` module is imported, so
+settings are parsed and the database engine is created exactly once per
+test session instead of being reloaded by individual tests. Under
+pytest-xdist every worker is its own process, so each gets a private
+in-memory database and asset directory.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Ensure backend root is on path
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_ROOT))
+
+# An in-memory SQLite database lives as long as its connection. SQLAlchemy
+# uses one static connection for it, so the schema persists until dispose().
+MEMORY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+
+_asset_root: str | None = None
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune every new test database connection for speed over durability."""
+    cursor = dbapi_connection.cursor()
+    # No WAL: an in-memory database always uses the "memory" journal mode
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")
+    cursor.close()
+    # Let SQLAlchemy issue BEGIN itself (see _sqlite_begin); sqlite3's implicit
+    # transactions would otherwise commit around SAVEPOINTs and defeat rollback
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(Engine, "begin")
+def _sqlite_begin(connection) -> None:
+    connection.exec_driver_sql("BEGIN")
+
+
+def pytest_configure(config) -> None:
+    global _asset_root
+    _asset_root = tempfile.mkdtemp(prefix="cover_assets_")
+    os.environ["DATABASE_URL"] = MEMORY_DATABASE_URL
+    # Force eager mode so Celery tasks run in-process without Redis broker
+    os.environ["CELERY_TASK_ALWAYS_EAGER"] = "true"
+    # Surface task failures in the test instead of only on the job row
+    os.environ["CELERY_TASK_EAGER_PROPAGATES"] = "true"
+    os.environ["COVER_ASSET_ROOT"] = _asset_root
+
+
+def pytest_collection_modifyitems(config, items) -> None:
+    if shutil.which("ffmpeg") is not None:
+        return
+    skip_ffmpeg = pytest.mark.skip(reason="ffmpeg is not on PATH")
+    for item in items:
+        if "ffmpeg" in item.keywords:
+            item.add_marker(skip_ffmpeg)
+
+
+def pytest_unconfigure(config) -> None:
+    if _asset_root is not None:
+        shutil.rmtree(_asset_root, ignore_errors=True)
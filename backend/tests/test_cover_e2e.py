@@ -3,33 +3,34 @@
 Tests cover the full lifecycle:
 1. Module imports & config validation
 2. DB CRUD for cover jobs
-3. API endpoint smoke tests (via TestClient)
+3. API endpoint smoke tests (via httpx ASGI transport)
 4. Celery task dispatch (eager mode)
 5. Cleanup task validation
 
 Run with:
     cd backend
     python -m pytest tests/test_cover_e2e.py -v
+
+Tests marked ``ffmpeg`` run the real binary and are skipped when it is not
+on PATH; ``-m ffmpeg`` selects only those.
 """
 
 from __future__ import annotations
 
 import asyncio
+import math
 import os
 import sys
 import uuid
 import wave
-import struct
+from array import array
+from datetime import datetime, timedelta
 from pathlib import Path
 
 import pytest
 
-# Ensure backend root is on path
-BACKEND_ROOT = Path(__file__).resolve().parent.parent
-sys.path.insert(0, str(BACKEND_ROOT))
-
-# Force eager mode so Celery tasks run in-process without Redis broker
-os.environ["CELERY_TASK_ALWAYS_EAGER"] = "true"
+# Job ID that no test creates, so lookups for it always miss
+MISSING_JOB_ID = "00000000-0000-0000-0000-000000000000"
 
 # Add ffmpeg to PATH if in conda env
 FFMPEG_DIR = Path(r"D:\conda\envs\voice_api\Library\bin")
@@ -45,184 +46,480 @@ def _generate_sine_wav(path: Path, duration_s: float = 2.0, sr: int = 44100) ->
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(sr)
-        for i in range(n_frames):
-            import math
-            sample = int(16000 * math.sin(2 * math.pi * 440 * i / sr))
-            wf.writeframes(struct.pack("<h", sample))
+        step = 2 * math.pi * 440 / sr
+        samples = array("h", (int(16000 * math.sin(step * i)) for i in range(n_frames)))
+        if sys.byteorder == "big":
+            samples.byteswap()
+        # One write for the whole clip
+        wf.writeframes(samples.tobytes())
+
+
+@pytest.fixture(scope="session")
+def short_wav(tmp_path_factory) -> Path:
+    """
+    0.1s 8 kHz sine WAV, generated once per session. Treat as read-only.
+
+    For tests that only need a valid audio file, not particular content.
+    """
+    path = tmp_path_factory.mktemp("audio") / "sine_short.wav"
+    _generate_sine_wav(path, duration_s=0.1, sr=8000)
+    return path
+
+
+@pytest.fixture(scope="session")
+def sine_wav_2s(tmp_path_factory) -> Path:
+    """2s 44.1 kHz sine WAV, generated once per session. Treat as read-only."""
+    path = tmp_path_factory.mktemp("audio") / "sine_2s.wav"
+    _generate_sine_wav(path, duration_s=2.0)
+    return path
+
+
+@pytest.fixture(scope="session")
+def cover_db():
+    """
+    Create the schema in the in-memory database (see conftest.py) once.
+
+    The app's engine, its single connection and the schema are shared by the
+    whole session; tests isolate their rows by rollback or truncation.
+    """
+    import app.db.models  # noqa: F401  (registers every table on Base.metadata)
+    from app.db.base import Base
+    from app.db.session import engine
+
+    async def _init():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(_init())
+    yield
+    # Drops the in-memory database along with its connection, at session end
+    asyncio.run(engine.dispose())
+
+
+async def _truncate_tables() -> None:
+    from app.db.base import Base
+    from app.db.session import engine
+
+    async with engine.begin() as conn:
+        # Children first so foreign keys never point at a deleted row
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
 
 
 # ---------------------------------------------------------------------------
 # Level 1: Module import validation
 # ---------------------------------------------------------------------------
 
+@pytest.mark.smoke
 class TestModuleImports:
     """Verify all cover-related modules import without error."""
 
-    def test_import_config(self):
-        from app.core.config import settings
-        assert settings.COVER_ASSET_ROOT
-        assert settings.COVER_RESULT_TTL_HOURS > 0
-        assert settings.COVER_MAX_DURATION_SECONDS > 0
-
-    def test_import_schemas(self):
-        from app.models.schemas import (
-            CoverJobStatusEnum,
-            CoverJobStageEnum,
-            CoverCreateResponse,
-            CoverJobStatusResponse,
-            CoverCancelResponse,
-        )
-        assert CoverJobStatusEnum.QUEUED == "queued"
-        assert CoverJobStageEnum.SEPARATE == "separate"
+    COVER_MODULES = [
+        "app.core.config",
+        "app.models.schemas",
+        "app.db.models.cover_job",
+        "app.services.cover_pipeline",
+        "app.services.gpt_sovits_runner",
+        "app.services.cover_job_service",
+        "app.tasks.cover_tasks",
+        "app.tasks.cleanup_tasks",
+        "app.tasks.celery_app",
+    ]
+
+    def test_all_cover_modules_importable(self):
+        import importlib
 
-    def test_import_cover_job_model(self):
-        from app.db.models.cover_job import CoverJob
-        assert CoverJob.__tablename__ == "cover_jobs"
+        config, schemas, cover_job, pipeline, runner, job_service, cover_tasks, cleanup_tasks, celery = (
+            importlib.import_module(name) for name in self.COVER_MODULES
+        )
 
-    def test_import_pipeline(self):
-        from app.services.cover_pipeline import CoverPipeline, CoverPipelineResult
-        pipeline = CoverPipeline()
-        assert pipeline.runner is not None
+        assert config.settings.COVER_ASSET_ROOT
+        assert config.settings.COVER_RESULT_TTL_HOURS > 0
+        assert config.settings.COVER_MAX_DURATION_SECONDS > 0
 
-    def test_import_runner(self):
-        from app.services.gpt_sovits_runner import GPTSoVITSRunner, RunnerError
-        runner = GPTSoVITSRunner()
-        assert runner is not None
+        assert schemas.CoverJobStatusEnum.QUEUED == "queued"
+        assert schemas.CoverJobStageEnum.SEPARATE == "separate"
+        for name in ("CoverCreateResponse", "CoverJobStatusResponse", "CoverCancelResponse"):
+            assert hasattr(schemas, name)
 
-    def test_import_cover_tasks(self):
-        from app.tasks.cover_tasks import run_cover_job
-        assert run_cover_job.name == "cover.run_cover_job"
+        assert cover_job.CoverJob.__tablename__ == "cover_jobs"
+        assert pipeline.CoverPipeline().runner is not None
+        assert hasattr(pipeline, "CoverPipelineResult")
+        assert runner.GPTSoVITSRunner() is not None
+        assert issubclass(runner.RunnerError, Exception)
 
-    def test_import_cleanup_tasks(self):
-        from app.tasks.cleanup_tasks import cleanup_expired_assets, cleanup_expired_assets_task
-        assert cleanup_expired_assets_task.name == "cover.cleanup_expired_assets"
+        assert cover_tasks.run_cover_job.name == "cover.run_cover_job"
+        assert callable(cleanup_tasks.cleanup_expired_assets)
+        assert cleanup_tasks.cleanup_expired_assets_task.name == "cover.cleanup_expired_assets"
 
-    def test_import_celery_beat_schedule(self):
-        from app.tasks.celery_app import celery_app
-        schedule = celery_app.conf.beat_schedule
+        schedule = celery.celery_app.conf.beat_schedule
         assert "cleanup-expired-cover-assets" in schedule
         assert schedule["cleanup-expired-cover-assets"]["task"] == "cover.cleanup_expired_assets"
 
-    def test_import_cover_job_service(self):
-        from app.services.cover_job_service import create_cover_job, get_cover_job, update_cover_job
-        assert callable(create_cover_job)
-        assert callable(get_cover_job)
-        assert callable(update_cover_job)
+        for name in ("create_cover_job", "get_cover_job", "update_cover_job"):
+            assert callable(getattr(job_service, name))
+
+
+class TestAudioMagic:
+    """Verify magic-byte format detection used by upload validation."""
+
+    def test_detect_generated_wav(self, tmp_path):
+        from app.core.audio_magic import HEADER_SIZE, detect
+        wav = tmp_path / "magic.wav"
+        _generate_sine_wav(wav, duration_s=0.1)
+        assert detect(wav.read_bytes()[:HEADER_SIZE]) == "wav"
+
+    def test_detect_known_headers(self):
+        from app.core.audio_magic import detect
+        assert detect(b"fLaC" + bytes(12)) == "flac"
+        assert detect(b"OggS" + bytes(12)) == "ogg"
+        assert detect(b"ID3\x04" + bytes(12)) == "mp3"
+        assert detect(b"\xff\xfb\x90\x00" + bytes(12)) == "mp3"
+        assert detect(b"\xff\xf1\x50\x80" + bytes(12)) == "aac"
+        assert detect(b"\x00\x00\x00\x20ftypM4A " + bytes(4)) == "m4a"
+        assert detect(b"\x1a\x45\xdf\xa3" + bytes(12)) == "webm"
+        assert detect(b"FORM\x00\x00\x10\x00AIFF" + bytes(4)) == "aiff"
+
+    def test_detect_rejects_unknown(self):
+        from app.core.audio_magic import detect
+        assert detect(b"") is None
+        assert detect(b"<html><body>") is None
+
+
+class TestAudioTools:
+    """Verify in-process audio adjustments match pydub."""
+
+    def test_wav_volume_matches_pydub(self, tmp_path):
+        from pydub import AudioSegment
+        from app.services.audio_tools import adjust_audio_volume
+        wav = tmp_path / "tone.wav"
+        _generate_sine_wav(wav, duration_s=0.2)
+        out = asyncio.run(adjust_audio_volume(wav, 6.0, "wav"))
+        try:
+            expected = AudioSegment.from_file(wav, format="wav") + 6.0
+            assert AudioSegment.from_file(out, format="wav").raw_data == expected.raw_data
+        finally:
+            out.unlink(missing_ok=True)
+
+    def test_concatenate_matches_pydub(self, tmp_path):
+        from pydub import AudioSegment
+        from app.services.audio_tools import concatenate_audio
+        first, second = tmp_path / "a.wav", tmp_path / "b.wav"
+        _generate_sine_wav(first, duration_s=0.1, sr=22050)
+        _generate_sine_wav(second, duration_s=0.15)
+        out = asyncio.run(concatenate_audio([first, second]))
+        try:
+            expected = AudioSegment.from_file(first) + AudioSegment.from_file(second)
+            assert AudioSegment.from_file(out, format="wav").raw_data == expected.raw_data
+        finally:
+            out.unlink(missing_ok=True)
+
+    def test_wav_info_from_header_matches_pydub(self, tmp_path):
+        from pydub import AudioSegment
+        from app.services.audio_tools import get_audio_info
+        wav = tmp_path / "tone.wav"
+        _generate_sine_wav(wav, duration_s=0.25)
+        info = asyncio.run(get_audio_info(wav, "wav"))
+        decoded = AudioSegment.from_file(wav, format="wav")
+        assert info["duration_seconds"] == pytest.approx(len(decoded) / 1000.0, abs=1e-3)
+        assert (info["sample_rate"], info["channels"]) == (decoded.frame_rate, decoded.channels)
+
+
+class TestSoVITSBatcher:
+    """Verify request coalescing in front of the GPT-SoVITS client."""
+
+    async def test_shared_request_survives_first_caller_closing_upload(self):
+        import io
+        from app.services.sovits_batcher import SoVITSBatcher
+
+        release = asyncio.Event()
+        sent, copies = [], []
+
+        class FakeClient:
+            async def synthesize(self, *, text, reference_audio, language, speed, temperature):
+                await release.wait()
+                copies.append(reference_audio)
+                sent.append(reference_audio.read())
+                return b"audio"
+
+        batcher = SoVITSBatcher(FakeClient(), max_concurrency=1)
+        first, second = io.BytesIO(b"reference"), io.BytesIO(b"reference")
+        tasks = [asyncio.ensure_future(batcher.synthesize("hi", upload)) for upload in (first, second)]
+        await asyncio.sleep(0.05)
+        # What Starlette does to the first upload when its client disconnects
+        first.close()
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [b"audio", b"audio"]
+        assert sent == [b"reference"]
+        # The batcher's own copy of the reference is removed with the request
+        assert copies[0] is not first and copies[0].closed
+
+
+class TestTurnstile:
+    """Verify Turnstile checks are shared only while in flight."""
+
+    async def test_token_is_verified_once_per_use(self, monkeypatch):
+        from app.services import turnstile
+
+        release = asyncio.Event()
+        posts = []
+
+        class FakeResponse:
+            def json(self):
+                return {"success": True}
+
+        class FakeClient:
+            async def post(self, url, json):
+                posts.append(json["response"])
+                await release.wait()
+                return FakeResponse()
+
+        monkeypatch.setattr(turnstile, "_get_client", FakeClient)
+        concurrent = [asyncio.ensure_future(turnstile.verify_turnstile_token("tok", "1.2.3.4")) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*concurrent) == [True, True]
+        assert posts == ["tok"]
+
+        # A later submit of the same token goes back to Cloudflare
+        assert await turnstile.verify_turnstile_token("tok", "1.2.3.4")
+        assert posts == ["tok", "tok"]
+        assert not turnstile._pending
+
+
+class TestAccessTokens:
+    """Verify access-token caching honours logout."""
+
+    def test_revoked_token_refused_despite_cache(self):
+        from app.auth.token_service import create_access_token, revoke_access_token, verify_access_token
+
+        user_id = str(uuid.uuid4())
+        token = create_access_token(user_id)
+        assert verify_access_token(token) == user_id  # now cached
+        revoke_access_token(token)
+        assert verify_access_token(token) is None
+        assert verify_access_token(create_access_token(user_id)) == user_id
 
 
 # ---------------------------------------------------------------------------
 # Level 2: Database CRUD
 # ---------------------------------------------------------------------------
 
+@pytest.mark.usefixtures("cover_db")
 class TestCoverJobDB:
     """Test cover job database operations."""
 
-    @pytest.fixture(autouse=True)
-    def setup_db(self, tmp_path):
-        """Create a temporary database for testing."""
-        db_path = tmp_path / "test.db"
-        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
-
-        # Re-import to pick up new DATABASE_URL
-        import importlib
-        import app.core.config
-        importlib.reload(app.core.config)
-        import app.db.session
-        importlib.reload(app.db.session)
-
-        from app.db.base import Base
+    @pytest.fixture
+    async def session_maker(self):
+        """
+        Sessions bound to one connection whose transaction is rolled back
+        after the test, so no test sees another's rows. Commits inside the
+        services release a SAVEPOINT instead of ending that transaction.
+        """
         from app.db.session import engine
-
-        async def _init():
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
-
-        asyncio.run(_init())
-        yield
-        asyncio.run(engine.dispose())
-
-    def test_create_and_get_job(self):
-        from app.db.session import async_session_maker
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            yield async_sessionmaker(
+                bind=conn,
+                expire_on_commit=False,
+                join_transaction_mode="create_savepoint",
+            )
+            await trans.rollback()
+
+    async def test_create_and_get_job(self, session_maker):
         from app.services.cover_job_service import create_cover_job, get_cover_job
 
         job_id = uuid.uuid4()
 
-        async def _test():
-            async with async_session_maker() as session:
-                job = await create_cover_job(
-                    session,
-                    job_id=job_id,
-                    user_id=None,
-                    input_voice_path="/tmp/ref.wav",
-                    input_song_path="/tmp/song.wav",
-                    model_id="default",
-                    pitch_shift=0,
-                )
-                assert job.id == job_id
-                assert job.status == "queued"
-                assert job.stage == "queued"
-                assert job.progress == 0
-
-            async with async_session_maker() as session:
-                fetched = await get_cover_job(session, job_id)
-                assert fetched is not None
-                assert fetched.id == job_id
-                assert fetched.input_voice_path == "/tmp/ref.wav"
-
-        asyncio.run(_test())
-
-    def test_update_job_status(self):
-        from app.db.session import async_session_maker
+        async with session_maker() as session:
+            job = await create_cover_job(
+                session,
+                job_id=job_id,
+                user_id=None,
+                input_voice_path="/tmp/ref.wav",
+                input_song_path="/tmp/song.wav",
+                model_id="default",
+                pitch_shift=0,
+            )
+            assert job.id == job_id
+            assert job.status == "queued"
+            assert job.stage == "queued"
+            assert job.progress == 0
+
+            # Drop the identity map so the lookup reads the stored row
+            session.expunge_all()
+            fetched = await get_cover_job(session, job_id)
+            assert fetched is not None
+            assert fetched.id == job_id
+            assert fetched.input_voice_path == "/tmp/ref.wav"
+
+    async def test_update_job_status(self, session_maker):
         from app.services.cover_job_service import create_cover_job, update_cover_job, get_cover_job
 
         job_id = uuid.uuid4()
 
-        async def _test():
-            async with async_session_maker() as session:
-                await create_cover_job(
-                    session,
-                    job_id=job_id,
-                    user_id=None,
-                    input_voice_path="/tmp/ref.wav",
-                    input_song_path="/tmp/song.wav",
-                )
+        async with session_maker() as session:
+            await create_cover_job(
+                session,
+                job_id=job_id,
+                user_id=None,
+                input_voice_path="/tmp/ref.wav",
+                input_song_path="/tmp/song.wav",
+            )
+
+            updated = await update_cover_job(
+                session,
+                job_id=job_id,
+                status="running",
+                stage="separate",
+                progress=35,
+            )
+            assert updated.status == "running"
+            assert updated.stage == "separate"
+            assert updated.progress == 35
+
+            updated = await update_cover_job(
+                session,
+                job_id=job_id,
+                status="succeeded",
+                stage="finalize",
+                progress=100,
+                output_mix_path="/tmp/output.wav",
+            )
+            assert updated.status == "succeeded"
+            assert updated.output_mix_path == "/tmp/output.wav"
+
+    async def test_get_nonexistent_job(self, session_maker):
+        from app.services.cover_job_service import get_cover_job
 
-            async with async_session_maker() as session:
-                updated = await update_cover_job(
-                    session,
-                    job_id=job_id,
-                    status="running",
-                    stage="separate",
-                    progress=35,
+        async with session_maker() as session:
+            result = await get_cover_job(session, uuid.UUID(MISSING_JOB_ID))
+            assert result is None
+
+    def test_upgrade_adds_missing_columns(self, tmp_path):
+        """init_db adds columns and indexes newer than an existing table, once."""
+        from sqlalchemy import create_engine, inspect
+        from init_db import ADDED_COLUMNS, ADDED_INDEXES, _add_missing_columns, _add_missing_indexes
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        try:
+            with engine.begin() as conn:
+                # Just the columns the added indexes cover
+                conn.exec_driver_sql(
+                    "CREATE TABLE cover_jobs (id CHAR(32) PRIMARY KEY, user_id CHAR(32), "
+                    "status VARCHAR(20), created_at DATETIME)"
                 )
-                assert updated.status == "running"
-                assert updated.stage == "separate"
-                assert updated.progress == 35
-
-            async with async_session_maker() as session:
-                updated = await update_cover_job(
-                    session,
-                    job_id=job_id,
-                    status="succeeded",
-                    stage="finalize",
-                    progress=100,
-                    output_mix_path="/tmp/output.wav",
+                conn.exec_driver_sql(
+                    "CREATE TABLE refresh_tokens (id INTEGER PRIMARY KEY, user_id CHAR(32), expires_at DATETIME)"
                 )
-                assert updated.status == "succeeded"
-                assert updated.output_mix_path == "/tmp/output.wav"
-
-        asyncio.run(_test())
-
-    def test_get_nonexistent_job(self):
-        from app.db.session import async_session_maker
-        from app.services.cover_job_service import get_cover_job
-
-        async def _test():
-            async with async_session_maker() as session:
-                result = await get_cover_job(session, uuid.uuid4())
-                assert result is None
-
-        asyncio.run(_test())
+                conn.exec_driver_sql(
+                    "CREATE TABLE synthesis_history (id CHAR(32) PRIMARY KEY, user_id CHAR(32), created_at DATETIME)"
+                )
+                added = _add_missing_columns(conn)
+                created = _add_missing_indexes(conn)
+                assert _add_missing_columns(conn) == []
+                assert _add_missing_indexes(conn) == []
+                inspector = inspect(conn)
+                columns = {column["name"] for column in inspector.get_columns("cover_jobs")}
+                indexes = {
+                    index["name"] for table in ADDED_INDEXES for index in inspector.get_indexes(table)
+                }
+        finally:
+            engine.dispose()
+
+        expected = ADDED_COLUMNS["cover_jobs"]
+        assert added == [f"cover_jobs.{name}" for name in expected]
+        assert set(expected) <= columns
+        expected_indexes = [name for names in ADDED_INDEXES.values() for name in names]
+        assert created == expected_indexes
+        assert set(expected_indexes) <= indexes
+
+    def test_upgrade_backfills_mix_filename(self, tmp_path):
+        """Existing results get their mix path recorded relative to the job directory."""
+        from sqlalchemy import create_engine, select
+        from app.db.base import Base
+        from app.db.models.cover_job import CoverJob
+        from init_db import _backfill_mix_filenames
+
+        job_root = tmp_path / "assets" / str(uuid.uuid4())
+        jobs = CoverJob.__table__
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        try:
+            with engine.begin() as conn:
+                Base.metadata.create_all(conn, tables=[jobs])
+                conn.execute(jobs.insert(), [
+                    {
+                        "id": uuid.uuid4(),
+                        "input_voice_path": str(job_root / "input" / "reference.wav"),
+                        "input_song_path": str(job_root / "input" / "song.wav"),
+                        "output_mix_path": str(job_root / "output" / "final.wav"),
+                    },
+                    {
+                        "id": uuid.uuid4(),
+                        "input_voice_path": str(job_root / "input" / "reference.wav"),
+                        "input_song_path": str(job_root / "input" / "song.wav"),
+                        "output_mix_path": str(tmp_path / "elsewhere.wav"),
+                    },
+                ])
+                assert _backfill_mix_filenames(conn) == 1
+                filenames = conn.execute(select(jobs.c.output_mix_filename)).scalars().all()
+        finally:
+            engine.dispose()
+
+        assert set(filenames) == {"output/final.wav", None}
+
+    def test_timestamps_stamped_on_baseline_schema(self, tmp_path):
+        """Rows get timestamps on tables created before the columns had a DEFAULT."""
+        from sqlalchemy import MetaData, create_engine
+        from sqlalchemy.orm import Session
+        from app.db.base import Base
+        from app.db.models import CoverJob, RefreshToken, SynthesisHistory, User
+        from init_db import _add_missing_columns
+
+        # The original schema: the same tables, with no column DEFAULTs
+        baseline = MetaData()
+        for table in Base.metadata.sorted_tables:
+            table.to_metadata(baseline)
+        for table in baseline.tables.values():
+            for column in table.columns:
+                column.server_default = None
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        try:
+            with engine.begin() as conn:
+                baseline.create_all(conn)
+                _add_missing_columns(conn)
+
+            user_id = uuid.uuid4()
+            with Session(engine, expire_on_commit=False) as session:
+                rows = [
+                    User(id=user_id, email="old@example.com", username="old", hashed_password="x"),
+                    RefreshToken(
+                        user_id=user_id,
+                        token_hash="hash",
+                        jti="jti",
+                        expires_at=datetime.utcnow() + timedelta(days=1),
+                    ),
+                    CoverJob(user_id=user_id, input_voice_path="/tmp/ref.wav", input_song_path="/tmp/song.wav"),
+                    SynthesisHistory(
+                        user_id=user_id,
+                        job_type="tts",
+                        status="completed",
+                        input_text="hello",
+                        language="en",
+                        speed=1.0,
+                        temperature=0.7,
+                    ),
+                ]
+                session.add_all(rows)
+                session.commit()
+                assert all(isinstance(row.created_at, datetime) for row in rows)
+                assert rows[0].updated_at is not None
+        finally:
+            engine.dispose()
 
 
 # ---------------------------------------------------------------------------
@@ -232,98 +529,101 @@ class TestCoverJobDB:
 class TestGPTSoVITSRunner:
     """Test runner ffmpeg-based steps (preprocess, probe, mix)."""
 
-    def test_preprocess_song(self, tmp_path):
+    @pytest.mark.ffmpeg
+    def test_preprocess_song(self, tmp_path, short_wav):
         from app.services.gpt_sovits_runner import GPTSoVITSRunner
 
         runner = GPTSoVITSRunner()
-        input_wav = tmp_path / "input.wav"
         output_wav = tmp_path / "output" / "preprocessed.wav"
-        _generate_sine_wav(input_wav, duration_s=1.0)
 
-        runner.preprocess_song(input_wav, output_wav)
+        asyncio.run(runner.preprocess_song(short_wav, output_wav))
         assert output_wav.exists()
         assert output_wav.stat().st_size > 0
 
-    def test_probe_duration(self, tmp_path):
+    def test_probe_duration(self, sine_wav_2s):
         from app.services.gpt_sovits_runner import GPTSoVITSRunner
 
         runner = GPTSoVITSRunner()
-        input_wav = tmp_path / "probe_test.wav"
-        _generate_sine_wav(input_wav, duration_s=2.0)
 
-        duration = runner.probe_duration_seconds(input_wav)
+        duration = asyncio.run(runner.probe_duration_seconds(sine_wav_2s))
         assert 1.5 < duration < 2.5  # Allow some tolerance
 
-    def test_mix_audio(self, tmp_path):
+    @pytest.mark.ffmpeg
+    def test_mix_audio(self, tmp_path, short_wav):
         from app.services.gpt_sovits_runner import GPTSoVITSRunner
 
         runner = GPTSoVITSRunner()
-        vocal = tmp_path / "vocal.wav"
-        inst = tmp_path / "inst.wav"
         output = tmp_path / "mix.wav"
-        _generate_sine_wav(vocal, duration_s=1.0)
-        _generate_sine_wav(inst, duration_s=1.0)
 
-        runner.mix_audio(converted_vocal=vocal, instrumental=inst, output_mix=output)
+        asyncio.run(runner.mix_audio(converted_vocal=short_wav, instrumental=short_wav, output_mix=output))
         assert output.exists()
         assert output.stat().st_size > 0
 
+    def test_mix_audio_command(self, tmp_path, monkeypatch):
+        """The mix step's ffmpeg invocation, checked without running ffmpeg."""
+        from app.services.gpt_sovits_runner import GPTSoVITSRunner
+
+        runner = GPTSoVITSRunner()
+        vocal, inst, output = tmp_path / "v.wav", tmp_path / "i.wav", tmp_path / "out" / "mix.wav"
+        calls = []
+
+        async def fake_run_args(args, step):
+            calls.append((step, args))
+            output.touch()
+
+        monkeypatch.setattr(runner, "_run_args", fake_run_args)
+        asyncio.run(runner.mix_audio(converted_vocal=vocal, instrumental=inst, output_mix=output))
+
+        [(step, args)] = calls
+        assert step == "mix"
+        assert args[0] == "ffmpeg"
+        assert args[args.index("-i") + 1] == str(vocal)
+        assert str(inst) in args
+        assert args[-1] == str(output)
+
 
 # ---------------------------------------------------------------------------
 # Level 4: API endpoint smoke tests
 # ---------------------------------------------------------------------------
 
+@pytest.mark.usefixtures("cover_db")
+@pytest.mark.asyncio(scope="class")
 class TestCoverAPI:
-    """Test cover API endpoints via FastAPI TestClient."""
-
-    @pytest.fixture(autouse=True)
-    def setup_api(self, tmp_path):
-        """Setup test database and app."""
-        db_path = tmp_path / "api_test.db"
-        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
-        os.environ["CELERY_TASK_ALWAYS_EAGER"] = "true"
-
-        import importlib
-        import app.core.config
-        importlib.reload(app.core.config)
-        import app.db.session
-        importlib.reload(app.db.session)
+    """Test cover API endpoints in-process through httpx's ASGI transport."""
 
-        from app.db.base import Base
-        from app.db.session import engine
+    @pytest.fixture(scope="class")
+    async def api_client(self, cover_db):
+        """One client for the class, inside a single run of the app lifespan."""
+        import httpx
+        from app.main import app
 
-        async def _init():
-            async with engine.begin() as conn:
-                await conn.run_sync(Base.metadata.create_all)
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                yield client
 
-        asyncio.run(_init())
+    @pytest.fixture(autouse=True)
+    async def setup_api(self, api_client, tmp_path):
+        """Empty the tables between tests; the client is shared."""
+        await _truncate_tables()
 
-        from app.main import app
-        from fastapi.testclient import TestClient
-        self.client = TestClient(app)
+        self.client = api_client
         self.api_key = "your-api-key-here"
         self.tmp_path = tmp_path
-        yield
-        asyncio.run(engine.dispose())
 
-    def test_create_job_requires_auth(self):
+    async def test_create_job_requires_auth(self):
         """POST /api/v1/cover/jobs without API key should fail."""
-        resp = self.client.post("/api/v1/cover/jobs")
+        resp = await self.client.post("/api/v1/cover/jobs")
         assert resp.status_code in (401, 403, 422)
 
-    def test_create_job_requires_cmd_templates(self):
+    async def test_create_job_requires_cmd_templates(self, short_wav):
         """POST /api/v1/cover/jobs should check cmd templates are configured."""
         from app.core.config import settings
 
         # If templates are empty, should return 503
         if not settings.COVER_SEPARATE_CMD_TEMPLATE or not settings.COVER_INFER_CMD_TEMPLATE:
-            ref_wav = self.tmp_path / "ref.wav"
-            song_wav = self.tmp_path / "song.wav"
-            _generate_sine_wav(ref_wav)
-            _generate_sine_wav(song_wav)
-
-            with open(ref_wav, "rb") as rf, open(song_wav, "rb") as sf:
-                resp = self.client.post(
+            with open(short_wav, "rb") as rf, open(short_wav, "rb") as sf:
+                resp = await self.client.post(
                     "/api/v1/cover/jobs",
                     headers={"X-API-Key": self.api_key},
                     files={
@@ -334,71 +634,141 @@ class TestCoverAPI:
                 )
             assert resp.status_code == 503
 
-    def test_get_nonexistent_job(self):
-        """GET /api/v1/cover/jobs/{bad_id} should return 404."""
-        fake_id = str(uuid.uuid4())
-        resp = self.client.get(
-            f"/api/v1/cover/jobs/{fake_id}",
-            headers={"X-API-Key": self.api_key},
-        )
-        assert resp.status_code == 404
+    @pytest.mark.parametrize(
+        ("method", "url", "expected_status"),
+        [
+            ("GET", f"/api/v1/cover/jobs/{MISSING_JOB_ID}", 404),
+            ("POST", f"/api/v1/cover/jobs/{MISSING_JOB_ID}/cancel", 404),
+            ("GET", f"/api/v1/cover/jobs/{MISSING_JOB_ID}/result", 404),
+            # Fails path validation before any lookup
+            ("GET", "/api/v1/cover/jobs/not-a-uuid", 422),
+        ],
+        ids=["status", "cancel", "result", "invalid-id"],
+    )
+    async def test_unknown_job(self, method, url, expected_status):
+        """Endpoints for a job that does not exist should fail cleanly."""
+        resp = await self.client.request(method, url, headers={"X-API-Key": self.api_key})
+        assert resp.status_code == expected_status
+
+    async def test_status_etag_not_modified(self):
+        """Polling an unchanged job with its ETag should get 304."""
+        from app.db.session import async_session_maker
+        from app.services.cover_job_service import create_cover_job
 
-    def test_get_invalid_job_id(self):
-        """GET /api/v1/cover/jobs/not-a-uuid should return 400."""
-        resp = self.client.get(
-            "/api/v1/cover/jobs/not-a-uuid",
-            headers={"X-API-Key": self.api_key},
-        )
-        assert resp.status_code == 400
-
-    def test_cancel_nonexistent_job(self):
-        """POST /api/v1/cover/jobs/{bad_id}/cancel should return 404."""
-        fake_id = str(uuid.uuid4())
-        resp = self.client.post(
-            f"/api/v1/cover/jobs/{fake_id}/cancel",
-            headers={"X-API-Key": self.api_key},
-        )
-        assert resp.status_code == 404
-
-    def test_result_nonexistent_job(self):
-        """GET /api/v1/cover/jobs/{bad_id}/result should return 404."""
-        fake_id = str(uuid.uuid4())
-        resp = self.client.get(
-            f"/api/v1/cover/jobs/{fake_id}/result",
-            headers={"X-API-Key": self.api_key},
-        )
-        assert resp.status_code == 404
+        job_id = uuid.uuid4()
+
+        async with async_session_maker() as session:
+            await create_cover_job(
+                session,
+                job_id=job_id,
+                user_id=None,
+                input_voice_path="/tmp/ref.wav",
+                input_song_path="/tmp/song.wav",
+            )
+
+        url = f"/api/v1/cover/jobs/{job_id}"
+        resp = await self.client.get(url, headers={"X-API-Key": self.api_key})
+        assert resp.status_code == 200
+        etag = resp.headers["etag"]
+
+        resp = await self.client.get(url, headers={"X-API-Key": self.api_key, "If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+    async def test_result_etag_not_modified(self):
+        """A repeat download with a matching If-None-Match should get 304."""
+        from app.db.session import async_session_maker
+        from app.services.cover_job_service import create_cover_job, update_cover_job
+
+        job_id = uuid.uuid4()
+        mix = self.tmp_path / "final.wav"
+        _generate_sine_wav(mix, duration_s=0.1)
+        mix_stat = mix.stat()
+
+        async with async_session_maker() as session:
+            await create_cover_job(
+                session,
+                job_id=job_id,
+                user_id=None,
+                input_voice_path="/tmp/ref.wav",
+                input_song_path="/tmp/song.wav",
+            )
+            await update_cover_job(
+                session,
+                job_id=job_id,
+                status="succeeded",
+                stage="finalize",
+                progress=100,
+                output_mix_path=str(mix),
+                output_size_bytes=mix_stat.st_size,
+                output_mtime=mix_stat.st_mtime,
+            )
+
+        url = f"/api/v1/cover/jobs/{job_id}/result"
+        resp = await self.client.get(url, headers={"X-API-Key": self.api_key})
+        assert resp.status_code == 200
+        assert resp.content == mix.read_bytes()
+        etag = resp.headers["etag"]
+
+        resp = await self.client.get(url, headers={"X-API-Key": self.api_key, "If-None-Match": etag})
+        assert resp.status_code == 304
+
+    async def test_result_without_mix_filename(self):
+        """Rows stored before output_mix_filename existed download via their absolute path."""
+        from app.core.config import settings
+        from app.db.session import async_session_maker
+        from app.services.cover_job_service import create_cover_job, update_cover_job
+
+        job_id = uuid.uuid4()
+        mix = Path(settings.COVER_ASSET_ROOT) / str(job_id) / "output" / "final.wav"
+        _generate_sine_wav(mix, duration_s=0.1)
+
+        async with async_session_maker() as session:
+            await create_cover_job(
+                session,
+                job_id=job_id,
+                user_id=None,
+                input_voice_path="/tmp/ref.wav",
+                input_song_path="/tmp/song.wav",
+            )
+            await update_cover_job(
+                session,
+                job_id=job_id,
+                status="succeeded",
+                stage="finalize",
+                progress=100,
+                output_mix_path=str(mix),
+            )
+
+        resp = await self.client.get(f"/api/v1/cover/jobs/{job_id}/result", headers={"X-API-Key": self.api_key})
+        assert resp.status_code == 200
+        assert resp.content == mix.read_bytes()
 
 
 # ---------------------------------------------------------------------------
 # Level 5: Cleanup task validation
 # ---------------------------------------------------------------------------
 
+@pytest.mark.usefixtures("cover_db")
 class TestCleanupTask:
     """Test the cleanup task logic."""
 
-    def test_cleanup_nonexistent_dir(self, tmp_path):
+    def test_cleanup_nonexistent_dir(self, tmp_path, monkeypatch):
         """Cleanup should handle missing cover_assets dir gracefully."""
-        os.environ["COVER_ASSET_ROOT"] = str(tmp_path / "nonexistent")
-
-        import importlib
-        import app.core.config
-        importlib.reload(app.core.config)
+        from app.core.config import settings
+        monkeypatch.setattr(settings, "COVER_ASSET_ROOT", str(tmp_path / "nonexistent"))
 
         from app.tasks.cleanup_tasks import cleanup_expired_assets
         result = cleanup_expired_assets(ttl_hours=1, dry_run=True)
         assert result["deleted_count"] == 0
         assert result["orphaned_count"] == 0
 
-    def test_cleanup_empty_dir(self, tmp_path):
+    def test_cleanup_empty_dir(self, tmp_path, monkeypatch):
         """Cleanup should handle empty cover_assets dir."""
+        from app.core.config import settings
         cover_dir = tmp_path / "cover_assets"
         cover_dir.mkdir()
-        os.environ["COVER_ASSET_ROOT"] = str(cover_dir)
-
-        import importlib
-        import app.core.config
-        importlib.reload(app.core.config)
+        monkeypatch.setattr(settings, "COVER_ASSET_ROOT", str(cover_dir))
 
         from app.tasks.cleanup_tasks import cleanup_expired_assets
         result = cleanup_expired_assets(ttl_hours=1, dry_run=True)